@@ -0,0 +1,139 @@
+import os
+
+import numpy as np
+
+from effect_batch import find_effect_files, read_effect, run_parallel
+from effect_table import EmitterTable
+from particle_sim import DEFAULT_PARAMETERS, UNLIMITED_LIFE_TURNS
+from trail_sim import TRAIL_KEYS
+
+# Estimates made for every effect, in report order
+COST_NAMES = ("particles", "trail_vertices", "fill")
+
+# Per-effect limits; an effect over any of them is flagged
+DEFAULT_BUDGETS = {"particles": 1000.0, "trail_vertices": 2000.0, "fill": 2000.0}
+
+# Relative fill cost per blend mode (normal, additive, multiply, screen);
+# multiply and screen take an extra blend stage per pixel
+BLEND_FILL_WEIGHTS = np.array([1.0, 1.0, 1.5, 1.5])
+
+
+def emitter_costs(column):
+    """Estimate the steady-state cost of many emitters at once
+
+    Live particles are Emit_Per_Turn x Life. Trail emitters keep as many
+    live trails, each with Num_Points vertices. Fill is the area of every
+    live sprite quad, averaged over its life, in square world units and
+    weighted by blend mode.
+
+    Args:
+        column (callable): Returns the values of a parameter for every
+            emitter as an array, NaN where an emitter does not set it
+
+    Returns:
+        dict: Array of per-emitter estimates for each of COST_NAMES
+    """
+    def value(key, fallback=None):
+        values = np.asarray(column(key), dtype=np.float64)
+        default = DEFAULT_PARAMETERS[key] if fallback is None else fallback
+        return np.where(np.isnan(values), default, values)
+
+    emit = np.maximum(value("Emit_Per_Turn"), 0.0)
+    life = value("Life")
+    live = emit * np.where(life > 0, life, UNLIMITED_LIFE_TURNS)
+
+    trail = np.logical_or.reduce([~np.isnan(np.asarray(column(key), dtype=np.float64)) for key in TRAIL_KEYS])
+    particles = np.where(trail, 0.0, live)
+    trail_vertices = np.where(trail, live * np.maximum(value("Num_Points"), 1.0), 0.0)
+
+    # Mean of the squared size over a life spent growing linearly from start to end
+    start = value("Radius")
+    end = value("Final_Radius", start)
+    quad_area = 4.0 * (start * start + start * end + end * end) / 3.0
+    start_width = value("Start_Width", value("Width"))
+    end_width = value("Width", start_width)
+    segment_area = (start_width * start_width + start_width * end_width + end_width * end_width) / 3.0
+
+    modes = np.clip(np.nan_to_num(value("Blend_Mode")).astype(np.int64), 0, len(BLEND_FILL_WEIGHTS) - 1)
+    fill = BLEND_FILL_WEIGHTS[modes] * (particles * quad_area + trail_vertices * segment_area)
+    return {"particles": particles, "trail_vertices": trail_vertices, "fill": fill}
+
+
+def table_costs(table):
+    """Return the summed estimates for every emitter of an EmitterTable"""
+    costs = emitter_costs(lambda key: np.frombuffer(table.values[key], dtype=np.float64))
+    return {name: float(values.sum()) for name, values in costs.items()}
+
+
+def over_budget(costs, budgets=DEFAULT_BUDGETS):
+    """Return the names of the estimates that exceed their budget"""
+    return [name for name in COST_NAMES if costs[name] > budgets[name]]
+
+
+def file_costs(file_path):
+    """Estimate the cost of one effect file; runs in a worker process
+
+    Returns:
+        tuple: (file_path, costs or None, error message or None)
+    """
+    try:
+        return file_path, table_costs(EmitterTable(read_effect(file_path))), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def is_variant(file_path, suffix):
+    """Return True if a file name ends with suffix before its extension, e.g. a LOD variant"""
+    return bool(suffix) and os.path.splitext(file_path)[0].endswith(suffix)
+
+
+def store_costs(store, skip_suffix=None):
+    """Estimate the cost of every file in a ColumnStore without reparsing
+
+    Args:
+        skip_suffix (str, optional): Leave out files whose name ends with
+            it, such as LOD variants
+
+    Returns:
+        list: (file_path, costs, None) tuples, like file_costs
+    """
+    costs = emitter_costs(store.column)
+    totals = {
+        name: np.bincount(store.file_index, weights=values, minlength=len(store.files))
+        for name, values in costs.items()
+    }
+    return [
+        (path, {name: float(totals[name][number]) for name in COST_NAMES}, None)
+        for number, path in enumerate(store.files)
+        if not is_variant(path, skip_suffix)
+    ]
+
+
+def analyze_files(paths, jobs=None, skip_suffix=None):
+    """Estimate the cost of every effect under paths, parsing files in parallel
+
+    Args:
+        skip_suffix (str, optional): Leave out files whose name ends with
+            it, such as LOD variants
+    """
+    files = [path for path in find_effect_files(paths) if not is_variant(path, skip_suffix)]
+    return run_parallel(file_costs, files, jobs)
+
+
+def aggregate_folders(results, budgets=DEFAULT_BUDGETS):
+    """Sum the estimates of effects per folder, e.g. per level
+
+    Returns:
+        dict: {folder: {"files": count, "flagged": count, cost name: total}}
+    """
+    folders = {}
+    for file_path, costs, error in results:
+        if error:
+            continue
+        folder = folders.setdefault(os.path.dirname(file_path),
+                                    dict({"files": 0, "flagged": 0}, **{name: 0.0 for name in COST_NAMES}))
+        folder["files"] += 1
+        folder["flagged"] += bool(over_budget(costs, budgets))
+        for name in COST_NAMES:
+            folder[name] += costs[name]
+    return folders
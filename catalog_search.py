@@ -0,0 +1,143 @@
+import os
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from effect_catalog import DEFAULT_CATALOG_PATH, EffectCatalog, parse_condition
+
+# How often the dialog checks on a running index, in milliseconds
+INDEX_POLL_MS = 100
+
+
+class CatalogSearchDialog:
+    """Window for indexing an effect folder and searching it by parameter value"""
+
+    def __init__(self, root, colors, on_open, db_path=DEFAULT_CATALOG_PATH):
+        self.root = root
+        self.colors = colors
+        self.on_open = on_open      # Called with the path of a file to open and the emitter to select
+        self.db_path = db_path
+        self.matches = []
+        self.index_thread = None
+        self.index_result = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("EFFECT CATALOG")
+        self.window.geometry("700x450")
+        self.window.configure(bg=colors['background'])
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the dialog widgets"""
+        frame = ttk.Frame(self.window, padding="10", style="Military.TFrame")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        # Folder indexing
+        index_frame = ttk.LabelFrame(frame, text="GAME FOLDER", padding="5", style="Military.TLabelframe")
+        index_frame.pack(fill=tk.X, pady=5)
+
+        self.folder_label = ttk.Label(index_frame, text="No folder indexed", style="FileText.TLabel")
+        self.folder_label.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+
+        self.index_button = ttk.Button(index_frame, text="INDEX FOLDER", command=self.choose_folder, style="Military.TButton")
+        self.index_button.pack(side=tk.RIGHT, padx=5)
+
+        # Query entry
+        query_frame = ttk.LabelFrame(frame, text="SEARCH", padding="5", style="Military.TLabelframe")
+        query_frame.pack(fill=tk.X, pady=5)
+
+        self.query_var = tk.StringVar(value="Blend_Mode=1, Life>20")
+        query_entry = ttk.Entry(query_frame, textvariable=self.query_var)
+        query_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        query_entry.bind("<Return>", lambda e: self.search())
+
+        self.same_emitter_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(query_frame, text="SAME EMITTER", variable=self.same_emitter_var).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(query_frame, text="SEARCH", command=self.search, style="Military.TButton").pack(side=tk.RIGHT, padx=5)
+
+        # Results
+        results_frame = ttk.LabelFrame(frame, text="RESULTS (DOUBLE-CLICK TO OPEN)", padding="5", style="Military.TLabelframe")
+        results_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        self.results = tk.Listbox(
+            results_frame,
+            font=("Courier New", 9),
+            bg=self.colors['border'],
+            fg=self.colors['foreground'],
+            selectbackground=self.colors['accent1']
+        )
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results.yview)
+        self.results.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results.pack(fill=tk.BOTH, expand=True)
+        self.results.bind("<Double-Button-1>", self.open_selected)
+
+        self.status_var = tk.StringVar(value=f"CATALOG: {self.db_path}")
+        ttk.Label(frame, textvariable=self.status_var, style="Status.TLabel").pack(fill=tk.X)
+
+    def choose_folder(self):
+        """Pick a folder and index it in the background"""
+        folder = filedialog.askdirectory(title="Select Extracted Game Folder", parent=self.window)
+        if not folder or self.index_thread is not None:
+            return
+
+        self.folder_label.config(text=folder)
+        self.index_button.config(state=tk.DISABLED)
+        self.status_var.set("INDEXING...")
+
+        self.index_thread = threading.Thread(target=self.run_index, args=(folder,), daemon=True)
+        self.index_thread.start()
+        self.window.after(INDEX_POLL_MS, self.check_index)
+
+    def run_index(self, folder):
+        """Index a folder; runs on a worker thread with its own connection"""
+        try:
+            catalog = EffectCatalog(self.db_path)
+            self.index_result = catalog.index([folder])
+            catalog.close()
+        except Exception as e:
+            self.index_result = e
+
+    def check_index(self):
+        """Report the index result once the worker thread finishes"""
+        if self.index_thread.is_alive():
+            self.window.after(INDEX_POLL_MS, self.check_index)
+            return
+
+        self.index_thread = None
+        self.index_button.config(state=tk.NORMAL)
+        if isinstance(self.index_result, Exception):
+            self.status_var.set("INDEXING FAILED")
+            messagebox.showerror("Error", f"Failed to index folder: {str(self.index_result)}", parent=self.window)
+        else:
+            stats = self.index_result
+            self.status_var.set(f"INDEXED {stats['scanned']} FILES ({stats['parsed']} PARSED, "
+                                f"{stats['unchanged']} UNCHANGED, {stats['removed']} REMOVED)")
+
+    def search(self):
+        """Run the query and list the matching effects"""
+        try:
+            conditions = [parse_condition(part) for part in self.query_var.get().split(",") if part.strip()]
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.window)
+            return
+
+        catalog = EffectCatalog(self.db_path)
+        self.matches = catalog.query(conditions, per_emitter=self.same_emitter_var.get())
+        catalog.close()
+
+        self.results.delete(0, tk.END)
+        for path, emitter in self.matches:
+            # Emitters are numbered from 1, as in the editor
+            label = os.path.basename(path) if emitter is None else f"{os.path.basename(path)}  [EMITTER {emitter + 1}]"
+            self.results.insert(tk.END, f"{label}    {os.path.dirname(path)}")
+        self.status_var.set(f"{len(self.matches)} MATCHES")
+
+    def open_selected(self, event):
+        """Open the double-clicked effect in the editor"""
+        selection = self.results.curselection()
+        if selection:
+            path, emitter = self.matches[selection[0]]
+            self.on_open(path, emitter or 0)
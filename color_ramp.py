@@ -0,0 +1,47 @@
+import numpy as np
+from PIL import Image
+
+from particle_sim import RAMP_CHANNELS, ramp
+
+# Ramp strip size in pixels
+RAMP_WIDTH = 240
+RAMP_HEIGHT = 28
+
+# Checkerboard square size behind the opacity half of the strip
+CHECKER_SIZE = 6
+CHECKER_SHADES = (0.35, 0.55)
+
+
+def ramp_table(params, width=RAMP_WIDTH):
+    """Sample the Start -> Transition -> End color ramp across a particle's life
+
+    Returns:
+        ndarray: (width, 4) RGBA values, 0-1, from birth to death
+    """
+    progress = np.linspace(0.0, 1.0, width)
+    return np.clip(np.stack([ramp(params, channel, progress) for channel in RAMP_CHANNELS], axis=1), 0.0, 1.0)
+
+
+def checkerboard(width, height, size=CHECKER_SIZE):
+    """Return a (height, width) grey checkerboard, 0-1"""
+    rows = (np.arange(height) // size)[:, None]
+    columns = (np.arange(width) // size)[None, :]
+    return np.where((rows + columns) % 2, CHECKER_SHADES[1], CHECKER_SHADES[0])
+
+
+def ramp_image(params, width=RAMP_WIDTH, height=RAMP_HEIGHT):
+    """Draw the color ramp as a strip: plain color on top, color with opacity below
+
+    Returns:
+        Image: RGB strip
+    """
+    table = ramp_table(params, width)
+    top = height // 2
+    strip = np.empty((height, width, 3), dtype=np.float64)
+    strip[:top] = table[None, :, :3]
+
+    # Lower half shows the color over a checkerboard, weighted by alpha
+    checker = checkerboard(width, height - top)[:, :, None]
+    alpha = table[None, :, 3:]
+    strip[top:] = table[None, :, :3] * alpha + checker * (1.0 - alpha)
+    return Image.fromarray((strip * 255).astype(np.uint8), "RGB")
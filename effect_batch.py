@@ -0,0 +1,97 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from effect_parser import parse_effect
+from effect_writer import plan_edits, splice
+
+# File extensions picked up when a directory is given
+EFFECT_EXTENSIONS = (".txt",)
+
+
+def find_effect_files(patterns):
+    """Expand directories, globs and file paths into a sorted list of effect files
+
+    Args:
+        patterns (list): Directories (searched recursively), glob patterns or files
+
+    Returns:
+        list: Unique effect file paths
+    """
+    found = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for folder, _, names in os.walk(pattern):
+                for name in names:
+                    if name.lower().endswith(EFFECT_EXTENSIONS):
+                        found.add(os.path.join(folder, name))
+        elif os.path.isfile(pattern):
+            found.add(pattern)
+        else:
+            found.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(found)
+
+
+def run_parallel(function, items, jobs=None):
+    """Call a picklable function on every item across a process pool
+
+    Args:
+        function (callable): Module-level function taking one item
+        items (list): Work items
+        jobs (int, optional): Worker processes; defaults to one per core,
+            and 1 runs everything in the current process
+
+    Returns:
+        list: Results in the same order as items
+    """
+    items = list(items)
+    if jobs == 1 or len(items) <= 1:
+        return [function(item) for item in items]
+
+    workers = jobs or os.cpu_count() or 1
+    chunksize = max(1, len(items) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(function, items, chunksize=chunksize))
+
+
+def read_effect(file_path):
+    """Read an effect file and parse it"""
+    with open(file_path, 'r') as file:
+        return parse_effect(file.read())
+
+
+def write_effect(file_path, content):
+    """Write effect file content back to disk"""
+    with open(file_path, 'w') as file:
+        file.write(content)
+
+
+def set_parameters(job):
+    """Write parameter values into one effect file
+
+    Args:
+        job (tuple): (file_path, assignments, dry_run)
+
+    Returns:
+        dict: Summary with the file path, the number of values changed per
+            parameter and an error message if the file could not be processed
+    """
+    file_path, assignments, dry_run = job
+    result = {"file": file_path, "changes": {}, "error": None}
+    try:
+        document = read_effect(file_path)
+        edits = plan_edits(document, assignments)
+        if not edits:
+            return result
+
+        # Count changes per parameter using the edited entries' offsets
+        keys_by_start = {entry.start: entry.key for entry in document.entries}
+        for start, _, _ in edits:
+            key = keys_by_start[start]
+            result["changes"][key] = result["changes"].get(key, 0) + 1
+
+        if not dry_run:
+            write_effect(file_path, splice(document.text, edits))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
@@ -0,0 +1,244 @@
+import math
+import os
+import threading
+import tkinter as tk
+from concurrent.futures import ProcessPoolExecutor
+from tkinter import filedialog, ttk
+
+from PIL import Image, ImageTk
+
+from effect_batch import find_effect_files
+from thumbnail_render import THUMBNAIL_CACHE_DIR, cache_thumbnail
+
+# Thumbnail size in the browser list, in pixels
+BROWSER_THUMBNAIL_SIZE = (96, 54)
+
+# Worker processes rendering thumbnails
+BROWSER_WORKERS = 2
+
+# How often the browser checks on folder scans and thumbnails, in milliseconds
+BROWSER_POLL_MS = 100
+
+# Rows above and below the visible ones that also get thumbnails
+BROWSER_MARGIN_ROWS = 5
+
+
+class EffectBrowser:
+    """Window listing the effects in a folder with thumbnails
+
+    Thumbnails are rendered by worker processes and cached on disk by file
+    content. Only rows on or near the screen get a thumbnail decoded;
+    rows scrolled away drop theirs again.
+    """
+
+    def __init__(self, root, colors, on_open, cache_dir=THUMBNAIL_CACHE_DIR):
+        self.root = root
+        self.colors = colors
+        self.on_open = on_open      # Called with the path of a file to open
+        self.cache_dir = cache_dir
+        self.folder = None
+        self.files = []             # Effect paths, in row order
+        self.thumbnail_paths = {}   # Row -> cached thumbnail file, or None if it failed
+        self.images = {}            # Row -> PhotoImage, only for rows near the view
+        self.pending = {}           # Row -> Future of a thumbnail being rendered
+        self.executor = None
+        self.scan_thread = None
+        self.scan_result = None
+        self._poll_id = None
+        self._update_id = None
+
+        self.window = tk.Toplevel(root)
+        self.window.title("EFFECT BROWSER")
+        self.window.geometry("760x600")
+        self.window.configure(bg=colors['background'])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the browser widgets"""
+        frame = ttk.Frame(self.window, padding="10", style="Military.TFrame")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        folder_frame = ttk.LabelFrame(frame, text="EFFECT FOLDER", padding="5", style="Military.TLabelframe")
+        folder_frame.pack(fill=tk.X, pady=5)
+
+        self.folder_label = ttk.Label(folder_frame, text="No folder selected", style="FileText.TLabel")
+        self.folder_label.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+
+        self.open_button = ttk.Button(folder_frame, text="OPEN FOLDER", command=self.choose_folder, style="Military.TButton")
+        self.open_button.pack(side=tk.RIGHT, padx=5)
+
+        list_frame = ttk.LabelFrame(frame, text="EFFECTS (DOUBLE-CLICK TO OPEN)", padding="5", style="Military.TLabelframe")
+        list_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        # Rows must be tall enough for a thumbnail
+        style = ttk.Style(self.window)
+        style.configure("Browser.Treeview",
+                        rowheight=BROWSER_THUMBNAIL_SIZE[1] + 4,
+                        background=self.colors['border'],
+                        fieldbackground=self.colors['border'],
+                        foreground=self.colors['foreground'])
+
+        self.tree = ttk.Treeview(list_frame, columns=("folder",), style="Browser.Treeview")
+        self.tree.heading("#0", text="EFFECT")
+        self.tree.heading("folder", text="FOLDER")
+        self.tree.column("#0", width=300)
+        self.tree.column("folder", width=380)
+
+        self.scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.config(yscrollcommand=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.tree.bind("<Double-Button-1>", self.open_selected)
+        self.tree.bind("<Configure>", lambda e: self.schedule_update())
+
+        self.status_var = tk.StringVar(value=f"THUMBNAIL CACHE: {self.cache_dir}")
+        ttk.Label(frame, textvariable=self.status_var, style="Status.TLabel").pack(fill=tk.X)
+
+    def choose_folder(self):
+        """Pick a folder and list its effects, scanning in the background"""
+        folder = filedialog.askdirectory(title="Select Effect Folder", parent=self.window)
+        if not folder or self.scan_thread is not None:
+            return
+
+        self.folder = folder
+        self.folder_label.config(text=folder)
+        self.clear()
+        self.status_var.set("SCANNING...")
+
+        self.scan_thread = threading.Thread(target=self.run_scan, args=(folder,), daemon=True)
+        self.scan_thread.start()
+        self.window.after(BROWSER_POLL_MS, self.check_scan)
+
+    def run_scan(self, folder):
+        """Find the effect files in a folder; runs on a worker thread"""
+        self.scan_result = find_effect_files([folder])
+
+    def check_scan(self):
+        """List the scanned files once the worker thread finishes"""
+        if self.scan_thread.is_alive():
+            self.window.after(BROWSER_POLL_MS, self.check_scan)
+            return
+
+        self.scan_thread = None
+        self.files = self.scan_result
+        for row, path in enumerate(self.files):
+            folder = os.path.relpath(os.path.dirname(path), self.folder)
+            self.tree.insert("", tk.END, iid=str(row), text=os.path.basename(path),
+                             values=("" if folder == "." else folder,))
+        self.status_var.set(f"{len(self.files)} EFFECTS")
+        self.schedule_update()
+
+    def clear(self):
+        """Remove every row, cancelling thumbnails still waiting to render"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending = {}
+        self.images = {}
+        self.thumbnail_paths = {}
+        self.files = []
+        self.tree.delete(*self.tree.get_children())
+
+    def on_scroll(self, first, last):
+        """Update the scrollbar and fetch thumbnails for newly visible rows"""
+        self.scrollbar.set(first, last)
+        self.schedule_update()
+
+    def schedule_update(self):
+        """Update the visible rows once Tk is idle"""
+        if self._update_id is None:
+            self._update_id = self.window.after_idle(self.update_visible)
+
+    def visible_rows(self):
+        """Return the range of rows on screen, plus a margin"""
+        count = len(self.files)
+        first, last = self.tree.yview()
+        start = max(0, int(first * count) - BROWSER_MARGIN_ROWS)
+        end = min(count, math.ceil(last * count) + BROWSER_MARGIN_ROWS)
+        return range(start, end)
+
+    def update_visible(self):
+        """Show thumbnails for rows near the view and release the others"""
+        self._update_id = None
+        rows = self.visible_rows()
+
+        # Drop decoded images and queued renders for rows that left the view
+        for row in [row for row in self.images if row not in rows]:
+            self.tree.item(str(row), image="")
+            del self.images[row]
+        for row in [row for row in self.pending if row not in rows]:
+            if self.pending[row].cancel():
+                del self.pending[row]
+
+        for row in rows:
+            if row in self.images or row in self.pending:
+                continue
+            if row in self.thumbnail_paths:
+                self.show_thumbnail(row)
+            else:
+                self.request_thumbnail(row)
+
+        if self.pending and self._poll_id is None:
+            self._poll_id = self.window.after(BROWSER_POLL_MS, self.check_thumbnails)
+
+    def request_thumbnail(self, row):
+        """Queue a thumbnail render for a row"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=BROWSER_WORKERS)
+        job = (self.files[row], self.cache_dir, BROWSER_THUMBNAIL_SIZE)
+        self.pending[row] = self.executor.submit(cache_thumbnail, job)
+
+    def check_thumbnails(self):
+        """Show the thumbnails that finished rendering"""
+        self._poll_id = None
+        rows = self.visible_rows()
+        for row, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[row]
+            if future.cancelled():
+                continue
+            file_path, path, error = future.result()
+            self.thumbnail_paths[row] = path
+            if error:
+                self.status_var.set(f"NO THUMBNAIL FOR {os.path.basename(file_path)}: {error}")
+            if row in rows:
+                self.show_thumbnail(row)
+
+        if self.pending:
+            self._poll_id = self.window.after(BROWSER_POLL_MS, self.check_thumbnails)
+
+    def show_thumbnail(self, row):
+        """Decode a row's cached thumbnail and put it in the list"""
+        path = self.thumbnail_paths[row]
+        if path is None:
+            return
+        try:
+            with Image.open(path) as image:
+                self.images[row] = ImageTk.PhotoImage(image)
+        except OSError:
+            # The cache file was removed or is damaged; render it again
+            del self.thumbnail_paths[row]
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.schedule_update()
+            return
+        self.tree.item(str(row), image=self.images[row])
+
+    def open_selected(self, event):
+        """Open the double-clicked effect in the editor"""
+        row = self.tree.focus()
+        if row:
+            self.on_open(self.files[int(row)])
+
+    def close(self):
+        """Stop the thumbnail workers and close the window"""
+        for after_id in (self._poll_id, self._update_id):
+            if after_id is not None:
+                self.window.after_cancel(after_id)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self.window.destroy()
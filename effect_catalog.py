@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import sqlite3
+
+from effect_batch import find_effect_files, run_parallel
+from effect_parser import parse_effect
+
+# Catalog database used when no path is given
+DEFAULT_CATALOG_PATH = "effect_catalog.sqlite"
+
+# Comparison operators accepted in query conditions
+QUERY_OPERATORS = ("<=", ">=", "!=", "=", "<", ">")
+
+_CONDITION_PATTERN = re.compile(r'^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(-?[\d.]+)\s*$')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    emitters INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    emitter INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    value REAL,
+    char_start INTEGER NOT NULL,
+    char_end INTEGER NOT NULL,
+    byte_start INTEGER NOT NULL,
+    byte_end INTEGER NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_key_value ON entries(key, value);
+CREATE INDEX IF NOT EXISTS entries_file_emitter ON entries(file_id, emitter);
+"""
+
+
+def parse_condition(text):
+    """Parse a query condition such as "Life>20" into (key, operator, value)"""
+    match = _CONDITION_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid condition '{text}', expected e.g. Blend_Mode=1 or Life>20")
+    return match.group(1), match.group(2), float(match.group(3))
+
+
+def scan_file(job):
+    """Hash and, if its content changed, parse one file; runs in a worker process
+
+    Args:
+        job (tuple): (file_path, sha1 already in the catalog or None)
+
+    Returns:
+        tuple: (file_path, mtime, size, sha1, emitters, rows) where rows is
+            None when the content matches the catalog
+    """
+    file_path, known_sha1 = job
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    sha1 = hashlib.sha1(data).hexdigest()
+    if sha1 == known_sha1:
+        return file_path, stat.st_mtime, stat.st_size, sha1, None, None
+
+    # Decode the same way the editor reads files
+    with open(file_path, 'r') as file:
+        document = parse_effect(file.read())
+    rows = [
+        (entry.emitter, entry.key, entry.raw, entry.number(), entry.start, entry.end,
+         entry.byte_start, entry.byte_end, entry.line)
+        for entry in document.entries
+    ]
+    return file_path, stat.st_mtime, stat.st_size, sha1, document.emitter_count, rows
+
+
+class EffectCatalog:
+    """SQLite catalog of every parameter in a tree of effect files"""
+
+    def __init__(self, db_path=DEFAULT_CATALOG_PATH):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def index(self, paths, jobs=None):
+        """Bring the catalog up to date with the effect files under paths
+
+        Files whose modification time and size match the catalog are
+        skipped without being read. Other files are hashed, and only
+        reparsed if their content actually changed. Catalogued files under
+        the given paths that no longer exist are removed.
+
+        Args:
+            paths (list): Directories, glob patterns or files to index
+            jobs (int, optional): Worker processes for hashing and parsing
+
+        Returns:
+            dict: Counts of scanned, parsed, unchanged and removed files
+        """
+        files = [os.path.abspath(path) for path in find_effect_files(paths)]
+        known = {
+            path: (mtime, size, sha1)
+            for path, mtime, size, sha1 in self.connection.execute("SELECT path, mtime, size, sha1 FROM files")
+        }
+
+        stale = []
+        for path in files:
+            stat = os.stat(path)
+            record = known.get(path)
+            if record is None or record[0] != stat.st_mtime or record[1] != stat.st_size:
+                stale.append((path, record[2] if record else None))
+
+        stats = {"scanned": len(files), "parsed": 0, "unchanged": len(files) - len(stale), "removed": 0}
+        with self.connection:
+            for path, mtime, size, sha1, emitters, rows in run_parallel(scan_file, stale, jobs):
+                if rows is None:
+                    # Touched but identical; remember the new mtime
+                    self.connection.execute("UPDATE files SET mtime = ? WHERE path = ?", (mtime, path))
+                    stats["unchanged"] += 1
+                    continue
+
+                self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                file_id = self.connection.execute(
+                    "INSERT INTO files (path, mtime, size, sha1, emitters) VALUES (?, ?, ?, ?, ?)",
+                    (path, mtime, size, sha1, emitters)
+                ).lastrowid
+                self.connection.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((file_id,) + row for row in rows)
+                )
+                stats["parsed"] += 1
+
+            # Drop files that disappeared from the indexed folders
+            roots = [os.path.abspath(path) for path in paths if os.path.isdir(path)]
+            found = set(files)
+            for path in known:
+                if path not in found and not os.path.exists(path) and \
+                        any(path.startswith(root + os.sep) for root in roots):
+                    self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                    stats["removed"] += 1
+
+        return stats
+
+    def query(self, conditions, per_emitter=True):
+        """Find effects matching every condition
+
+        Args:
+            conditions (list): (key, operator, value) tuples, see parse_condition
+            per_emitter (bool): Require all conditions to hold in the same
+                emitter, rather than anywhere in the file
+
+        Returns:
+            list: (path, emitter) tuples; emitter is None when per_emitter is False
+        """
+        if not conditions:
+            return []
+
+        for _, operator, _ in conditions:
+            if operator not in QUERY_OPERATORS:
+                raise ValueError(f"Unsupported operator '{operator}'")
+
+        # One self-join per extra condition, tied to the first condition's file/emitter
+        sql = [f"SELECT f.path, {'e0.emitter' if per_emitter else 'NULL'} FROM entries e0",
+               "JOIN files f ON f.id = e0.file_id"]
+        params = []
+        for number, (key, operator, value) in enumerate(conditions[1:], 1):
+            alias = f"e{number}"
+            same = f"{alias}.file_id = e0.file_id"
+            if per_emitter:
+                same += f" AND {alias}.emitter = e0.emitter"
+            sql.append(f"JOIN entries {alias} ON {same} AND {alias}.key = ? AND {alias}.value {operator} ?")
+            params.extend((key, value))
+
+        key, operator, value = conditions[0]
+        group = "e0.file_id, e0.emitter" if per_emitter else "e0.file_id"
+        sql.append(f"WHERE e0.key = ? AND e0.value {operator} ? GROUP BY {group} ORDER BY f.path, 2")
+        params.extend((key, value))
+        return self.connection.execute(" ".join(sql), params).fetchall()
+
+    def file_count(self):
+        """Return the number of files in the catalog"""
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
@@ -0,0 +1,184 @@
+import json
+import os
+
+import numpy as np
+
+from effect_batch import find_effect_files, read_effect, run_parallel
+from effect_parser import EDITABLE_PARAMETERS
+
+# Parameters stored as columns, one row per emitter
+COLUMN_PARAMETERS = list(EDITABLE_PARAMETERS)
+
+# File listing the source effect files, in file_index order
+FILES_NAME = "files.json"
+
+
+def extract_rows(file_path):
+    """Read the first value of every column parameter per emitter; runs in a worker
+
+    Returns:
+        tuple: (file_path, rows, error message or None) with one list of
+            values (None if missing) per emitter, in COLUMN_PARAMETERS order
+    """
+    try:
+        document = read_effect(file_path)
+        rows = [[None] * len(COLUMN_PARAMETERS) for _ in range(document.emitter_count)]
+        columns = {key: number for number, key in enumerate(COLUMN_PARAMETERS)}
+        for entry in document.entries:
+            column = columns.get(entry.key)
+            if column is not None and rows[entry.emitter][column] is None:
+                rows[entry.emitter][column] = entry.number()
+        return file_path, rows, None
+    except Exception as e:
+        return file_path, [], str(e)
+
+
+def catalog_rows(catalog):
+    """Yield (file_path, rows, None) for every file in an EffectCatalog, without reparsing"""
+    columns = {key: number for number, key in enumerate(COLUMN_PARAMETERS)}
+    placeholders = ", ".join("?" for _ in COLUMN_PARAMETERS)
+    files = catalog.connection.execute("SELECT id, path, emitters FROM files ORDER BY path").fetchall()
+    for file_id, path, emitters in files:
+        rows = [[None] * len(COLUMN_PARAMETERS) for _ in range(emitters)]
+        for emitter, key, value in catalog.connection.execute(
+                f"SELECT emitter, key, value FROM entries WHERE file_id = ? AND key IN ({placeholders}) "
+                f"ORDER BY char_start", [file_id] + COLUMN_PARAMETERS):
+            column = columns[key]
+            if rows[emitter][column] is None:
+                rows[emitter][column] = value
+        yield path, rows, None
+
+
+def write_columns(file_rows, out_dir):
+    """Write per-emitter rows as one .npy array per parameter
+
+    Args:
+        file_rows (iterable): (file_path, rows, error) tuples, see extract_rows
+        out_dir (str): Folder for the column files
+
+    Returns:
+        tuple: (number of emitter rows written, list of (file_path, error)
+            for files that could not be read)
+    """
+    files = []
+    file_index = []
+    emitter_index = []
+    values = []
+    errors = []
+    for file_path, rows, error in file_rows:
+        if error:
+            errors.append((file_path, error))
+            continue
+        if not rows:
+            continue
+        for emitter, row in enumerate(rows):
+            file_index.append(len(files))
+            emitter_index.append(emitter)
+            values.append(row)
+        files.append(file_path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    table = np.array(values, dtype=np.float64).reshape(len(values), len(COLUMN_PARAMETERS))
+    for column, key in enumerate(COLUMN_PARAMETERS):
+        np.save(os.path.join(out_dir, f"{key}.npy"), np.ascontiguousarray(table[:, column]))
+    np.save(os.path.join(out_dir, "file_index.npy"), np.array(file_index, dtype=np.int32))
+    np.save(os.path.join(out_dir, "emitter_index.npy"), np.array(emitter_index, dtype=np.int32))
+    with open(os.path.join(out_dir, FILES_NAME), 'w') as file:
+        json.dump(files, file, indent=1)
+    return len(values), errors
+
+
+def export_columns(paths, out_dir, jobs=None):
+    """Parse effect files in parallel and write the column store
+
+    Returns:
+        tuple: (number of emitter rows written, list of (file_path, error))
+    """
+    files = find_effect_files(paths)
+    return write_columns(run_parallel(extract_rows, files, jobs), out_dir)
+
+
+class ColumnStore:
+    """Read-only view of a column store; every column is memory-mapped on first use"""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, FILES_NAME), 'r') as file:
+            self.files = json.load(file)
+        self.file_index = self._load("file_index")
+        self.emitter_index = self._load("emitter_index")
+        self._columns = {}
+
+    def _load(self, name):
+        return np.load(os.path.join(self.store_dir, f"{name}.npy"), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.file_index)
+
+    def column(self, key):
+        """Return the values of a parameter for every emitter (NaN if missing)"""
+        if key not in self._columns:
+            if key not in COLUMN_PARAMETERS:
+                raise KeyError(f"Unknown parameter '{key}'")
+            self._columns[key] = self._load(key)
+        return self._columns[key]
+
+    def summary(self, keys=None):
+        """Return count, mean, std, min, percentiles and max for each parameter
+
+        Returns:
+            dict: {key: {statistic: value}}; parameters with no values are left out
+        """
+        report = {}
+        for key in keys or COLUMN_PARAMETERS:
+            values = self.column(key)
+            present = values[~np.isnan(values)]
+            if not present.size:
+                continue
+            p5, p50, p95 = np.percentile(present, [5, 50, 95])
+            report[key] = {
+                "count": int(present.size),
+                "mean": float(present.mean()),
+                "std": float(present.std()),
+                "min": float(present.min()),
+                "p5": float(p5),
+                "median": float(p50),
+                "p95": float(p95),
+                "max": float(present.max()),
+            }
+        return report
+
+    def histogram(self, key, bins=20):
+        """Return (counts, bin_edges) for a parameter's values"""
+        values = self.column(key)
+        return np.histogram(values[~np.isnan(values)], bins=bins)
+
+    def outliers(self, key, threshold=3.5):
+        """Find emitters whose value is far from the median of the corpus
+
+        Uses the modified z-score (median absolute deviation), which is not
+        thrown off by the outliers themselves.
+
+        Returns:
+            list: (file_path, emitter, value, score) sorted by score, highest first
+        """
+        values = np.asarray(self.column(key))
+        present = ~np.isnan(values)
+        if not present.any():
+            return []
+
+        median = np.median(values[present])
+        deviation = np.abs(values - median)
+        mad = np.median(deviation[present])
+        if mad == 0:
+            # Most values identical; anything different stands out
+            scores = np.where(deviation > 0, np.inf, 0.0)
+        else:
+            scores = 0.6745 * deviation / mad
+
+        flagged = np.flatnonzero(present & (scores > threshold))
+        flagged = flagged[np.argsort(-scores[flagged], kind="stable")]
+        return [
+            (self.files[self.file_index[row]], int(self.emitter_index[row]), float(values[row]), float(scores[row]))
+            for row in flagged
+        ]
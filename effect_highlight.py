@@ -0,0 +1,152 @@
+# Highlight tag for each parameter, grouped by the editor tab that owns it
+HIGHLIGHT_GROUPS = {
+    "ORDNANCE COLOR": {
+        "Start_Red": "red_value",
+        "Start_Green": "green_value",
+        "Start_Blue": "blue_value",
+        "Start_Alpha": "alpha_value",
+        "Transition_Red": "red_value",
+        "Transition_Green": "green_value",
+        "Transition_Blue": "blue_value",
+        "Transition_Alpha": "alpha_value",
+        "End_Red": "red_value",
+        "End_Green": "green_value",
+        "End_Blue": "blue_value",
+        "End_Alpha": "alpha_value",
+    },
+    "SIZE": {
+        "Radius": "size_value",
+        "Final_Radius": "size_value",
+        "Width": "size_value",
+        "Start_Width": "size_value",
+    },
+    "EMISSION": {
+        "Emit_Per_Turn": "emission_value",
+        "Life": "emission_value",
+    },
+    "MOVEMENT": {
+        "Initial_Velocity_X": "movement_value",
+        "Initial_Velocity_Y": "movement_value",
+        "Initial_Velocity_Z": "movement_value",
+        "Velocity_Randomness": "movement_value",
+        "GravityScalar": "movement_value",
+        "GravityPC": "movement_value",
+    },
+    "VISUAL": {
+        "Blend_Mode": "visual_value",
+        "Anim_Speed": "visual_value",
+        "Cylinder_Length": "visual_value",
+    },
+    "TRAIL": {
+        "Num_Points": "trail_value",
+        "Wiggle_Factor": "trail_value",
+        "Disperse_Rate": "trail_value",
+    },
+}
+
+# Every tag that may be applied to a value, used to clear highlighting
+VALUE_TAGS = sorted({tag for group in HIGHLIGHT_GROUPS.values() for tag in group.values()})
+
+# Maximum number of ranges handed to Tk in a single tag_add call
+TAG_BATCH_SIZE = 2000
+
+# Lines per block when tracking which parts of the viewer are already tagged
+HIGHLIGHT_BLOCK_LINES = 200
+
+# Extra lines highlighted above and below the visible area
+HIGHLIGHT_MARGIN_LINES = 100
+
+# Reverse lookup from parameter name to (group, tag)
+_KEY_CLASSES = {
+    key: (group, tag)
+    for group, keys in HIGHLIGHT_GROUPS.items()
+    for key, tag in keys.items()
+}
+
+
+def classify_entries(document):
+    """Sort every editable value into highlight ranges in a single scan
+
+    Args:
+        document (EffectDocument): Parsed effect file
+
+    Returns:
+        dict: {group: {tag: [entry, ...]}}; Tk indices are taken from each
+            entry when tagging so they stay valid while values are edited
+    """
+    ranges = {group: {} for group in HIGHLIGHT_GROUPS}
+    for entry in document.entries:
+        key_class = _KEY_CLASSES.get(entry.key)
+        if key_class is None or entry.number() is None:
+            continue
+        group, tag = key_class
+        ranges[group].setdefault(tag, []).append(entry)
+    return ranges
+
+
+def add_tag_ranges(text_widget, tags, entries):
+    """Apply tags to the values of many entries with batched tag_add calls
+
+    Args:
+        text_widget (tk.Text): Widget holding the file text
+        tags (list): Tag names to add to every value
+        entries (list): EffectEntry objects to tag
+    """
+    for offset in range(0, len(entries), TAG_BATCH_SIZE):
+        indices = [index for entry in entries[offset:offset + TAG_BATCH_SIZE] for index in entry.tk_range()]
+        for tag in tags:
+            text_widget.tag_add(tag, *indices)
+
+
+class ViewportHighlighter:
+    """Apply highlight ranges lazily to the visible part of a Text widget
+
+    Ranges are bucketed into blocks of lines. Only blocks overlapping the
+    visible lines (plus a margin) are tagged, and each block is tagged at
+    most once until new ranges are set.
+    """
+
+    def __init__(self, text_widget, marker_tag="highlight"):
+        self.text_widget = text_widget
+        self.marker_tag = marker_tag
+        self.blocks = {}        # Block number -> {tag: [entry, ...]}
+        self.tagged = set()     # Block numbers already tagged in the widget
+        self._pending = None
+
+    def set_ranges(self, ranges):
+        """Replace the ranges to highlight and tag the visible area
+
+        Args:
+            ranges (dict): {tag: [entry, ...]} as returned for one group by
+                classify_entries
+        """
+        self.blocks = {}
+        self.tagged = set()
+        for tag, entries in ranges.items():
+            for entry in entries:
+                block = entry.line // HIGHLIGHT_BLOCK_LINES
+                self.blocks.setdefault(block, {}).setdefault(tag, []).append(entry)
+        self.update()
+
+    def schedule(self):
+        """Tag the visible area once the widget is idle, coalescing repeat calls"""
+        if self._pending is None:
+            self._pending = self.text_widget.after_idle(self.update)
+
+    def update(self):
+        """Tag every untagged block overlapping the visible lines"""
+        self._pending = None
+        if not self.blocks:
+            return
+
+        first_line = int(self.text_widget.index("@0,0").partition(".")[0])
+        last_line = int(self.text_widget.index(f"@0,{self.text_widget.winfo_height()}").partition(".")[0])
+        first_block = max(0, first_line - HIGHLIGHT_MARGIN_LINES) // HIGHLIGHT_BLOCK_LINES
+        last_block = (last_line + HIGHLIGHT_MARGIN_LINES) // HIGHLIGHT_BLOCK_LINES
+
+        for block in range(first_block, last_block + 1):
+            if block in self.tagged:
+                continue
+            self.tagged.add(block)
+            for tag, entries in self.blocks.get(block, {}).items():
+                add_tag_ranges(self.text_widget, [tag, self.marker_tag], entries)
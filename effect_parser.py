@@ -0,0 +1,272 @@
+import re
+
+# Marker used by the game files for values stored on the following "****1:" line
+VERSIONED_MARKER = "NUMBER_VERSION_2"
+
+# Every parameter the editor knows how to read and write, with its value type
+EDITABLE_PARAMETERS = {
+    # Color tab
+    "Start_Red": "float",
+    "Start_Green": "float",
+    "Start_Blue": "float",
+    "Start_Alpha": "float",
+    "Transition_Red": "float",
+    "Transition_Green": "float",
+    "Transition_Blue": "float",
+    "Transition_Alpha": "float",
+    "End_Red": "float",
+    "End_Green": "float",
+    "End_Blue": "float",
+    "End_Alpha": "float",
+    # Size tab
+    "Radius": "float",
+    "Final_Radius": "float",
+    "Width": "float",
+    "Start_Width": "float",
+    # Emission tab
+    "Emit_Per_Turn": "float",
+    "Life": "int",
+    # Movement tab
+    "Initial_Velocity_X": "float",
+    "Initial_Velocity_Y": "float",
+    "Initial_Velocity_Z": "float",
+    "Velocity_Randomness": "float",
+    "GravityScalar": "float",
+    "GravityPC": "float",
+    # Visual tab
+    "Blend_Mode": "int",
+    "Anim_Speed": "float",
+    "Cylinder_Length": "float",
+    # Trail tab
+    "Num_Points": "int",
+    "Wiggle_Factor": "float",
+    "Disperse_Rate": "float",
+}
+
+# Entries parsed between calls to a parse_effect progress callback
+PROGRESS_INTERVAL = 4096
+
+# One pattern for both forms found in effect files:
+#   Key value
+#   Key NUMBER_VERSION_2
+#   ****1: value
+_ENTRY_PATTERN = re.compile(
+    r'^[ \t]*(?P<key>[A-Za-z_]\w*)[ \t]+'
+    r'(?:' + VERSIONED_MARKER + r'[ \t]*\r?\n[ \t]*\*+1:[ \t]*(?P<versioned>\S+)'
+    r'|(?P<inline>\S+))',
+    re.MULTILINE
+)
+
+
+class EffectEntry:
+    """A single key/value pair found in an effect file"""
+
+    __slots__ = ("index", "key", "raw", "start", "end", "byte_start", "byte_end",
+                 "line", "column", "versioned", "emitter")
+
+    def __init__(self, index, key, raw, start, end, byte_start, byte_end, line, column, versioned, emitter):
+        self.index = index              # Position of the entry in EffectDocument.entries
+        self.key = key
+        self.raw = raw                  # Current value text; differs from the file while edited
+        self.start = start              # Character offsets of the value text in the file
+        self.end = end
+        self.byte_start = byte_start    # UTF-8 byte offsets of the value text
+        self.byte_end = byte_end
+        self.line = line                # 1-based line and 0-based column of the value,
+        self.column = column            # matching Tk text widget indices (kept current while edited)
+        self.versioned = versioned      # True for the NUMBER_VERSION_2 form
+        self.emitter = emitter          # Index of the emitter block holding the entry
+
+    def number(self):
+        """Return the value as a float, or None if it is not numeric"""
+        try:
+            return float(self.raw)
+        except ValueError:
+            return None
+
+    def tk_range(self):
+        """Return the Tk text indices spanning the value"""
+        return f"{self.line}.{self.column}", f"{self.line}.{self.column + len(self.raw)}"
+
+    def __repr__(self):
+        return f"EffectEntry({self.key}={self.raw!r} @ {self.start}:{self.end}, emitter {self.emitter})"
+
+
+class EffectDocument:
+    """Parsed effect file holding every key/value with its exact offsets"""
+
+    def __init__(self, text, entries, emitter_count):
+        self.text = text
+        self.entries = entries
+        self.emitter_count = emitter_count
+
+        # Index entries by key, keeping file order
+        self.by_key = {}
+        for entry in entries:
+            self.by_key.setdefault(entry.key, []).append(entry)
+
+        # Entries whose value has been changed since the text was last committed
+        self.dirty = {}         # Entry index -> entry
+        self.dirty_lines = {}   # Line -> {entry index: entry}
+
+    def entries_for(self, key):
+        """Return every entry for a key in file order"""
+        return self.by_key.get(key, [])
+
+    def keys(self):
+        """Return all keys present in the document"""
+        return self.by_key.keys()
+
+    def set_raw(self, entry, raw):
+        """Change the value text of an entry without rewriting the document text
+
+        The change is kept pending until commit. Later entries on the same
+        line have their columns shifted so their Tk indices stay valid.
+        """
+        delta = len(raw) - len(entry.raw)
+        entry.raw = raw
+
+        if delta:
+            index = entry.index + 1
+            while index < len(self.entries) and self.entries[index].line == entry.line:
+                self.entries[index].column += delta
+                index += 1
+
+        line_entries = self.dirty_lines.setdefault(entry.line, {})
+        if raw == self.text[entry.start:entry.end]:
+            self.dirty.pop(entry.index, None)
+            line_entries.pop(entry.index, None)
+            if not line_entries:
+                del self.dirty_lines[entry.line]
+        else:
+            self.dirty[entry.index] = entry
+            line_entries[entry.index] = entry
+
+    def line_text(self, line, line_start, text):
+        """Return a line of the committed text with pending values applied
+
+        Args:
+            line (int): 1-based line number
+            line_start (int): Character offset of the line in the committed text
+            text (str): The line as it appears in the committed text
+        """
+        line_entries = self.dirty_lines.get(line)
+        if not line_entries:
+            return text
+
+        for entry in sorted(line_entries.values(), key=lambda e: e.start, reverse=True):
+            text = text[:entry.start - line_start] + entry.raw + text[entry.end - line_start:]
+        return text
+
+    def render(self):
+        """Return the document text with every pending value applied"""
+        if not self.dirty:
+            return self.text
+
+        pieces = []
+        position = 0
+        for index in sorted(self.dirty):
+            entry = self.dirty[index]
+            pieces.append(self.text[position:entry.start])
+            pieces.append(entry.raw)
+            position = entry.end
+        pieces.append(self.text[position:])
+        return "".join(pieces)
+
+    def commit(self, text=None):
+        """Make the pending values part of the document text
+
+        Offsets are shifted in one pass over the entries instead of
+        reparsing the new text.
+
+        Args:
+            text (str, optional): The result of render(), if already built
+        """
+        if not self.dirty:
+            return
+
+        text = text if text is not None else self.render()
+        delta = 0
+        byte_delta = 0
+        for entry in self.entries:
+            length = entry.end - entry.start
+            byte_length = entry.byte_end - entry.byte_start
+            entry.start += delta
+            entry.byte_start += byte_delta
+
+            if entry.index in self.dirty:
+                delta += len(entry.raw) - length
+                byte_delta += len(entry.raw.encode("utf-8")) - byte_length
+                length = len(entry.raw)
+                byte_length = len(entry.raw.encode("utf-8"))
+
+            entry.end = entry.start + length
+            entry.byte_end = entry.byte_start + byte_length
+
+        self.text = text
+        self.dirty = {}
+        self.dirty_lines = {}
+
+
+def parse_effect(text, progress=None):
+    """Parse effect file text into an EffectDocument in a single pass
+
+    Emitter blocks are not delimited in the file format, so a new emitter is
+    started whenever a key repeats within the current block. This splits
+    concatenated effect dumps into their individual emitters.
+
+    Args:
+        text (str): Full contents of an effect file
+        progress (callable, optional): Called every PROGRESS_INTERVAL entries
+            with the fraction of the text parsed so far
+
+    Returns:
+        EffectDocument: Document model indexing every key/value pair
+    """
+    entries = []
+    emitter = 0
+    emitter_keys = set()
+
+    # Byte offsets match character offsets for plain ASCII files. Otherwise
+    # the byte position is advanced incrementally as the scan moves forward.
+    ascii_only = text.isascii()
+    byte_pos = 0
+    char_pos = 0
+
+    # Line and column are tracked the same way, counting only new text
+    line = 1
+    line_start = 0
+    line_pos = 0
+
+    for match in _ENTRY_PATTERN.finditer(text):
+        key = match.group("key")
+        versioned = match.group("versioned") is not None
+        group = "versioned" if versioned else "inline"
+        start, end = match.span(group)
+
+        if key in emitter_keys:
+            emitter += 1
+            emitter_keys = set()
+        emitter_keys.add(key)
+
+        if ascii_only:
+            byte_start, byte_end = start, end
+        else:
+            byte_pos += len(text[char_pos:start].encode("utf-8"))
+            byte_start = byte_pos
+            byte_end = byte_start + len(text[start:end].encode("utf-8"))
+            byte_pos, char_pos = byte_end, end
+
+        newlines = text.count("\n", line_pos, start)
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", line_pos, start) + 1
+        line_pos = start
+
+        entries.append(EffectEntry(len(entries), key, match.group(group), start, end, byte_start, byte_end,
+                                   line, start - line_start, versioned, emitter))
+
+        if progress and len(entries) % PROGRESS_INTERVAL == 0:
+            progress(end / len(text))
+
+    return EffectDocument(text, entries, emitter + 1 if entries else 0)
@@ -0,0 +1,178 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from PIL import ImageColor, ImageTk
+
+from frame_cache import DEFAULT_CACHE_BYTES, FrameCache, animation_key
+from particle_sim import DEFAULT_PARAMETERS, ParticleRenderer, ParticleSimulation
+from preview_compositor import BLEND_MODE_NAMES, blend_mode
+from trail_sim import TrailSimulation
+
+# Preview size in pixels
+PREVIEW_WIDTH = 320
+PREVIEW_HEIGHT = 160
+
+# Time between preview frames in milliseconds; each frame is one game turn
+FRAME_INTERVAL_MS = 33
+
+# Seed for the preview's random numbers, so a restart replays the same effect
+PREVIEW_SEED = 1
+
+# Turns played before the preview loops back to the start
+PREVIEW_LOOP_TURNS = 150
+
+
+class EffectPreview:
+    """Animated particle or trail preview of one emitter, drawn on a canvas
+
+    Frames are cached by a hash of everything that decides them, so
+    replaying, scrubbing or returning to earlier values does not simulate
+    again. A frame that is not cached is simulated from the first turn with
+    the current values.
+    """
+
+    def __init__(self, parent, colors, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.root = parent.winfo_toplevel()
+        self.frame = ttk.LabelFrame(parent, text="EFFECT PREVIEW", padding="5", style="Military.TLabelframe")
+
+        self.canvas = tk.Canvas(self.frame, width=PREVIEW_WIDTH, height=PREVIEW_HEIGHT,
+                                bg=colors['background'], highlightthickness=0)
+        self.canvas.pack(pady=2)
+
+        # One Tk image, repainted in place every frame
+        self.photo = ImageTk.PhotoImage("RGB", (PREVIEW_WIDTH, PREVIEW_HEIGHT))
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+
+        # Scrubbing pauses the animation on the chosen turn
+        self.turn_var = tk.IntVar(value=0)
+        ttk.Scale(self.frame, from_=0, to=PREVIEW_LOOP_TURNS, variable=self.turn_var,
+                  orient=tk.HORIZONTAL, command=self.scrub).pack(fill=tk.X, pady=2)
+
+        controls = ttk.Frame(self.frame, style="Military.TFrame")
+        controls.pack(fill=tk.X)
+
+        self.play_button = ttk.Button(controls, text="PAUSE", command=self.toggle, style="Military.TButton")
+        self.play_button.pack(side=tk.LEFT, padx=2)
+        ttk.Button(controls, text="RESTART", command=self.restart, style="Military.TButton").pack(side=tk.LEFT, padx=2)
+
+        self.info_var = tk.StringVar(value="NO EFFECT LOADED")
+        ttk.Label(controls, textvariable=self.info_var, style="Value.TLabel").pack(side=tk.RIGHT, padx=5)
+
+        self.cache_var = tk.StringVar(value="")
+        ttk.Label(self.frame, textvariable=self.cache_var, style="Value.TLabel").pack(fill=tk.X)
+
+        self.particles = ParticleSimulation(dict(DEFAULT_PARAMETERS), seed=PREVIEW_SEED)
+        self.trails = TrailSimulation(dict(DEFAULT_PARAMETERS), seed=PREVIEW_SEED)
+        self.simulation = self.particles
+        self.renderer = ParticleRenderer(PREVIEW_WIDTH, PREVIEW_HEIGHT,
+                                         background=ImageColor.getrgb(colors['background']))
+        self.cache = FrameCache(cache_bytes)
+        self.params = dict(DEFAULT_PARAMETERS)
+        self.key = None             # Animation shown now
+        self.simulated_key = None   # Animation the simulation's state belongs to
+        self.turn = 0
+        self.loaded = False
+        self.running = False
+        self._after_id = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def set_parameters(self, params, restart=False, trail=None):
+        """Show new parameter values, optionally starting the effect over
+
+        Args:
+            params (dict): Emitter parameter values
+            restart (bool): Start the effect over from its first turn
+            trail (bool, optional): Draw trails instead of particles; None
+                keeps the current kind
+        """
+        if trail is not None:
+            self.simulation = self.trails if trail else self.particles
+        kind = "trails" if self.simulation is self.trails else "particles"
+        self.params = params
+        self.key = animation_key(params, PREVIEW_WIDTH, PREVIEW_HEIGHT, PREVIEW_SEED, kind)
+        if restart:
+            self.turn = 0
+
+        if not self.loaded:
+            self.loaded = True
+            self.start()
+        elif not self.running:
+            self.show_turn(self.turn)
+
+    def start(self):
+        """Start animating"""
+        self.running = True
+        self.play_button.config(text="PAUSE")
+        if self._after_id is None:
+            self._after_id = self.root.after(FRAME_INTERVAL_MS, self.tick)
+
+    def stop(self):
+        """Pause on the current frame"""
+        self.running = False
+        self.play_button.config(text="PLAY")
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def toggle(self):
+        """Pause or resume the animation"""
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    def restart(self):
+        """Start the effect over from its first turn"""
+        self.show_turn(0)
+
+    def scrub(self, value):
+        """Pause on the turn picked with the scrub bar"""
+        if not self.loaded:
+            return
+        self.stop()
+        turn = int(float(value))
+        if turn != self.turn:
+            self.show_turn(turn)
+
+    def tick(self):
+        """Advance one game turn and draw it"""
+        self._after_id = None
+        started = time.perf_counter()
+        self.show_turn(self.turn + 1 if self.turn < PREVIEW_LOOP_TURNS else 0)
+
+        # Keep a steady frame rate by taking the drawing time off the wait
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        if self.running:
+            self._after_id = self.root.after(max(1, FRAME_INTERVAL_MS - elapsed_ms), self.tick)
+
+    def render_turn(self, turn):
+        """Return the image and sprite count for a turn, rendering it if not cached"""
+        cached = self.cache.get((self.key, turn))
+        if cached is not None:
+            return cached
+
+        simulation = self.simulation
+        if self.simulated_key != self.key or simulation.turn > turn:
+            simulation.set_parameters(self.params)
+            simulation.reset()
+            self.simulated_key = self.key
+        simulation.step(turn - simulation.turn)
+
+        frame = (self.renderer.render(simulation), simulation.count)
+        self.cache.put((self.key, turn), frame, PREVIEW_WIDTH * PREVIEW_HEIGHT * 3)
+        return frame
+
+    def show_turn(self, turn):
+        """Draw a turn of the current animation onto the canvas"""
+        self.turn = turn
+        image, count = self.render_turn(turn)
+        self.photo.paste(image)
+        self.turn_var.set(turn)
+
+        kind = "TRAILS" if self.simulation is self.trails else "PARTICLES"
+        mode = BLEND_MODE_NAMES[blend_mode(self.params["Blend_Mode"])].upper()
+        self.info_var.set(f"TURN {turn}  {kind} {count}  {mode}")
+        self.cache_var.set(self.cache.summary())
@@ -0,0 +1,80 @@
+import math
+from array import array
+
+from effect_parser import EDITABLE_PARAMETERS
+from effect_writer import format_value
+
+# Marks a parameter an emitter does not set in the entry index columns
+NO_ENTRY = -1
+
+
+class EmitterTable:
+    """Every emitter of a document as one row of a column table
+
+    Each editable parameter has a column of values, NaN where an emitter
+    does not set it, and a column of the indices of the entries holding
+    them. Reading or writing one emitter only visits that emitter's
+    entries, however many emitters the file has.
+    """
+
+    def __init__(self, document, keys=EDITABLE_PARAMETERS):
+        self.document = document
+        self.keys = list(keys)
+        count = document.emitter_count
+        self.values = {key: array('d', [math.nan]) * count for key in self.keys}
+        self.entry_indices = {key: array('q', [NO_ENTRY]) * count for key in self.keys}
+        self.changed_rows = set()   # Emitters written since the last clear_changes
+
+        # The first numeric entry of a key in an emitter is the one edited
+        for entry in document.entries:
+            indices = self.entry_indices.get(entry.key)
+            if indices is None or indices[entry.emitter] != NO_ENTRY:
+                continue
+            value = entry.number()
+            if value is not None:
+                indices[entry.emitter] = entry.index
+                self.values[entry.key][entry.emitter] = value
+
+    def __len__(self):
+        return self.document.emitter_count
+
+    def entry(self, row, key):
+        """Return the entry holding an emitter's value for a key, or None"""
+        index = self.entry_indices[key][row]
+        return None if index == NO_ENTRY else self.document.entries[index]
+
+    def value(self, row, key):
+        """Return an emitter's value for a key, or None if it does not set it"""
+        value = self.values[key][row]
+        return None if math.isnan(value) else value
+
+    def has(self, row, key):
+        """Return True if an emitter sets a key"""
+        return self.entry_indices[key][row] != NO_ENTRY
+
+    def row(self, row):
+        """Return the values an emitter sets, keyed by parameter"""
+        return {key: self.values[key][row] for key in self.keys if self.entry_indices[key][row] != NO_ENTRY}
+
+    def set(self, row, key, value):
+        """Write a value into one emitter's entry, pending until the document commits
+
+        Returns:
+            EffectEntry: The changed entry, or None if the emitter does not
+                set the key or already holds this value
+        """
+        entry = self.entry(row, key)
+        if entry is None:
+            return None
+        raw = format_value(key, value)
+        if entry.raw == raw:
+            return None
+
+        self.document.set_raw(entry, raw)
+        self.values[key][row] = float(raw)
+        self.changed_rows.add(row)
+        return entry
+
+    def clear_changes(self):
+        """Forget which emitters were written, e.g. once the document is saved"""
+        self.changed_rows = set()
@@ -0,0 +1,144 @@
+import fnmatch
+import re
+
+import numpy as np
+
+from effect_batch import read_effect, write_effect
+from effect_parser import EDITABLE_PARAMETERS
+from effect_table import NO_ENTRY, EmitterTable
+
+# Transform operators and what they do to each selected value
+TRANSFORM_OPERATIONS = {
+    "*=": "scale",
+    "+=": "offset",
+    "-=": "offset",
+    "<=": "clamp to at most",
+    ">=": "clamp to at least",
+    "=": "set",
+}
+
+# PARAMETERS OPERATOR AMOUNT, e.g. "Radius,Final_Radius*=1.5" or "*_Alpha<=0.8"
+_TRANSFORM_PATTERN = re.compile(r'^\s*([\w*?\[\],]+?)\s*(\*=|\+=|-=|<=|>=|=)\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)\s*$')
+
+
+def select_parameters(selector):
+    """Return the editable parameters matching a comma-separated list of names or wildcards
+
+    Raises:
+        ValueError: If a name or pattern matches no editable parameter
+    """
+    keys = []
+    for pattern in selector.split(","):
+        matches = fnmatch.filter(EDITABLE_PARAMETERS, pattern)
+        if not matches:
+            raise ValueError(f"No parameter matches '{pattern}'")
+        keys.extend(key for key in matches if key not in keys)
+    return keys
+
+
+def parse_transform(text):
+    """Parse a transform such as "Radius,Final_Radius*=1.5" into (keys, operator, amount)"""
+    match = _TRANSFORM_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Invalid transform '{text}', expected e.g. Radius*=1.5 or Emit_Per_Turn<=3")
+    operator = match.group(2)
+    amount = float(match.group(3))
+    if operator == "-=":
+        operator, amount = "+=", -amount
+    return tuple(select_parameters(match.group(1))), operator, amount
+
+
+def apply_operation(values, operator, amount):
+    """Apply one transform operator to an array of values, returning a new array"""
+    if operator == "*=":
+        return values * amount
+    if operator == "+=":
+        return values + amount
+    if operator == "<=":
+        return np.minimum(values, amount)
+    if operator == ">=":
+        return np.maximum(values, amount)
+    return np.full_like(values, amount)
+
+
+def plan_transforms(table, transforms, rows=None):
+    """Work out the values a list of transforms gives each emitter
+
+    Each parameter's value column is transformed as a whole, in order, so
+    transforms naming the same parameter compound. Integer parameters are
+    rounded once at the end.
+
+    Args:
+        table (EmitterTable): Emitters to transform
+        transforms (list): (keys, operator, amount) tuples from parse_transform
+        rows (list, optional): Emitters to change; defaults to all of them
+
+    Returns:
+        list: (row, key, value) for every value that changes
+    """
+    columns = {}
+    for keys, operator, amount in transforms:
+        for key in keys:
+            if key not in columns:
+                columns[key] = np.frombuffer(table.values[key], dtype=np.float64)
+            columns[key] = apply_operation(columns[key], operator, amount)
+    return column_changes(table, columns, rows)
+
+
+def column_changes(table, columns, rows=None):
+    """Compare new value columns with a table, rounding integer parameters
+
+    Args:
+        table (EmitterTable): Emitters the columns were computed from
+        columns (dict): Parameter name -> array of new values, one per emitter
+        rows (list, optional): Emitters to change; defaults to all of them
+
+    Returns:
+        list: (row, key, value) for every value that changes
+    """
+    selected = None
+    if rows is not None:
+        selected = np.zeros(len(table), dtype=bool)
+        selected[list(rows)] = True
+
+    changes = []
+    for key, column in columns.items():
+        if EDITABLE_PARAMETERS[key] == "int":
+            column = np.rint(column)
+        old = np.frombuffer(table.values[key], dtype=np.float64)
+        changed = (np.frombuffer(table.entry_indices[key], dtype=np.int64) != NO_ENTRY) & (column != old)
+        if selected is not None:
+            changed &= selected
+        changes.extend((int(row), key, float(column[row])) for row in np.flatnonzero(changed))
+    return changes
+
+
+def transform_file(job):
+    """Apply transforms to one effect file; runs in a worker process
+
+    Args:
+        job (tuple): (file_path, transforms, dry_run)
+
+    Returns:
+        dict: Summary with the file path, the number of values changed per
+            parameter and an error message if the file could not be processed
+    """
+    file_path, transforms, dry_run = job
+    result = {"file": file_path, "changes": {}, "error": None}
+    try:
+        document = read_effect(file_path)
+        table = EmitterTable(document)
+        changes = plan_transforms(table, transforms)
+        if not changes:
+            return result
+
+        for row, key, value in changes:
+            if table.set(row, key, value) is not None:
+                result["changes"][key] = result["changes"].get(key, 0) + 1
+
+        # Every changed value is spliced into the text in one pass
+        if result["changes"] and not dry_run:
+            write_effect(file_path, document.render())
+    except Exception as e:
+        result["error"] = str(e)
+    return result
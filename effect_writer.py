@@ -0,0 +1,63 @@
+from effect_parser import EDITABLE_PARAMETERS
+
+
+def format_value(key, value):
+    """Format a parameter value the way the game files store it
+
+    Args:
+        key (str): Parameter name, used to look up the value type
+        value (float): New value for the parameter
+
+    Returns:
+        str: Value text ready to be written into the file
+    """
+    if EDITABLE_PARAMETERS.get(key) == "int":
+        return f"{int(value)}"
+    return f"{value:.6f}"
+
+
+def plan_edits(document, assignments):
+    """Compute the splice edits needed to write new parameter values
+
+    Every numeric occurrence of an assigned key is replaced. Occurrences
+    whose text would not change are skipped.
+
+    Args:
+        document (EffectDocument): Parsed file to edit
+        assignments (dict): Mapping of parameter name to new value
+
+    Returns:
+        list: (start, end, replacement) tuples sorted by start offset
+    """
+    edits = []
+    for key, value in assignments.items():
+        replacement = format_value(key, value)
+        for entry in document.entries_for(key):
+            if entry.raw != replacement and entry.number() is not None:
+                edits.append((entry.start, entry.end, replacement))
+
+    edits.sort()
+    return edits
+
+
+def splice(text, edits):
+    """Apply sorted, non-overlapping edits to text in a single join
+
+    Args:
+        text (str): Original text
+        edits (list): (start, end, replacement) tuples sorted by start offset
+
+    Returns:
+        str: New text with every untouched character left as-is
+    """
+    if not edits:
+        return text
+
+    pieces = []
+    position = 0
+    for start, end, replacement in edits:
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
@@ -0,0 +1,196 @@
+import hashlib
+
+import numpy as np
+
+from effect_batch import find_effect_files, run_parallel, write_effect
+from effect_parser import parse_effect
+from effect_table import NO_ENTRY, EmitterTable
+
+# Color phases and the channels recolored in each; opacity is left alone
+COLOR_PHASES = ("Start", "Transition", "End")
+RGB_CHANNELS = ("Red", "Green", "Blue")
+
+# Faction colors, matching the editor's color presets
+FACTION_COLORS = {
+    "pink": (0.7, 0.3, 0.5),
+    "blue": (0.2, 0.3, 0.8),
+    "green": (0.3, 0.7, 0.3),
+    "red": (0.8, 0.2, 0.2),
+}
+
+
+def rgb_to_hsv(rgb):
+    """Convert an (N, 3) array of RGB colors to HSV, hue in turns (0-1)"""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    red, green, blue = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    high = rgb.max(axis=1)
+    delta = high - rgb.min(axis=1)
+
+    saturation = np.where(high > 0, delta / np.where(high > 0, high, 1.0), 0.0)
+    safe = np.where(delta > 0, delta, 1.0)
+    hue = np.where(red == high, (green - blue) / safe,
+                   np.where(green == high, 2.0 + (blue - red) / safe, 4.0 + (red - green) / safe))
+    hue = np.where(delta > 0, (hue / 6.0) % 1.0, 0.0)
+    return np.stack([hue, saturation, high], axis=1)
+
+
+def hsv_to_rgb(hsv):
+    """Convert an (N, 3) array of HSV colors, hue in turns, back to RGB"""
+    hue, saturation, value = hsv[:, 0] % 1.0, hsv[:, 1], hsv[:, 2]
+    sector = np.floor(hue * 6.0)
+    fraction = hue * 6.0 - sector
+    sector = sector.astype(np.int64) % 6
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - saturation * fraction)
+    t = value * (1.0 - saturation * (1.0 - fraction))
+    return np.stack([
+        np.choose(sector, [value, q, p, p, t, value]),
+        np.choose(sector, [t, value, value, q, p, p]),
+        np.choose(sector, [p, p, t, value, value, q]),
+    ], axis=1)
+
+
+def parse_color(text):
+    """Parse a faction name or #RRGGBB color into an RGB tuple (0-1)
+
+    Raises:
+        ValueError: If the text is neither
+    """
+    if text.lower() in FACTION_COLORS:
+        return FACTION_COLORS[text.lower()]
+    digits = text.lstrip("#")
+    if len(digits) != 6:
+        raise ValueError(f"Unknown color '{text}', use {', '.join(FACTION_COLORS)} or #RRGGBB")
+    try:
+        return tuple(int(digits[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    except ValueError:
+        raise ValueError(f"Unknown color '{text}', use {', '.join(FACTION_COLORS)} or #RRGGBB")
+
+
+def recolor(rgb, hue=0.0, saturation=1.0, value=1.0, target=None):
+    """Shift an array of colors in HSV space
+
+    Args:
+        rgb (ndarray): (N, 3) colors
+        hue (float): Hue rotation in degrees
+        saturation (float): Saturation multiplier
+        value (float): Brightness multiplier
+        target (tuple, optional): RGB color whose hue replaces every
+            color's hue before the rotation; greys stay grey
+
+    Returns:
+        ndarray: (N, 3) recolored colors, each channel 0-1
+    """
+    hsv = rgb_to_hsv(rgb)
+    if target is not None:
+        hsv[:, 0] = rgb_to_hsv(np.array([target]))[0, 0]
+    hsv[:, 0] += hue / 360.0
+    hsv[:, 1] = np.clip(hsv[:, 1] * saturation, 0.0, 1.0)
+    hsv[:, 2] = np.clip(hsv[:, 2] * value, 0.0, 1.0)
+    return np.clip(hsv_to_rgb(hsv), 0.0, 1.0)
+
+
+def gather_colors(table):
+    """Collect every complete RGB triple of a table's emitters
+
+    Returns:
+        tuple: (rows, phases, rgb) arrays; phases index COLOR_PHASES
+    """
+    rows, phases, colors = [], [], []
+    for number, phase in enumerate(COLOR_PHASES):
+        keys = [f"{phase}_{channel}" for channel in RGB_CHANNELS]
+        present = np.logical_and.reduce(
+            [np.frombuffer(table.entry_indices[key], dtype=np.int64) != NO_ENTRY for key in keys])
+        found = np.flatnonzero(present)
+        rows.append(found)
+        phases.append(np.full(len(found), number))
+        colors.append(np.stack([np.frombuffer(table.values[key], dtype=np.float64)[found] for key in keys], axis=1))
+    return np.concatenate(rows), np.concatenate(phases), np.concatenate(colors)
+
+
+def color_changes(table, rows, phases, rgb):
+    """Return the (row, key, value) changes that write recolored triples back
+
+    Values that are the same once written with six decimals are skipped.
+    """
+    changes = []
+    for number, phase in enumerate(COLOR_PHASES):
+        in_phase = np.flatnonzero(phases == number)
+        for column, channel in enumerate(RGB_CHANNELS):
+            key = f"{phase}_{channel}"
+            new = rgb[in_phase, column]
+            old = np.frombuffer(table.values[key], dtype=np.float64)[rows[in_phase]]
+            for index in np.flatnonzero(np.round(new, 6) != np.round(old, 6)):
+                changes.append((int(rows[in_phase[index]]), key, float(new[index])))
+    return changes
+
+
+def read_colors(file_path):
+    """Read the color triples of one effect file; runs in a worker process
+
+    Returns:
+        tuple: (file_path, sha1 of the content, rows, phases, rgb, error message or None)
+    """
+    try:
+        with open(file_path, 'rb') as file:
+            sha1 = hashlib.sha1(file.read()).hexdigest()
+        # Decode the same way the editor reads files
+        with open(file_path, 'r') as file:
+            rows, phases, rgb = gather_colors(EmitterTable(parse_effect(file.read())))
+        return file_path, sha1, rows, phases, rgb, None
+    except Exception as e:
+        return file_path, None, None, None, None, str(e)
+
+
+def write_colors(job):
+    """Write recolored triples into one effect file; runs in a worker process
+
+    Args:
+        job (tuple): (file_path, sha1 when read, rows, phases, rgb, dry_run)
+
+    Returns:
+        dict: Summary with the file path, the number of values changed per
+            parameter and an error message if the file could not be processed
+    """
+    file_path, sha1, rows, phases, rgb, dry_run = job
+    result = {"file": file_path, "changes": {}, "error": None}
+    try:
+        with open(file_path, 'rb') as file:
+            if hashlib.sha1(file.read()).hexdigest() != sha1:
+                raise ValueError("file changed while recoloring")
+        with open(file_path, 'r') as file:
+            document = parse_effect(file.read())
+        table = EmitterTable(document)
+        for row, key, value in color_changes(table, rows, phases, rgb):
+            if table.set(row, key, value) is not None:
+                result["changes"][key] = result["changes"].get(key, 0) + 1
+
+        if result["changes"] and not dry_run:
+            write_effect(file_path, document.render())
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def recolor_files(paths, hue=0.0, saturation=1.0, value=1.0, target=None, jobs=None, dry_run=False):
+    """Recolor every effect under paths
+
+    Colors are read from all files in parallel, shifted together as one
+    array, then written back in parallel.
+
+    Returns:
+        tuple: (files found, results from write_colors, number of colors shifted)
+    """
+    files = find_effect_files(paths)
+    read = run_parallel(read_colors, files, jobs)
+
+    failed = [{"file": path, "changes": {}, "error": error} for path, _, _, _, _, error in read if error]
+    read = [item for item in read if not item[5]]
+    if not read:
+        return files, failed, 0
+
+    rgb = recolor(np.concatenate([item[4] for item in read]), hue, saturation, value, target)
+    split = np.split(rgb, np.cumsum([len(item[4]) for item in read])[:-1])
+    work = [(path, sha1, rows, phases, colors, dry_run)
+            for (path, sha1, rows, phases, _, _), colors in zip(read, split)]
+    return files, failed + run_parallel(write_colors, work, jobs), len(rgb)
@@ -0,0 +1,141 @@
+import os
+import queue
+import threading
+
+from effect_highlight import classify_entries
+from effect_parser import parse_effect
+from effect_table import EmitterTable
+
+# Characters read from disk between progress updates
+READ_CHUNK_SIZE = 1024 * 1024
+
+# How often the Tk main loop checks for worker results, in milliseconds
+POLL_INTERVAL_MS = 50
+
+# Share of the progress bar used by reading; parsing fills the rest
+READ_PROGRESS_SHARE = 0.3
+
+
+class LoadCancelled(Exception):
+    """Raised inside a worker when its load has been superseded"""
+
+
+class LoadedFile:
+    """Everything produced by loading an effect file in the background"""
+
+    def __init__(self, file_path, content, document, highlight_ranges, table):
+        self.file_path = file_path
+        self.content = content
+        self.document = document
+        self.highlight_ranges = highlight_ranges
+        self.table = table
+
+
+class BackgroundLoader:
+    """Read and parse effect files on a worker thread
+
+    Workers never touch Tk. They post messages to a queue that is drained
+    from the Tk main loop with root.after, so callbacks always run on the
+    main thread. Starting a new load cancels the one in progress, and
+    messages from cancelled loads are dropped.
+    """
+
+    def __init__(self, root, on_progress, on_loaded, on_error):
+        self.root = root
+        self.on_progress = on_progress  # Called with (file_path, fraction)
+        self.on_loaded = on_loaded      # Called with a LoadedFile
+        self.on_error = on_error        # Called with (file_path, exception)
+
+        self.messages = queue.Queue()
+        self.job = 0
+        self.cancel_event = None
+        self._polling = False
+
+    @property
+    def busy(self):
+        return self.cancel_event is not None
+
+    def load(self, file_path):
+        """Start loading a file, cancelling any load in progress"""
+        self.cancel()
+        self.job += 1
+        self.cancel_event = threading.Event()
+
+        worker = threading.Thread(
+            target=self._work,
+            args=(self.job, file_path, self.cancel_event),
+            daemon=True
+        )
+        worker.start()
+
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def cancel(self):
+        """Cancel the load in progress, if any"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_event = None
+
+    def _work(self, job, file_path, cancel_event):
+        """Read, parse, classify and tabulate a file; runs on the worker thread"""
+        def report(fraction):
+            if cancel_event.is_set():
+                raise LoadCancelled()
+            self.messages.put(("progress", job, file_path, fraction))
+
+        try:
+            size = max(1, os.path.getsize(file_path))
+            chunks = []
+            read = 0
+            with open(file_path, 'r') as file:
+                while True:
+                    chunk = file.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    read += len(chunk)
+                    report(min(1.0, read / size) * READ_PROGRESS_SHARE)
+            content = "".join(chunks)
+
+            document = parse_effect(
+                content,
+                progress=lambda fraction: report(READ_PROGRESS_SHARE + fraction * (1 - READ_PROGRESS_SHARE))
+            )
+            highlight_ranges = classify_entries(document)
+            table = EmitterTable(document)
+            report(1.0)
+
+            self.messages.put(("loaded", job, file_path,
+                               LoadedFile(file_path, content, document, highlight_ranges, table)))
+        except LoadCancelled:
+            pass
+        except Exception as e:
+            self.messages.put(("error", job, file_path, e))
+
+    def _poll(self):
+        """Deliver queued worker messages on the Tk main thread"""
+        while True:
+            try:
+                kind, job, file_path, payload = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            # Ignore anything from a load that has since been replaced
+            if job != self.job:
+                continue
+
+            if kind == "progress":
+                self.on_progress(file_path, payload)
+            elif kind == "loaded":
+                self.cancel_event = None
+                self.on_loaded(payload)
+            elif kind == "error":
+                self.cancel_event = None
+                self.on_error(file_path, payload)
+
+        if self.busy:
+            self.root.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
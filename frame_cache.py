@@ -0,0 +1,76 @@
+import hashlib
+from collections import OrderedDict
+
+# Memory the preview frame cache may use before evicting frames, in bytes
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def animation_key(params, width, height, seed, kind):
+    """Hash everything that decides what an animation's frames look like
+
+    Args:
+        params (dict): Emitter parameter values
+        width, height (int): Frame size in pixels
+        seed (int): Simulation random seed
+        kind (str): Simulation kind, e.g. "particles" or "trails"
+
+    Returns:
+        str: Hex digest identifying the animation
+    """
+    text = repr((sorted(params.items()), width, height, seed, kind))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class FrameCache:
+    """Least recently used cache of rendered frames with a memory ceiling"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()     # key -> (value, size), oldest first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def get(self, key):
+        """Return a cached value and mark it recently used, or None"""
+        item = self.frames.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.frames.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key, value, size):
+        """Cache a value of a given size in bytes, evicting old frames to fit"""
+        if size > self.max_bytes:
+            return
+        old = self.frames.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self.frames[key] = (value, size)
+        self.bytes += size
+
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self.frames.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached frame, keeping the statistics"""
+        self.frames.clear()
+        self.bytes = 0
+
+    def hit_rate(self):
+        """Return the share of lookups that were hits (0-1)"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        """Return a one-line description of the cache for the status display"""
+        return (f"CACHE {self.hit_rate():.0%} HIT  {self.hits} HITS / {self.misses} MISSES  "
+                f"{len(self.frames)} FRAMES  {self.bytes / (1024 * 1024):.1f}/{self.max_bytes / (1024 * 1024):.0f} MB")
@@ -0,0 +1,147 @@
+import os
+
+import numpy as np
+
+from budget_analyzer import COST_NAMES, DEFAULT_BUDGETS, table_costs
+from effect_batch import find_effect_files, read_effect, run_parallel, write_effect
+from effect_table import NO_ENTRY, EmitterTable
+from effect_transform import column_changes
+from trail_sim import TRAIL_KEYS
+
+# Added to the file name of generated variants, before the extension
+LOD_SUFFIX = "_lod"
+
+# Default share of particles and trail points a variant keeps
+LOD_KEEP = 0.5
+
+# Never thin an effect below this share, however far over budget it is
+MIN_LOD_KEEP = 0.1
+
+# Share of the lost density made up by bigger sprites; the rest comes from opacity
+RADIUS_COMPENSATION = 0.5
+
+# Fewest points a trail is cut down to
+MIN_TRAIL_POINTS = 2
+
+
+def lod_columns(table, keep):
+    """Work out reduced-cost values for every emitter of a table
+
+    Particle emitters spawn fewer particles that live shorter, sqrt(keep)
+    each, so keep of them are alive at once. Trail emitters keep their
+    trails but drop to keep of their points. Particles grow and become
+    more opaque so the effect looks about as dense as before.
+
+    Args:
+        table (EmitterTable): Emitters to reduce
+        keep (float): Share of live particles and trail points to keep (0-1)
+
+    Returns:
+        dict: Parameter name -> array of new values, one per emitter
+
+    Raises:
+        ValueError: If keep is not above 0 and at most 1
+    """
+    if not 0.0 < keep <= 1.0:
+        raise ValueError(f"keep must be above 0 and at most 1, got {keep}")
+
+    def column(key):
+        return np.frombuffer(table.values[key], dtype=np.float64)
+
+    trail = np.logical_or.reduce([np.frombuffer(table.entry_indices[key], dtype=np.int64) != NO_ENTRY
+                                  for key in TRAIL_KEYS])
+    thin = np.sqrt(keep)
+    columns = {
+        "Emit_Per_Turn": np.where(trail, column("Emit_Per_Turn"), column("Emit_Per_Turn") * thin),
+        # Zero or negative Life means unlimited and is left alone
+        "Life": np.where(trail | (column("Life") <= 0), column("Life"), np.maximum(column("Life") * thin, 1.0)),
+        "Num_Points": np.where(trail, np.maximum(column("Num_Points") * keep, MIN_TRAIL_POINTS), column("Num_Points")),
+    }
+
+    # Density lost to fewer particles, split between sprite area and opacity
+    grow = np.where(trail, 1.0, keep ** (-RADIUS_COMPENSATION / 2))
+    brighten = np.where(trail, 1.0, keep ** -(1.0 - RADIUS_COMPENSATION))
+    for key in ("Radius", "Final_Radius"):
+        columns[key] = column(key) * grow
+    for phase in ("Start", "Transition", "End"):
+        key = f"{phase}_Alpha"
+        columns[key] = np.minimum(column(key) * brighten, np.maximum(column(key), 1.0))
+    return columns
+
+
+def budget_keep(costs, budgets=DEFAULT_BUDGETS):
+    """Return the share to keep so an effect fits its budgets, or 1.0 if it already does
+
+    Particles and trail vertices shrink in proportion to keep, and fill
+    about with its square root.
+    """
+    keep = 1.0
+    if costs["particles"] > budgets["particles"]:
+        keep = min(keep, budgets["particles"] / costs["particles"])
+    if costs["trail_vertices"] > budgets["trail_vertices"]:
+        keep = min(keep, budgets["trail_vertices"] / costs["trail_vertices"])
+    if costs["fill"] > budgets["fill"]:
+        keep = min(keep, (budgets["fill"] / costs["fill"]) ** 2)
+    return max(keep, MIN_LOD_KEEP) if keep < 1.0 else 1.0
+
+
+def lod_path(file_path, suffix=LOD_SUFFIX):
+    """Return where the variant of an effect file goes, next to the original"""
+    base, extension = os.path.splitext(file_path)
+    return f"{base}{suffix}{extension}"
+
+
+def generate_lod(job):
+    """Write a reduced-cost variant of one effect file; runs in a worker process
+
+    Args:
+        job (tuple): (file_path, keep or None to fit budgets, budgets, suffix, dry_run)
+
+    Returns:
+        dict: Summary with the file path, the variant path (None if no
+            variant was needed), the share kept, the estimated costs before
+            and after, and an error message if the file could not be processed
+    """
+    file_path, keep, budgets, suffix, dry_run = job
+    result = {"file": file_path, "out": None, "keep": 1.0, "before": None, "after": None, "error": None}
+    try:
+        document = read_effect(file_path)
+        table = EmitterTable(document)
+        result["before"] = result["after"] = table_costs(table)
+        if keep is None:
+            keep = budget_keep(result["before"], budgets)
+        result["keep"] = keep
+        if keep >= 1.0:
+            return result
+
+        for row, key, value in column_changes(table, lod_columns(table, keep)):
+            table.set(row, key, value)
+        result["after"] = table_costs(table)
+        result["out"] = lod_path(file_path, suffix)
+        if not dry_run:
+            write_effect(result["out"], document.render())
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def generate_lods(paths, keep=None, budgets=DEFAULT_BUDGETS, suffix=LOD_SUFFIX, jobs=None, dry_run=False):
+    """Write reduced-cost variants for every effect under paths, in parallel
+
+    Args:
+        keep (float, optional): Share to keep in every variant; None fits
+            each effect to the budgets and skips effects already within them
+
+    Returns:
+        list: Results from generate_lod; existing variants are not reduced again
+    """
+    files = [path for path in find_effect_files(paths) if not os.path.splitext(path)[0].endswith(suffix)]
+    return run_parallel(generate_lod, [(path, keep, budgets, suffix, dry_run) for path in files], jobs)
+
+
+def cost_reduction(result):
+    """Return the estimated reduction of each cost for a generate_lod result, 0-1"""
+    return {
+        name: 1.0 - result["after"][name] / result["before"][name] if result["before"][name] else 0.0
+        for name in COST_NAMES
+    }
@@ -1,7 +1,15 @@
-import tkinter as tk
-from particle_editor import ParticleEffectEditor
+import sys
 
 if __name__ == "__main__":
+    # Any arguments run the headless command-line tools instead of the GUI;
+    # they are dispatched before tkinter and the editor are imported
+    if len(sys.argv) > 1:
+        from sfx_cli import main
+        sys.exit(main())
+
+    import tkinter as tk
+    from particle_editor import ParticleEffectEditor
+
     root = tk.Tk()
     app = ParticleEffectEditor(root)
     root.mainloop()
\ No newline at end of file
@@ -1,12 +1,37 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
-import re
 import os
+import threading
+import numpy as np
 from PIL import Image, ImageTk
 import tkinter.colorchooser as colorchooser
 
+from budget_analyzer import over_budget, table_costs
+from catalog_search import CatalogSearchDialog
+from color_ramp import RAMP_HEIGHT, RAMP_WIDTH, ramp_image
+from effect_browser import EffectBrowser
+from effect_highlight import VALUE_TAGS, ViewportHighlighter
+from effect_preview import EffectPreview
+from effect_transform import plan_transforms
+from effect_writer import format_value
+from faction_recolor import color_changes, gather_colors, recolor
+from file_loader import BackgroundLoader
+from particle_sim import complete_parameters
+from preview_export import export_animation
+from recolor_dialog import RecolorDialog
 from theme_manager import ThemeManager
+from trail_sim import TRAIL_KEYS
+from transform_dialog import TransformDialog
+from update_scheduler import UpdateScheduler
 from utils import create_military_background
+from virtual_viewer import VIRTUAL_VIEWER_THRESHOLD, VirtualTextViewer
+
+# Emitter choice that edits every emitter in the file at once
+ALL_EMITTERS = "ALL EMITTERS"
+
+# Color phases the color sliders can write to; all of them only when chosen explicitly
+COLOR_PHASES = ["Start", "Transition", "End"]
+ALL_PHASES = "ALL PHASES"
 
 class ParticleEffectEditor:
     def __init__(self, root):
@@ -23,14 +48,24 @@ class ParticleEffectEditor:
         
         self.file_path = None
         self.file_content = None
+        self.document = None     # Parsed model of file_content
+        self.table = None        # Emitter rows of the document
+        self.load_emitter = 0    # Emitter to select once the file being loaded is shown
+        self.highlight_ranges = {}  # Highlight ranges per tab, from the document
         self.editable_values = {}  # Store editable values
         
+        # Coalesces slider-driven refreshes into one update per frame
+        self.scheduler = UpdateScheduler(root)
+        
         # Create background
         self.bg_image = create_military_background(950, 700)
         self.bg_label = tk.Label(root, image=self.bg_image)
         self.bg_label.place(x=0, y=0, relwidth=1, relheight=1)
         
         self.setup_ui()
+        
+        # Files are read and parsed off the Tk main thread
+        self.loader = BackgroundLoader(root, self.on_load_progress, self.on_file_loaded, self.on_load_error)
     
     def set_app_icon(self):
         """Set the application icon"""
@@ -83,6 +118,12 @@ class ParticleEffectEditor:
         self.browse_button = ttk.Button(file_frame, text="SELECT", command=self.browse_file, style="Military.TButton")
         self.browse_button.pack(side=tk.RIGHT, padx=5)
         
+        self.find_button = ttk.Button(file_frame, text="FIND", command=self.open_catalog_search, style="Military.TButton")
+        self.find_button.pack(side=tk.RIGHT, padx=5)
+        
+        self.browser_button = ttk.Button(file_frame, text="BROWSE", command=self.open_effect_browser, style="Military.TButton")
+        self.browser_button.pack(side=tk.RIGHT, padx=5)
+        
         # Create a PanedWindow to split the file viewer and parameter editor
         paned_window = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
         paned_window.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -94,6 +135,16 @@ class ParticleEffectEditor:
         param_frame = ttk.Frame(paned_window, style="Military.TFrame")
         paned_window.add(param_frame, weight=1)
         
+        # Emitter the controls edit; effect bundles hold many emitters
+        emitter_frame = ttk.Frame(param_frame, style="Military.TFrame")
+        emitter_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(emitter_frame, text="EMITTER:", style="Military.TLabel").pack(side=tk.LEFT, padx=5)
+        self.emitter_var = tk.StringVar(value="")
+        self.emitter_menu = ttk.Combobox(emitter_frame, textvariable=self.emitter_var, values=[], state="readonly", width=16)
+        self.emitter_menu.pack(side=tk.LEFT, padx=5)
+        self.emitter_menu.bind("<<ComboboxSelected>>", self.on_emitter_selected)
+        
         # Create notebook for tabs
         self.notebook = ttk.Notebook(param_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True, pady=5)
@@ -106,6 +157,21 @@ class ParticleEffectEditor:
         self.setup_visual_tab()
         self.setup_trail_tab()
         
+        # Animated preview of the loaded effect, below the tabs
+        self.preview = EffectPreview(param_frame, self.colors)
+        self.preview.pack(fill=tk.X, pady=5)
+        
+        # Estimated cost of the whole effect, kept current as sliders move
+        self.budget_var = tk.StringVar(value="BUDGET: NO FILE LOADED")
+        self.budget_label = ttk.Label(param_frame, textvariable=self.budget_var, style="Value.TLabel")
+        self.budget_label.pack(fill=tk.X, padx=5)
+        
+        # Re-highlight the file whenever a different tab is selected
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
+        
+        # Show slider changes in the file viewer as they happen
+        self.setup_live_patching()
+        
         # Action buttons
         button_frame = ttk.Frame(main_frame, style="Military.TFrame")
         button_frame.pack(fill=tk.X, pady=10)
@@ -115,6 +181,17 @@ class ParticleEffectEditor:
                                     style="Deploy.TButton")
         self.apply_button.pack(side=tk.RIGHT, padx=5)
         
+        self.export_button = ttk.Button(button_frame, text="EXPORT ANIMATION", 
+                                     command=self.export_preview, 
+                                     style="Military.TButton")
+        self.export_button.pack(side=tk.RIGHT, padx=5)
+        self.export_thread = None
+        
+        self.transform_button = ttk.Button(button_frame, text="TRANSFORM", 
+                                        command=self.open_transform_dialog, 
+                                        style="Military.TButton")
+        self.transform_button.pack(side=tk.RIGHT, padx=5)
+        
         # Status bar - military-style
         status_frame = ttk.Frame(self.root, style="Status.TFrame")
         status_frame.pack(fill=tk.X, side=tk.BOTTOM)
@@ -124,210 +201,203 @@ class ParticleEffectEditor:
             self.status_var.set(self._pending_status)
             delattr(self, '_pending_status')
             
+        # Loading progress, only shown while a file is loading
+        self.progress_var = tk.DoubleVar(value=0)
+        self.progress_bar = ttk.Progressbar(status_frame, variable=self.progress_var, maximum=100,
+                                            length=200, style="Status.Horizontal.TProgressbar")
+            
         self.status_bar = ttk.Label(status_frame, textvariable=self.status_var, style="Status.TLabel")
-        self.status_bar.pack(fill=tk.X)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
-    def on_tab_change(self, event):
-        """Handle tab change events to update parameter highlighting"""
-        selected_tab = self.notebook.tab(self.notebook.select(), "text")
+    def setup_live_patching(self):
+        """Patch the file viewer in place whenever a slider changes"""
+        self.loaded_values = {}     # Control values right after the file was loaded
+        self.touched_keys = set()   # Parameters changed by the user since then
+        
+        parameter_keys = [
+            (self.red_var, ["Start_Red", "End_Red", "Transition_Red"]),
+            (self.green_var, ["Start_Green", "End_Green", "Transition_Green"]),
+            (self.blue_var, ["Start_Blue", "End_Blue", "Transition_Blue"]),
+            (self.alpha_var, ["Start_Alpha", "End_Alpha", "Transition_Alpha"]),
+            (self.radius_var, ["Radius"]),
+            (self.final_radius_var, ["Final_Radius"]),
+            (self.width_var, ["Width", "Start_Width"]),
+            (self.emit_rate_var, ["Emit_Per_Turn"]),
+            (self.life_var, ["Life"]),
+            (self.velocity_x_var, ["Initial_Velocity_X"]),
+            (self.velocity_y_var, ["Initial_Velocity_Y"]),
+            (self.velocity_z_var, ["Initial_Velocity_Z"]),
+            (self.velocity_random_var, ["Velocity_Randomness"]),
+            (self.gravity_var, ["GravityScalar", "GravityPC"]),
+            (self.blend_mode_var, ["Blend_Mode"]),
+            (self.anim_speed_var, ["Anim_Speed"]),
+            (self.cylinder_length_var, ["Cylinder_Length"]),
+            (self.num_points_var, ["Num_Points"]),
+            (self.wiggle_var, ["Wiggle_Factor"]),
+            (self.disperse_var, ["Disperse_Rate"]),
+        ]
+        for var, keys in parameter_keys:
+            self.scheduler.watch(var, lambda keys=keys: self.patch_parameters(keys))
+    
+    def reset_live_patching(self):
+        """Treat the current control values as unchanged"""
+        self.loaded_values = self.collect_assignments()
+        self.touched_keys = set()
+    
+    def selected_emitter(self):
+        """Return the emitter shown in the controls; the first one when editing all"""
+        choice = self.emitter_var.get()
+        if not choice or choice == ALL_EMITTERS:
+            return 0
+        return int(choice.split()[-1]) - 1
+    
+    def selected_rows(self):
+        """Return the emitters the controls write to"""
+        if not self.table:
+            return []
+        if self.emitter_var.get() == ALL_EMITTERS:
+            return range(len(self.table))
+        return [emitter for emitter in [self.selected_emitter()] if emitter < len(self.table)]
+    
+    def selected_phases(self):
+        """Return the color phases the color sliders write to"""
+        choice = self.phase_var.get()
+        return COLOR_PHASES if choice == ALL_PHASES else [choice.title()]
+    
+    def patch_parameters(self, keys):
+        """Write control values into the selected emitters and patch the viewer in place
+        
+        Parameters are only patched once the user has changed them, so that
+        loading a file does not stamp its values over the selected emitters.
+        
+        Args:
+            keys (list): Parameter names to patch
+        """
+        # Requested from here only, so the ramp redraws once per frame: after
+        # this frame's patches, or from the sliders before a file is loaded
+        self.scheduler.request(self.update_color_ramp)
+        if not self.document:
+            return
         
-        # Clear all highlight tags first
-        self.file_viewer.tag_remove("highlight", "1.0", "tk.END")
+        assignments = self.collect_assignments()
+        rows = self.selected_rows()
+        for key in keys:
+            # Color phases that are not selected are left alone
+            if key not in assignments:
+                continue
+            value = assignments[key]
+            if key not in self.touched_keys:
+                if value == self.loaded_values.get(key):
+                    continue
+                self.touched_keys.add(key)
+            self.patch_entries(key, rows, value)
+        
+        # Runs after every patch queued for this frame
+        self.scheduler.request(self.refresh_preview)
+        self.scheduler.request(self.update_budget)
+    
+    def patch_entries(self, key, rows, value):
+        """Write a value into some emitters' entries for a key and patch the viewer
         
-        # If no file loaded, do nothing
-        if not self.file_content:
+        Only the entries of the given emitters are looked at, so editing one
+        emitter costs the same however many emitters the file holds.
+        """
+        self.patch_values([(row, key, value) for row in rows])
+    
+    def patch_values(self, changes):
+        """Write (emitter, key, value) changes into the document and patch the viewer in place"""
+        changed = [
+            (row, key, value) for row, key, value in changes
+            if self.table.has(row, key) and self.table.entry(row, key).raw != format_value(key, value)
+        ]
+        if not changed:
+            return
+        
+        if self.virtual_viewer_active:
+            for row, key, value in changed:
+                self.table.set(row, key, value)
+            self.virtual_viewer.render()
             return
         
-        # Highlight parameters based on selected tab
-        if selected_tab == "ORDNANCE COLOR":
-            self.highlight_color_values()
-        elif selected_tab == "SIZE":
-            self.highlight_size_values()
-        elif selected_tab == "EMISSION":
-            self.highlight_emission_values()
-        elif selected_tab == "MOVEMENT":
-            self.highlight_movement_values()
-        elif selected_tab == "VISUAL":
-            self.highlight_visual_values()
-        elif selected_tab == "TRAIL":
-            self.highlight_trail_values()
+        # Splice each value in place, keeping its highlight tags
+        self.file_viewer.config(state=tk.NORMAL)
+        for row, key, value in changed:
+            start_index, end_index = self.table.entry(row, key).tk_range()
+            tags = self.file_viewer.tag_names(start_index)
+            entry = self.table.set(row, key, value)
+            self.file_viewer.delete(start_index, end_index)
+            self.file_viewer.insert(start_index, entry.raw, tags)
+        self.file_viewer.config(state=tk.DISABLED)
 
-    def highlight_color_values(self):
-        """Highlight all the color values in the file viewer"""
-        # Find and highlight Start_Red values
-        pattern_start_red = r'(Start_Red NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_red, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("red_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Find and highlight Start_Green values
-        pattern_start_green = r'(Start_Green NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_green, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("green_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Find and highlight Start_Blue values
-        pattern_start_blue = r'(Start_Blue NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_blue, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("blue_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Find and highlight Start_Alpha values
-        pattern_start_alpha = r'(Start_Alpha NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_alpha, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("alpha_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-            
-        # Find and highlight End values and Transition values too
-        for color, tag in [
-            ("End_Red", "red_value"), 
-            ("End_Green", "green_value"), 
-            ("End_Blue", "blue_value"),
-            ("End_Alpha", "alpha_value"),
-            ("Transition_Red", "red_value"),
-            ("Transition_Green", "green_value"),
-            ("Transition_Blue", "blue_value"),
-            ("Transition_Alpha", "alpha_value")
-        ]:
-            pattern = fr'({color} NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-            for match in re.finditer(pattern, self.file_content):
-                start_idx = f"1.0+{match.start(2)}c"
-                end_idx = f"1.0+{match.end(2)}c"
-                self.file_viewer.tag_add(tag, start_idx, end_idx)
-                self.file_viewer.tag_add("highlight", start_idx, end_idx)
+    def emitter_value(self, key):
+        """Return the selected emitter's value for a key, or None if it does not set it"""
+        emitter = self.selected_emitter()
+        if emitter >= len(self.table):
+            return None
+        return self.table.value(emitter, key)
 
-    def highlight_size_values(self):
-        """Highlight size-related parameters in the file viewer"""
-        # Radius values
-        pattern_radius = r'(Radius NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_radius, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("size_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Final_Radius values
-        pattern_final = r'(Final_Radius )(\d+\.\d+)'
-        for match in re.finditer(pattern_final, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("size_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Width and Start_Width values
-        for param in ["Width", "Start_Width"]:
-            pattern = fr'({param} )(\d+\.\d+)'
-            for match in re.finditer(pattern, self.file_content):
-                start_idx = f"1.0+{match.start(2)}c"
-                end_idx = f"1.0+{match.end(2)}c"
-                self.file_viewer.tag_add("size_value", start_idx, end_idx)
-                self.file_viewer.tag_add("highlight", start_idx, end_idx)
+    def emitter_parameters(self):
+        """Return the selected emitter's current values, with defaults filled in"""
+        emitter = self.selected_emitter()
+        return complete_parameters(self.table.row(emitter) if emitter < len(self.table) else {})
 
-    def highlight_emission_values(self):
-        """Highlight emission-related parameters in the file viewer"""
-        # Emit_Per_Turn values
-        pattern_emit = r'(Emit_Per_Turn NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_emit, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("emission_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Life values
-        pattern_life = r'(Life )(-?\d+)'
-        for match in re.finditer(pattern_life, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("emission_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
+    def refresh_preview(self):
+        """Show the selected emitter's current values in the effect preview"""
+        if self.document:
+            self.preview.set_parameters(self.emitter_parameters())
 
-    def highlight_movement_values(self):
-        """Highlight movement-related parameters in the file viewer"""
-        # Initial Velocity values
-        for param in ["Initial_Velocity_X", "Initial_Velocity_Y", "Initial_Velocity_Z"]:
-            pattern = fr'({param} NUMBER_VERSION_2\n\*\*\*\*1: )(-?\d+\.\d+)'
-            for match in re.finditer(pattern, self.file_content):
-                start_idx = f"1.0+{match.start(2)}c"
-                end_idx = f"1.0+{match.end(2)}c"
-                self.file_viewer.tag_add("movement_value", start_idx, end_idx)
-                self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Velocity_Randomness
-        pattern_random = r'(Velocity_Randomness NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_random, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("movement_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Gravity values
-        for param in ["GravityScalar", "GravityPC NUMBER_VERSION_2\n****1:"]:
-            pattern = fr'({param} )(-?\d+\.\d+)'
-            for match in re.finditer(pattern, self.file_content):
-                start_idx = f"1.0+{match.start(2)}c"
-                end_idx = f"1.0+{match.end(2)}c"
-                self.file_viewer.tag_add("movement_value", start_idx, end_idx)
-                self.file_viewer.tag_add("highlight", start_idx, end_idx)
+    def update_budget(self):
+        """Show the loaded effect's estimated particle, trail and fill cost"""
+        if not self.document:
+            return
+        
+        costs = table_costs(self.table)
+        over = over_budget(costs)
+        text = (f"BUDGET: {costs['particles']:.0f} PARTICLES  {costs['trail_vertices']:.0f} TRAIL VERTS  "
+                f"FILL {costs['fill']:.0f}")
+        if over:
+            text += f"  OVER: {', '.join(name.replace('_', ' ').upper() for name in over)}"
+        self.budget_var.set(text)
+        self.budget_label.config(foreground=self.colors['accent1'] if over else self.colors['accent2'])
 
-    def highlight_visual_values(self):
-        """Highlight visual-related parameters in the file viewer"""
-        # Blend_Mode
-        pattern_blend = r'(Blend_Mode )(\d+)'
-        for match in re.finditer(pattern_blend, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("visual_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Anim_Speed
-        pattern_anim = r'(Anim_Speed )(\d+\.\d+)'
-        for match in re.finditer(pattern_anim, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("visual_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Cylinder_Length
-        pattern_cylinder = r'(Cylinder_Length NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_cylinder, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("visual_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
+    def on_emitter_selected(self, event=None):
+        """Load the selected emitter into the controls and the preview"""
+        if not self.document:
+            return
+        
+        self.extract_editable_values()
+        self.extract_parameters()
+        self.reset_live_patching()
+        self.preview.set_parameters(self.emitter_parameters(), restart=True,
+                                    trail=any(self.emitter_value(key) is not None for key in TRAIL_KEYS))
+        self.update_color_ramp()
+        
+        self.status_var.set(f"EDITING {self.emitter_var.get()} ({len(self.table)} IN FILE)")
 
-    def highlight_trail_values(self):
-        """Highlight trail-related parameters in the file viewer"""
-        # Num_Points
-        pattern_points = r'(Num_Points )(\d+)'
-        for match in re.finditer(pattern_points, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("trail_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Wiggle_Factor
-        pattern_wiggle = r'(Wiggle_Factor )(\d+\.\d+)'
-        for match in re.finditer(pattern_wiggle, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("trail_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
-        
-        # Disperse_Rate
-        pattern_disperse = r'(Disperse_Rate )(\d+\.\d+)'
-        for match in re.finditer(pattern_disperse, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("trail_value", start_idx, end_idx)
-            self.file_viewer.tag_add("highlight", start_idx, end_idx)
+    def on_tab_change(self, event):
+        """Handle tab change events to update parameter highlighting"""
+        self.refresh_highlights()
+
+    def refresh_highlights(self):
+        """Highlight the values edited by the selected tab in the file viewer"""
+        # Clear all highlight tags first
+        for tag in VALUE_TAGS + ["highlight"]:
+            self.file_viewer.tag_remove(tag, "1.0", tk.END)
+        
+        # If no file loaded, do nothing
+        if not self.file_content:
+            self.viewport_highlighter.set_ranges({})
+            return
+        
+        selected_tab = self.notebook.tab(self.notebook.select(), "text")
+        ranges = self.highlight_ranges.get(selected_tab, {})
+        if self.virtual_viewer_active:
+            # The virtual viewer tags each window of lines as it renders
+            self.viewport_highlighter.set_ranges({})
+            self.virtual_viewer.set_ranges(ranges)
+        else:
+            # Only the visible lines are tagged now; the rest follow on scroll
+            self.viewport_highlighter.set_ranges(ranges)
 
     def setup_size_tab(self):
         """Setup size parameters tab"""
@@ -348,7 +418,7 @@ class ParticleEffectEditor:
         radius_slider.grid(row=0, column=1, padx=5, pady=10, sticky=tk.EW)
         self.radius_value = ttk.Label(param_grid, text="1.000", style='Value.TLabel')
         self.radius_value.grid(row=0, column=2, padx=5, pady=10)
-        radius_slider.bind("<Motion>", lambda e: self.update_value_label(self.radius_var, self.radius_value))
+        self.watch_value_label(self.radius_var, self.radius_value)
         
         # Final radius parameters
         ttk.Label(param_grid, text="FINAL RADIUS:", style="Military.TLabel").grid(row=1, column=0, padx=5, pady=10, sticky=tk.W)
@@ -357,7 +427,7 @@ class ParticleEffectEditor:
         final_radius_slider.grid(row=1, column=1, padx=5, pady=10, sticky=tk.EW)
         self.final_radius_value = ttk.Label(param_grid, text="2.000", style='Value.TLabel')
         self.final_radius_value.grid(row=1, column=2, padx=5, pady=10)
-        final_radius_slider.bind("<Motion>", lambda e: self.update_value_label(self.final_radius_var, self.final_radius_value))
+        self.watch_value_label(self.final_radius_var, self.final_radius_value)
         
         # Trail width
         ttk.Label(param_grid, text="TRAIL WIDTH:", style="Military.TLabel").grid(row=2, column=0, padx=5, pady=10, sticky=tk.W)
@@ -366,7 +436,7 @@ class ParticleEffectEditor:
         width_slider.grid(row=2, column=1, padx=5, pady=10, sticky=tk.EW)
         self.width_value = ttk.Label(param_grid, text="0.250", style='Value.TLabel')
         self.width_value.grid(row=2, column=2, padx=5, pady=10)
-        width_slider.bind("<Motion>", lambda e: self.update_value_label(self.width_var, self.width_value))
+        self.watch_value_label(self.width_var, self.width_value)
         
         param_grid.columnconfigure(1, weight=1)
 
@@ -388,7 +458,7 @@ class ParticleEffectEditor:
         emit_rate_slider.grid(row=0, column=1, padx=5, pady=10, sticky=tk.EW)
         self.emit_rate_value = ttk.Label(param_grid, text="1.000", style='Value.TLabel')
         self.emit_rate_value.grid(row=0, column=2, padx=5, pady=10)
-        emit_rate_slider.bind("<Motion>", lambda e: self.update_value_label(self.emit_rate_var, self.emit_rate_value))
+        self.watch_value_label(self.emit_rate_var, self.emit_rate_value)
         
         # Life parameter
         ttk.Label(param_grid, text="LIFE:", style="Military.TLabel").grid(row=1, column=0, padx=5, pady=10, sticky=tk.W)
@@ -397,7 +467,7 @@ class ParticleEffectEditor:
         life_slider.grid(row=1, column=1, padx=5, pady=10, sticky=tk.EW)
         self.life_value = ttk.Label(param_grid, text="15.000", style='Value.TLabel')
         self.life_value.grid(row=1, column=2, padx=5, pady=10)
-        life_slider.bind("<Motion>", lambda e: self.update_value_label(self.life_var, self.life_value))
+        self.watch_value_label(self.life_var, self.life_value)
         
         param_grid.columnconfigure(1, weight=1)
 
@@ -419,7 +489,7 @@ class ParticleEffectEditor:
         velocity_x_slider.grid(row=0, column=1, padx=5, pady=10, sticky=tk.EW)
         self.velocity_x_value = ttk.Label(param_grid, text="0.000", style='Value.TLabel')
         self.velocity_x_value.grid(row=0, column=2, padx=5, pady=10)
-        velocity_x_slider.bind("<Motion>", lambda e: self.update_value_label(self.velocity_x_var, self.velocity_x_value))
+        self.watch_value_label(self.velocity_x_var, self.velocity_x_value)
         
         # Initial Velocity Y
         ttk.Label(param_grid, text="VELOCITY Y:", style="Military.TLabel").grid(row=1, column=0, padx=5, pady=10, sticky=tk.W)
@@ -428,7 +498,7 @@ class ParticleEffectEditor:
         velocity_y_slider.grid(row=1, column=1, padx=5, pady=10, sticky=tk.EW)
         self.velocity_y_value = ttk.Label(param_grid, text="0.000", style='Value.TLabel')
         self.velocity_y_value.grid(row=1, column=2, padx=5, pady=10)
-        velocity_y_slider.bind("<Motion>", lambda e: self.update_value_label(self.velocity_y_var, self.velocity_y_value))
+        self.watch_value_label(self.velocity_y_var, self.velocity_y_value)
         
         # Initial Velocity Z
         ttk.Label(param_grid, text="VELOCITY Z:", style="Military.TLabel").grid(row=2, column=0, padx=5, pady=10, sticky=tk.W)
@@ -437,7 +507,7 @@ class ParticleEffectEditor:
         velocity_z_slider.grid(row=2, column=1, padx=5, pady=10, sticky=tk.EW)
         self.velocity_z_value = ttk.Label(param_grid, text="0.000", style='Value.TLabel')
         self.velocity_z_value.grid(row=2, column=2, padx=5, pady=10)
-        velocity_z_slider.bind("<Motion>", lambda e: self.update_value_label(self.velocity_z_var, self.velocity_z_value))
+        self.watch_value_label(self.velocity_z_var, self.velocity_z_value)
         
         # Velocity Randomness
         ttk.Label(param_grid, text="RANDOMNESS:", style="Military.TLabel").grid(row=3, column=0, padx=5, pady=10, sticky=tk.W)
@@ -446,7 +516,7 @@ class ParticleEffectEditor:
         velocity_random_slider.grid(row=3, column=1, padx=5, pady=10, sticky=tk.EW)
         self.velocity_random_value = ttk.Label(param_grid, text="0.010", style='Value.TLabel')
         self.velocity_random_value.grid(row=3, column=2, padx=5, pady=10)
-        velocity_random_slider.bind("<Motion>", lambda e: self.update_value_label(self.velocity_random_var, self.velocity_random_value))
+        self.watch_value_label(self.velocity_random_var, self.velocity_random_value)
         
         # Gravity Scale
         ttk.Label(param_grid, text="GRAVITY:", style="Military.TLabel").grid(row=4, column=0, padx=5, pady=10, sticky=tk.W)
@@ -455,7 +525,7 @@ class ParticleEffectEditor:
         gravity_slider.grid(row=4, column=1, padx=5, pady=10, sticky=tk.EW)
         self.gravity_value = ttk.Label(param_grid, text="0.000", style='Value.TLabel')
         self.gravity_value.grid(row=4, column=2, padx=5, pady=10)
-        gravity_slider.bind("<Motion>", lambda e: self.update_value_label(self.gravity_var, self.gravity_value))
+        self.watch_value_label(self.gravity_var, self.gravity_value)
         
         param_grid.columnconfigure(1, weight=1)
 
@@ -484,7 +554,7 @@ class ParticleEffectEditor:
         anim_speed_slider.grid(row=1, column=1, padx=5, pady=10, sticky=tk.EW)
         self.anim_speed_value = ttk.Label(param_grid, text="1.000", style='Value.TLabel')
         self.anim_speed_value.grid(row=1, column=2, padx=5, pady=10)
-        anim_speed_slider.bind("<Motion>", lambda e: self.update_value_label(self.anim_speed_var, self.anim_speed_value))
+        self.watch_value_label(self.anim_speed_var, self.anim_speed_value)
         
         # Cylinder Length (for cone effects)
         ttk.Label(param_grid, text="CYLINDER LENGTH:", style="Military.TLabel").grid(row=2, column=0, padx=5, pady=10, sticky=tk.W)
@@ -493,7 +563,7 @@ class ParticleEffectEditor:
         cylinder_length_slider.grid(row=2, column=1, padx=5, pady=10, sticky=tk.EW)
         self.cylinder_length_value = ttk.Label(param_grid, text="2.000", style='Value.TLabel')
         self.cylinder_length_value.grid(row=2, column=2, padx=5, pady=10)
-        cylinder_length_slider.bind("<Motion>", lambda e: self.update_value_label(self.cylinder_length_var, self.cylinder_length_value))
+        self.watch_value_label(self.cylinder_length_var, self.cylinder_length_value)
         
         param_grid.columnconfigure(1, weight=1)
 
@@ -515,7 +585,7 @@ class ParticleEffectEditor:
         num_points_slider.grid(row=0, column=1, padx=5, pady=10, sticky=tk.EW)
         self.num_points_value = ttk.Label(param_grid, text="10", style='Value.TLabel')
         self.num_points_value.grid(row=0, column=2, padx=5, pady=10)
-        num_points_slider.bind("<Motion>", lambda e: self.update_value_label(self.num_points_var, self.num_points_value, is_int=True))
+        self.watch_value_label(self.num_points_var, self.num_points_value, is_int=True)
         
         # Wiggle Factor
         ttk.Label(param_grid, text="WIGGLE FACTOR:", style="Military.TLabel").grid(row=1, column=0, padx=5, pady=10, sticky=tk.W)
@@ -524,7 +594,7 @@ class ParticleEffectEditor:
         wiggle_slider.grid(row=1, column=1, padx=5, pady=10, sticky=tk.EW)
         self.wiggle_value = ttk.Label(param_grid, text="0.000", style='Value.TLabel')
         self.wiggle_value.grid(row=1, column=2, padx=5, pady=10)
-        wiggle_slider.bind("<Motion>", lambda e: self.update_value_label(self.wiggle_var, self.wiggle_value))
+        self.watch_value_label(self.wiggle_var, self.wiggle_value)
         
         # Disperse Rate
         ttk.Label(param_grid, text="DISPERSE RATE:", style="Military.TLabel").grid(row=2, column=0, padx=5, pady=10, sticky=tk.W)
@@ -533,7 +603,7 @@ class ParticleEffectEditor:
         disperse_slider.grid(row=2, column=1, padx=5, pady=10, sticky=tk.EW)
         self.disperse_value = ttk.Label(param_grid, text="0.000", style='Value.TLabel')
         self.disperse_value.grid(row=2, column=2, padx=5, pady=10)
-        disperse_slider.bind("<Motion>", lambda e: self.update_value_label(self.disperse_var, self.disperse_value))
+        self.watch_value_label(self.disperse_var, self.disperse_value)
         
         param_grid.columnconfigure(1, weight=1)
 
@@ -542,9 +612,7 @@ class ParticleEffectEditor:
         file_viewer_frame = ttk.LabelFrame(parent, text="FILE CONTENTS", padding="5", style="Military.TLabelframe")
         
         # Create a Text widget for viewing the file
-        self.file_viewer = scrolledtext.ScrolledText(
-            file_viewer_frame, 
-            wrap=tk.WORD,
+        text_options = dict(
             width=50,
             height=25,
             font=("Courier New", 9),
@@ -552,30 +620,49 @@ class ParticleEffectEditor:
             fg=self.colors['foreground'],
             insertbackground=self.colors['foreground']
         )
+        self.file_viewer = scrolledtext.ScrolledText(file_viewer_frame, wrap=tk.WORD, **text_options)
         self.file_viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Configure tags for highlighting
-        self.file_viewer.tag_configure("red_value", foreground=self.colors['accent1'], background="#401010")
-        self.file_viewer.tag_configure("green_value", foreground=self.colors['accent3'], background="#104010")
-        self.file_viewer.tag_configure("blue_value", foreground=self.colors['accent4'], background="#102040")
-        self.file_viewer.tag_configure("alpha_value", foreground="#FFFFFF", background="#404040")
-        
-        # Tags for other parameter types
-        self.file_viewer.tag_configure("size_value", foreground="#FFFFFF", background=self.colors['size_tab_bg'])
-        self.file_viewer.tag_configure("emission_value", foreground="#FFFFFF", background=self.colors['emission_tab_bg'])
-        self.file_viewer.tag_configure("movement_value", foreground="#FFFFFF", background=self.colors['movement_tab_bg'])
-        self.file_viewer.tag_configure("visual_value", foreground="#FFFFFF", background=self.colors['visual_tab_bg'])
-        self.file_viewer.tag_configure("trail_value", foreground="#FFFFFF", background=self.colors['trail_tab_bg'])
-        
-        # Generic highlight tag
-        self.file_viewer.tag_configure("highlight", background="#303030")
+        self.configure_highlight_tags(self.file_viewer)
         
         # Make the text read-only
         self.file_viewer.config(state=tk.DISABLED)
         
+        # Virtual viewer for very large files, swapped in by display_file_content
+        self.virtual_viewer = VirtualTextViewer(file_viewer_frame, **text_options)
+        self.configure_highlight_tags(self.virtual_viewer.text)
+        self.virtual_viewer_active = False
+        
+        # Highlight lazily as the visible part of the file changes
+        self.viewport_highlighter = ViewportHighlighter(self.file_viewer)
+        self.file_viewer.config(yscrollcommand=self.on_viewer_scroll)
+        
         # Add the frame to the parent paned window
         parent.add(file_viewer_frame, weight=2)
 
+    def configure_highlight_tags(self, text_widget):
+        """Configure the highlight tags on a file viewer text widget"""
+        # Configure tags for highlighting
+        text_widget.tag_configure("red_value", foreground=self.colors['accent1'], background="#401010")
+        text_widget.tag_configure("green_value", foreground=self.colors['accent3'], background="#104010")
+        text_widget.tag_configure("blue_value", foreground=self.colors['accent4'], background="#102040")
+        text_widget.tag_configure("alpha_value", foreground="#FFFFFF", background="#404040")
+        
+        # Tags for other parameter types
+        text_widget.tag_configure("size_value", foreground="#FFFFFF", background=self.colors['size_tab_bg'])
+        text_widget.tag_configure("emission_value", foreground="#FFFFFF", background=self.colors['emission_tab_bg'])
+        text_widget.tag_configure("movement_value", foreground="#FFFFFF", background=self.colors['movement_tab_bg'])
+        text_widget.tag_configure("visual_value", foreground="#FFFFFF", background=self.colors['visual_tab_bg'])
+        text_widget.tag_configure("trail_value", foreground="#FFFFFF", background=self.colors['trail_tab_bg'])
+        
+        # Generic highlight tag, kept below the value colors
+        text_widget.tag_configure("highlight", background="#303030")
+        text_widget.tag_lower("highlight")
+
+    def on_viewer_scroll(self, first, last):
+        """Update the scrollbar and highlight newly visible lines"""
+        self.file_viewer.vbar.set(first, last)
+        self.viewport_highlighter.schedule()
+
     def setup_color_tab(self):
         """Setup the color editor tab"""
         color_frame = ttk.Frame(self.notebook, style="Color.TFrame")
@@ -681,6 +768,22 @@ class ParticleEffectEditor:
             style="Military.TButton"
         )
         self.color_picker_button.pack(side=tk.LEFT, padx=5)
+        
+        self.recolor_button = ttk.Button(
+            preset_frame, 
+            text="RECOLOR", 
+            command=self.open_recolor_dialog, 
+            style="Military.TButton"
+        )
+        self.recolor_button.pack(side=tk.LEFT, padx=5)
+        
+        # Phase of the color ramp the sliders edit
+        self.phase_var = tk.StringVar(value=COLOR_PHASES[0].upper())
+        phase_menu = ttk.Combobox(preset_frame, textvariable=self.phase_var, state="readonly", width=12,
+                                  values=[phase.upper() for phase in COLOR_PHASES] + [ALL_PHASES])
+        phase_menu.pack(side=tk.RIGHT, padx=5)
+        phase_menu.bind("<<ComboboxSelected>>", self.on_phase_selected)
+        ttk.Label(preset_frame, text="PHASE:", style="Military.TLabel").pack(side=tk.RIGHT, padx=5)
     
     def setup_rgb_sliders(self, parent):
         """Setup RGB and Alpha sliders"""
@@ -698,7 +801,7 @@ class ParticleEffectEditor:
         
         self.red_value = ttk.Label(rgb_frame, text="0.700", style='Value.TLabel')
         self.red_value.grid(row=0, column=2, padx=5, pady=5)
-        self.red_slider.bind("<Motion>", lambda e: self.update_value_label(self.red_var, self.red_value))
+        self.watch_value_label(self.red_var, self.red_value)
         
         # Green slider
         green_label_frame = ttk.Frame(rgb_frame, style="GreenLabel.TFrame")
@@ -711,7 +814,7 @@ class ParticleEffectEditor:
         
         self.green_value = ttk.Label(rgb_frame, text="0.300", style='Value.TLabel')
         self.green_value.grid(row=1, column=2, padx=5, pady=5)
-        self.green_slider.bind("<Motion>", lambda e: self.update_value_label(self.green_var, self.green_value))
+        self.watch_value_label(self.green_var, self.green_value)
         
         # Blue slider
         blue_label_frame = ttk.Frame(rgb_frame, style="BlueLabel.TFrame")
@@ -724,7 +827,7 @@ class ParticleEffectEditor:
         
         self.blue_value = ttk.Label(rgb_frame, text="0.500", style='Value.TLabel')
         self.blue_value.grid(row=2, column=2, padx=5, pady=5)
-        self.blue_slider.bind("<Motion>", lambda e: self.update_value_label(self.blue_var, self.blue_value))
+        self.watch_value_label(self.blue_var, self.blue_value)
         
         # Alpha slider
         alpha_label_frame = ttk.Frame(rgb_frame, style="AlphaLabel.TFrame")
@@ -737,7 +840,7 @@ class ParticleEffectEditor:
         
         self.alpha_value = ttk.Label(rgb_frame, text="1.000", style='Value.TLabel')
         self.alpha_value.grid(row=3, column=2, padx=5, pady=5)
-        self.alpha_slider.bind("<Motion>", lambda e: self.update_value_label(self.alpha_var, self.alpha_value))
+        self.watch_value_label(self.alpha_var, self.alpha_value)
         
         rgb_frame.columnconfigure(1, weight=1)
     
@@ -748,136 +851,61 @@ class ParticleEffectEditor:
             return
 
         # SIZE TAB PARAMETERS
-        # Extract Radius values
-        radius_pattern = r'Radius NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-        radius_match = re.search(radius_pattern, self.file_content)
-        if radius_match and hasattr(self, 'radius_var'):
-            self.radius_var.set(float(radius_match.group(1)))
-            self.update_value_label(self.radius_var, self.radius_value)
-        
-        # Extract Final_Radius values
-        final_radius_pattern = r'Final_Radius (\d+\.\d+)'
-        final_radius_match = re.search(final_radius_pattern, self.file_content)
-        if final_radius_match and hasattr(self, 'final_radius_var'):
-            self.final_radius_var.set(float(final_radius_match.group(1)))
-            self.update_value_label(self.final_radius_var, self.final_radius_value)
-        
-        # Extract Width values
-        width_pattern = r'Width (\d+\.\d+)'
-        width_match = re.search(width_pattern, self.file_content)
-        if width_match and hasattr(self, 'width_var'):
-            self.width_var.set(float(width_match.group(1)))
-            self.update_value_label(self.width_var, self.width_value)
-        
-        # Also check for Start_Width
-        start_width_pattern = r'Start_Width (\d+\.\d+)'
-        start_width_match = re.search(start_width_pattern, self.file_content)
-        if start_width_match and hasattr(self, 'width_var') and not width_match:
-            self.width_var.set(float(start_width_match.group(1)))
-            self.update_value_label(self.width_var, self.width_value)
+        self.load_parameter("Radius", self.radius_var, self.radius_value)
+        self.load_parameter("Final_Radius", self.final_radius_var, self.final_radius_value)
+        
+        # Width falls back to Start_Width when no Width value exists
+        if not self.load_parameter("Width", self.width_var, self.width_value):
+            self.load_parameter("Start_Width", self.width_var, self.width_value)
         
         # EMISSION TAB PARAMETERS
-        # Extract Emit_Per_Turn values
-        emit_pattern = r'Emit_Per_Turn NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-        emit_match = re.search(emit_pattern, self.file_content)
-        if emit_match and hasattr(self, 'emit_rate_var'):
-            self.emit_rate_var.set(float(emit_match.group(1)))
-            self.update_value_label(self.emit_rate_var, self.emit_rate_value)
-        
-        # Extract Life values
-        life_pattern = r'Life (-?\d+)'
-        life_match = re.search(life_pattern, self.file_content)
-        if life_match and hasattr(self, 'life_var'):
-            self.life_var.set(float(life_match.group(1)))
-            self.update_value_label(self.life_var, self.life_value)
+        self.load_parameter("Emit_Per_Turn", self.emit_rate_var, self.emit_rate_value)
+        self.load_parameter("Life", self.life_var, self.life_value)
         
         # MOVEMENT TAB PARAMETERS
-        # Extract Initial_Velocity values
-        velocity_x_pattern = r'Initial_Velocity_X NUMBER_VERSION_2\n\*\*\*\*1: (-?\d+\.\d+)'
-        velocity_x_match = re.search(velocity_x_pattern, self.file_content)
-        if velocity_x_match and hasattr(self, 'velocity_x_var'):
-            self.velocity_x_var.set(float(velocity_x_match.group(1)))
-            self.update_value_label(self.velocity_x_var, self.velocity_x_value)
-        
-        velocity_y_pattern = r'Initial_Velocity_Y NUMBER_VERSION_2\n\*\*\*\*1: (-?\d+\.\d+)'
-        velocity_y_match = re.search(velocity_y_pattern, self.file_content)
-        if velocity_y_match and hasattr(self, 'velocity_y_var'):
-            self.velocity_y_var.set(float(velocity_y_match.group(1)))
-            self.update_value_label(self.velocity_y_var, self.velocity_y_value)
-        
-        velocity_z_pattern = r'Initial_Velocity_Z NUMBER_VERSION_2\n\*\*\*\*1: (-?\d+\.\d+)'
-        velocity_z_match = re.search(velocity_z_pattern, self.file_content)
-        if velocity_z_match and hasattr(self, 'velocity_z_var'):
-            self.velocity_z_var.set(float(velocity_z_match.group(1)))
-            self.update_value_label(self.velocity_z_var, self.velocity_z_value)
-        
-        # Extract Velocity_Randomness
-        velocity_random_pattern = r'Velocity_Randomness NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-        velocity_random_match = re.search(velocity_random_pattern, self.file_content)
-        if velocity_random_match and hasattr(self, 'velocity_random_var'):
-            self.velocity_random_var.set(float(velocity_random_match.group(1)))
-            self.update_value_label(self.velocity_random_var, self.velocity_random_value)
-        
-        # Extract GravityScalar or GravityPC
-        gravity_pattern = r'GravityScalar (-?\d+\.\d+)'
-        gravity_match = re.search(gravity_pattern, self.file_content)
-        if not gravity_match:
-            gravity_pattern = r'GravityPC NUMBER_VERSION_2\n\*\*\*\*1: (-?\d+\.\d+)'
-            gravity_match = re.search(gravity_pattern, self.file_content)
-        
-        if gravity_match and hasattr(self, 'gravity_var'):
-            self.gravity_var.set(float(gravity_match.group(1)))
-            self.update_value_label(self.gravity_var, self.gravity_value)
+        self.load_parameter("Initial_Velocity_X", self.velocity_x_var, self.velocity_x_value)
+        self.load_parameter("Initial_Velocity_Y", self.velocity_y_var, self.velocity_y_value)
+        self.load_parameter("Initial_Velocity_Z", self.velocity_z_var, self.velocity_z_value)
+        self.load_parameter("Velocity_Randomness", self.velocity_random_var, self.velocity_random_value)
+        
+        # GravityScalar or GravityPC
+        if not self.load_parameter("GravityScalar", self.gravity_var, self.gravity_value):
+            self.load_parameter("GravityPC", self.gravity_var, self.gravity_value)
         
         # VISUAL TAB PARAMETERS
         # Extract Blend_Mode
-        blend_pattern = r'Blend_Mode (\d+)'
-        blend_match = re.search(blend_pattern, self.file_content)
-        if blend_match and hasattr(self, 'blend_mode_var'):
-            blend_value = int(blend_match.group(1))
+        blend_value = self.emitter_value("Blend_Mode")
+        if blend_value is not None:
+            blend_value = int(blend_value)
             if 0 <= blend_value < 4:
                 blend_modes = ["0 - Normal", "1 - Additive", "2 - Multiply", "3 - Screen"]
                 self.blend_mode_var.set(blend_modes[blend_value])
         
-        # Extract Anim_Speed
-        anim_speed_pattern = r'Anim_Speed (\d+\.\d+)'
-        anim_speed_match = re.search(anim_speed_pattern, self.file_content)
-        if anim_speed_match and hasattr(self, 'anim_speed_var'):
-            self.anim_speed_var.set(float(anim_speed_match.group(1)))
-            self.update_value_label(self.anim_speed_var, self.anim_speed_value)
-        
-        # Extract Cylinder_Length
-        cylinder_length_pattern = r'Cylinder_Length NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-        cylinder_length_match = re.search(cylinder_length_pattern, self.file_content)
-        if cylinder_length_match and hasattr(self, 'cylinder_length_var'):
-            self.cylinder_length_var.set(float(cylinder_length_match.group(1)))
-            self.update_value_label(self.cylinder_length_var, self.cylinder_length_value)
+        self.load_parameter("Anim_Speed", self.anim_speed_var, self.anim_speed_value)
+        self.load_parameter("Cylinder_Length", self.cylinder_length_var, self.cylinder_length_value)
         
         # TRAIL TAB PARAMETERS
-        # Extract Num_Points
-        num_points_pattern = r'Num_Points (\d+)'
-        num_points_match = re.search(num_points_pattern, self.file_content)
-        if num_points_match and hasattr(self, 'num_points_var'):
-            self.num_points_var.set(float(num_points_match.group(1)))
-            self.update_value_label(self.num_points_var, self.num_points_value, is_int=True)
-        
-        # Extract Wiggle_Factor
-        wiggle_pattern = r'Wiggle_Factor (\d+\.\d+)'
-        wiggle_match = re.search(wiggle_pattern, self.file_content)
-        if wiggle_match and hasattr(self, 'wiggle_var'):
-            self.wiggle_var.set(float(wiggle_match.group(1)))
-            self.update_value_label(self.wiggle_var, self.wiggle_value)
-        
-        # Extract Disperse_Rate
-        disperse_pattern = r'Disperse_Rate (\d+\.\d+)'
-        disperse_match = re.search(disperse_pattern, self.file_content)
-        if disperse_match and hasattr(self, 'disperse_var'):
-            self.disperse_var.set(float(disperse_match.group(1)))
-            self.update_value_label(self.disperse_var, self.disperse_value)
+        self.load_parameter("Num_Points", self.num_points_var, self.num_points_value, is_int=True)
+        self.load_parameter("Wiggle_Factor", self.wiggle_var, self.wiggle_value)
+        self.load_parameter("Disperse_Rate", self.disperse_var, self.disperse_value)
         
         # Display status message
         self.status_var.set("PARAMETERS EXTRACTED SUCCESSFULLY")
 
+    def load_parameter(self, key, var, label, is_int=False):
+        """Set a slider from the selected emitter's value for a key
+        
+        Returns:
+            bool: True if the emitter sets the key
+        """
+        value = self.emitter_value(key)
+        if value is None:
+            return False
+        
+        var.set(value)
+        self.update_value_label(var, label, is_int=is_int)
+        return True
+
     def setup_color_preview(self, parent):
         """Setup color preview area"""
         preview_frame = ttk.Frame(parent, style="Preview.TFrame")
@@ -898,10 +926,27 @@ class ParticleEffectEditor:
         
         self.update_preview()
         
-        # Bind slider movement to update preview
-        self.red_slider.bind("<B1-Motion>", lambda e: self.update_preview())
-        self.green_slider.bind("<B1-Motion>", lambda e: self.update_preview())
-        self.blue_slider.bind("<B1-Motion>", lambda e: self.update_preview())
+        # Refresh the preview whenever a color slider changes
+        for var in (self.red_var, self.green_var, self.blue_var):
+            self.scheduler.watch(var, self.update_preview)
+        
+        # Color and opacity over a particle's life, Start to End
+        ramp_frame = ttk.Frame(parent, style="Preview.TFrame")
+        ramp_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(ramp_frame, text="LIFE RAMP:", style="Military.TLabel").pack(side=tk.LEFT, padx=5)
+        
+        ramp_container = ttk.Frame(ramp_frame, style="PreviewBorder.TFrame")
+        ramp_container.pack(side=tk.LEFT, padx=10)
+        
+        ramp_canvas = tk.Canvas(ramp_container, width=RAMP_WIDTH, height=RAMP_HEIGHT, highlightthickness=0)
+        ramp_canvas.pack(padx=2, pady=2)
+        
+        # One image for the whole strip, repainted in place
+        self.ramp_photo = ImageTk.PhotoImage("RGB", (RAMP_WIDTH, RAMP_HEIGHT))
+        ramp_canvas.create_image(0, 0, anchor=tk.NW, image=self.ramp_photo)
+        
+        self.update_color_ramp()
     
     def setup_description(self, parent):
         """Setup description text"""
@@ -910,7 +955,7 @@ class ParticleEffectEditor:
         
         desc_text = ttk.Label(
             desc_frame, 
-            text="Modify the RGB and Opacity values using the sliders above.\nAny highlighted values in the file will be updated when you apply changes.",
+            text="Modify the RGB and Opacity values using the sliders above.\nOnly the selected emitter and phase are updated when you apply changes.",
             style="Desc.TLabel",
             justify=tk.LEFT
         )
@@ -924,85 +969,92 @@ class ParticleEffectEditor:
         )
         
         if file_path:
-            self.file_path = file_path
-            self.file_label.config(text=os.path.basename(file_path))
-            
-            try:
-                with open(file_path, 'r') as file:
-                    self.file_content = file.read()
-                    
-                self.display_file_content()
-                
-                # Extract all parameter values from the file
-                self.extract_editable_values()  # Extract color values (your existing method)
-                self.extract_parameters()       # Extract all other parameters
-                
-                self.status_var.set(f"LOADED: {os.path.basename(file_path)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+            self.load_file(file_path)
+
+    def open_catalog_search(self):
+        """Open the parameter catalog search window"""
+        CatalogSearchDialog(self.root, self.colors, self.load_file)
+
+    def open_effect_browser(self):
+        """Open the thumbnail browser for a folder of effects"""
+        EffectBrowser(self.root, self.colors, self.load_file)
+
+    def load_file(self, file_path, emitter=0):
+        """Start loading a file in the background, replacing any load in progress
+
+        Args:
+            file_path (str): Effect file to open
+            emitter (int): Emitter to select once it is loaded, counted from 0
+        """
+        self.load_emitter = emitter
+        self.loader.load(file_path)
+        self.status_var.set(f"LOADING: {os.path.basename(file_path)}")
+        self.progress_var.set(0)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+
+    def on_load_progress(self, file_path, fraction):
+        """Show background loading progress in the status bar"""
+        self.progress_var.set(fraction * 100)
+
+    def on_file_loaded(self, loaded):
+        """Show a file once the background loader has read and parsed it"""
+        self.progress_bar.pack_forget()
+        
+        self.file_path = loaded.file_path
+        self.file_label.config(text=os.path.basename(loaded.file_path))
+        
+        # The file is parsed once; everything else reads from the document
+        self.file_content = loaded.content
+        self.document = loaded.document
+        self.highlight_ranges = loaded.highlight_ranges
+        self.table = loaded.table
+        
+        self.display_file_content()
+        
+        # Start on the requested emitter, the first by default; its values fill the controls
+        self.emitter_menu.config(values=[f"EMITTER {number + 1}" for number in range(len(self.table))] + [ALL_EMITTERS])
+        emitter = self.load_emitter if self.load_emitter < len(self.table) else 0
+        self.emitter_var.set(f"EMITTER {emitter + 1}")
+        self.on_emitter_selected()
+        self.update_budget()
+        
+        self.status_var.set(f"LOADED: {os.path.basename(loaded.file_path)}")
+
+    def on_load_error(self, file_path, error):
+        """Report a file that could not be loaded"""
+        self.progress_bar.pack_forget()
+        self.status_var.set(f"ERROR: FAILED TO LOAD {os.path.basename(file_path)}")
+        messagebox.showerror("Error", f"Failed to load file: {str(error)}")
 
     def display_file_content(self):
         """Display file content in the viewer with highlighted editable parts"""
+        self.show_virtual_viewer(len(self.file_content) >= VIRTUAL_VIEWER_THRESHOLD)
+        
         self.file_viewer.config(state=tk.NORMAL)
         self.file_viewer.delete(1.0, tk.END)
-        self.file_viewer.insert(tk.END, self.file_content)
+        if self.virtual_viewer_active:
+            self.virtual_viewer.load(self.file_content, self.document)
+        else:
+            self.file_viewer.insert(tk.END, self.file_content)
         
-        # Highlight the editable values (color values)
-        self.highlight_color_values()
+        # Highlight the editable values for the selected tab
+        self.refresh_highlights()
         
         self.file_viewer.config(state=tk.DISABLED)
     
-    def highlight_color_values(self):
-        """Highlight all the color values in the file viewer"""
-        # Find and highlight Start_Red values
-        pattern_start_red = r'(Start_Red NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_red, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("red_value", start_idx, end_idx)
-            self.file_viewer.tag_add("editable", start_idx, end_idx)
-        
-        # Find and highlight Start_Green values
-        pattern_start_green = r'(Start_Green NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_green, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("green_value", start_idx, end_idx)
-            self.file_viewer.tag_add("editable", start_idx, end_idx)
-        
-        # Find and highlight Start_Blue values
-        pattern_start_blue = r'(Start_Blue NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_blue, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("blue_value", start_idx, end_idx)
-            self.file_viewer.tag_add("editable", start_idx, end_idx)
-        
-        # Find and highlight Start_Alpha values
-        pattern_start_alpha = r'(Start_Alpha NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-        for match in re.finditer(pattern_start_alpha, self.file_content):
-            start_idx = f"1.0+{match.start(2)}c"
-            end_idx = f"1.0+{match.end(2)}c"
-            self.file_viewer.tag_add("alpha_value", start_idx, end_idx)
-            self.file_viewer.tag_add("editable", start_idx, end_idx)
-            
-        # Find and highlight End values and Transition values too
-        for color, tag in [
-            ("End_Red", "red_value"), 
-            ("End_Green", "green_value"), 
-            ("End_Blue", "blue_value"),
-            ("End_Alpha", "alpha_value"),
-            ("Transition_Red", "red_value"),
-            ("Transition_Green", "green_value"),
-            ("Transition_Blue", "blue_value"),
-            ("Transition_Alpha", "alpha_value")
-        ]:
-            pattern = fr'({color} NUMBER_VERSION_2\n\*\*\*\*1: )(\d+\.\d+)'
-            for match in re.finditer(pattern, self.file_content):
-                start_idx = f"1.0+{match.start(2)}c"
-                end_idx = f"1.0+{match.end(2)}c"
-                self.file_viewer.tag_add(tag, start_idx, end_idx)
-                self.file_viewer.tag_add("editable", start_idx, end_idx)
+    def show_virtual_viewer(self, active):
+        """Swap between the regular and the virtual file viewer"""
+        if active == self.virtual_viewer_active:
+            return
+        
+        self.virtual_viewer_active = active
+        if active:
+            self.file_viewer.pack_forget()
+            self.virtual_viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        else:
+            self.virtual_viewer.pack_forget()
+            self.virtual_viewer.load("")
+            self.file_viewer.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
     
     def open_color_picker(self):
         # Get current RGB values from sliders
@@ -1035,42 +1087,35 @@ class ParticleEffectEditor:
             # Update color preview
             self.update_preview()
 
+    def on_phase_selected(self, event=None):
+        """Load the selected color phase into the sliders"""
+        if not self.document:
+            return
+        self.extract_editable_values()
+        self.reset_live_patching()
+
     def extract_editable_values(self):
-        """Extract editable values from the file content"""
+        """Extract the selected emitter's color values"""
         self.editable_values = {}
         
         # Get current values for Start_Red, End_Red, etc.
         for color_type in ["Red", "Green", "Blue", "Alpha"]:
-            # Get Start values
-            pattern_start = fr'Start_{color_type} NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-            match = re.search(pattern_start, self.file_content)
-            if match:
-                self.editable_values[f"Start_{color_type}"] = float(match.group(1))
-            
-            # Get End values
-            pattern_end = fr'End_{color_type} NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-            match = re.search(pattern_end, self.file_content)
-            if match:
-                self.editable_values[f"End_{color_type}"] = float(match.group(1))
-            
-            # Get Transition values
-            pattern_trans = fr'Transition_{color_type} NUMBER_VERSION_2\n\*\*\*\*1: (\d+\.\d+)'
-            match = re.search(pattern_trans, self.file_content)
-            if match:
-                self.editable_values[f"Transition_{color_type}"] = float(match.group(1))
+            for phase in COLOR_PHASES:
+                key = f"{phase}_{color_type}"
+                value = self.emitter_value(key)
+                if value is not None:
+                    self.editable_values[key] = value
         
         # Update the current values display
         self.update_current_values_display()
         
-        # Set the sliders to match the first Start values found
-        if "Start_Red" in self.editable_values:
-            self.red_var.set(self.editable_values["Start_Red"])
-        if "Start_Green" in self.editable_values:
-            self.green_var.set(self.editable_values["Start_Green"])
-        if "Start_Blue" in self.editable_values:
-            self.blue_var.set(self.editable_values["Start_Blue"])
-        if "Start_Alpha" in self.editable_values:
-            self.alpha_var.set(self.editable_values["Start_Alpha"])
+        # Set the sliders to the selected phase, or to Start when editing all phases
+        phase = self.selected_phases()[0]
+        sliders = {"Red": self.red_var, "Green": self.green_var, "Blue": self.blue_var, "Alpha": self.alpha_var}
+        for color_type, var in sliders.items():
+            key = f"{phase}_{color_type}"
+            if key in self.editable_values:
+                var.set(self.editable_values[key])
         
         # Update slider value labels
         self.update_value_label(self.red_var, self.red_value)
@@ -1083,37 +1128,22 @@ class ParticleEffectEditor:
     
     def update_current_values_display(self):
         """Update the display of current values"""
-        # Update RED values
-        if "Start_Red" in self.editable_values:
-            self.red_start_val.config(text=f"{self.editable_values['Start_Red']:.3f}")
-        if "End_Red" in self.editable_values:
-            self.red_end_val.config(text=f"{self.editable_values['End_Red']:.3f}")
-        if "Transition_Red" in self.editable_values:
-            self.red_trans_val.config(text=f"{self.editable_values['Transition_Red']:.3f}")
-        
-        # Update GREEN values
-        if "Start_Green" in self.editable_values:
-            self.green_start_val.config(text=f"{self.editable_values['Start_Green']:.3f}")
-        if "End_Green" in self.editable_values:
-            self.green_end_val.config(text=f"{self.editable_values['End_Green']:.3f}")
-        if "Transition_Green" in self.editable_values:
-            self.green_trans_val.config(text=f"{self.editable_values['Transition_Green']:.3f}")
-        
-        # Update BLUE values
-        if "Start_Blue" in self.editable_values:
-            self.blue_start_val.config(text=f"{self.editable_values['Start_Blue']:.3f}")
-        if "End_Blue" in self.editable_values:
-            self.blue_end_val.config(text=f"{self.editable_values['End_Blue']:.3f}")
-        if "Transition_Blue" in self.editable_values:
-            self.blue_trans_val.config(text=f"{self.editable_values['Transition_Blue']:.3f}")
-        
-        # Update ALPHA values
-        if "Start_Alpha" in self.editable_values:
-            self.alpha_start_val.config(text=f"{self.editable_values['Start_Alpha']:.3f}")
-        if "End_Alpha" in self.editable_values:
-            self.alpha_end_val.config(text=f"{self.editable_values['End_Alpha']:.3f}")
-        if "Transition_Alpha" in self.editable_values:
-            self.alpha_trans_val.config(text=f"{self.editable_values['Transition_Alpha']:.3f}")
+        labels = {
+            "Red": (self.red_start_val, self.red_end_val, self.red_trans_val),
+            "Green": (self.green_start_val, self.green_end_val, self.green_trans_val),
+            "Blue": (self.blue_start_val, self.blue_end_val, self.blue_trans_val),
+            "Alpha": (self.alpha_start_val, self.alpha_end_val, self.alpha_trans_val),
+        }
+        
+        # Values the emitter does not set show as "-"
+        for color_type, (start_label, end_label, trans_label) in labels.items():
+            for phase, label in (("Start", start_label), ("End", end_label), ("Transition", trans_label)):
+                value = self.editable_values.get(f"{phase}_{color_type}")
+                label.config(text="-" if value is None else f"{value:.3f}")
+    
+    def watch_value_label(self, var, label, is_int=False):
+        """Keep a value label in sync with its slider variable"""
+        self.scheduler.watch(var, lambda: self.update_value_label(var, label, is_int=is_int))
     
     def update_value_label(self, var, label, is_int=False):
         """Update the displayed value for a slider"""
@@ -1128,6 +1158,19 @@ class ParticleEffectEditor:
             # Handle potential errors if slider is being dragged
             pass
     
+    def update_color_ramp(self):
+        """Redraw the selected emitter's life ramp, or the sliders' before a file is loaded"""
+        if self.document:
+            params = self.emitter_parameters()
+        else:
+            sliders = {"Red": self.red_var, "Green": self.green_var, "Blue": self.blue_var, "Alpha": self.alpha_var}
+            params = {
+                f"{phase}_{channel}": var.get()
+                for channel, var in sliders.items()
+                for phase in ["Start", "Transition", "End"]
+            }
+        self.ramp_photo.paste(ramp_image(params))
+    
     def update_preview(self):
         r = int(self.red_var.get() * 255)
         g = int(self.green_var.get() * 255)
@@ -1172,254 +1215,206 @@ class ParticleEffectEditor:
         self.update_value_label(self.green_var, self.green_value)
         self.update_value_label(self.blue_var, self.blue_value)
     
-    def apply_changes(self):
-        """Apply all parameter changes to the file"""
-        if not self.file_path or not self.file_content:
-            messagebox.showerror("Error", "No file loaded")
-            return
+    def collect_assignments(self):
+        """Collect the parameter values to write from the editor controls
         
-        # Create modified content with regex replacements
-        modified_content = self.file_content
+        Returns:
+            dict: Mapping of file parameter name to new value
+        """
+        assignments = {}
         
         # COLOR TAB PARAMETERS
-        # Get RGB values from color sliders
-        red = f"{self.red_var.get():.6f}"
-        green = f"{self.green_var.get():.6f}"
-        blue = f"{self.blue_var.get():.6f}"
-        alpha = f"{self.alpha_var.get():.6f}"
-        
-        # Replace Red values
-        modified_content = re.sub(
-            r'(Start_Red NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + red,
-            modified_content
-        )
-        
-        modified_content = re.sub(
-            r'(End_Red NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + red,
-            modified_content
-        )
-        
-        modified_content = re.sub(
-            r'(Transition_Red NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + red,
-            modified_content
-        )
+        # The slider color is written to the selected phase, or to all of them
+        colors = {
+            "Red": self.red_var.get(),
+            "Green": self.green_var.get(),
+            "Blue": self.blue_var.get(),
+            "Alpha": self.alpha_var.get(),
+        }
+        for color_type, value in colors.items():
+            for phase in self.selected_phases():
+                assignments[f"{phase}_{color_type}"] = value
         
-        # Replace Green values
-        modified_content = re.sub(
-            r'(Start_Green NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + green,
-            modified_content
-        )
-        
-        modified_content = re.sub(
-            r'(End_Green NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + green,
-            modified_content
-        )
-        
-        modified_content = re.sub(
-            r'(Transition_Green NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + green,
-            modified_content
-        )
+        # SIZE TAB PARAMETERS
+        assignments["Radius"] = self.radius_var.get()
+        assignments["Final_Radius"] = self.final_radius_var.get()
+        assignments["Width"] = self.width_var.get()
+        assignments["Start_Width"] = self.width_var.get()
         
-        # Replace Blue values
-        modified_content = re.sub(
-            r'(Start_Blue NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + blue,
-            modified_content
-        )
+        # EMISSION TAB PARAMETERS
+        assignments["Emit_Per_Turn"] = self.emit_rate_var.get()
+        assignments["Life"] = self.life_var.get()
         
-        modified_content = re.sub(
-            r'(End_Blue NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + blue,
-            modified_content
-        )
+        # MOVEMENT TAB PARAMETERS
+        assignments["Initial_Velocity_X"] = self.velocity_x_var.get()
+        assignments["Initial_Velocity_Y"] = self.velocity_y_var.get()
+        assignments["Initial_Velocity_Z"] = self.velocity_z_var.get()
+        assignments["Velocity_Randomness"] = self.velocity_random_var.get()
+        assignments["GravityScalar"] = self.gravity_var.get()
+        assignments["GravityPC"] = self.gravity_var.get()
         
-        modified_content = re.sub(
-            r'(Transition_Blue NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + blue,
-            modified_content
-        )
+        # VISUAL TAB PARAMETERS
+        assignments["Blend_Mode"] = int(self.blend_mode_var.get().split(' - ')[0])
+        assignments["Anim_Speed"] = self.anim_speed_var.get()
+        assignments["Cylinder_Length"] = self.cylinder_length_var.get()
         
-        # Replace Alpha values
-        modified_content = re.sub(
-            r'(Start_Alpha NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + alpha,
-            modified_content
-        )
+        # TRAIL TAB PARAMETERS
+        assignments["Num_Points"] = self.num_points_var.get()
+        assignments["Wiggle_Factor"] = self.wiggle_var.get()
+        assignments["Disperse_Rate"] = self.disperse_var.get()
         
-        modified_content = re.sub(
-            r'(End_Alpha NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + alpha,
-            modified_content
-        )
+        return assignments
+    
+    def open_transform_dialog(self):
+        """Open the bulk transform window for the loaded file"""
+        if not self.document:
+            messagebox.showerror("Error", "No file loaded")
+            return
+        TransformDialog(self.root, self.colors, self.apply_transforms)
+    
+    def apply_transforms(self, transforms, all_emitters):
+        """Apply parsed transforms to the loaded file, pending until changes are applied
+        
+        Args:
+            transforms (list): (keys, operator, amount) tuples from parse_transform
+            all_emitters (bool): Transform every emitter instead of the selected ones
+        
+        Returns:
+            int: Number of values changed
+        """
+        if not self.document:
+            return 0
+        
+        rows = range(len(self.table)) if all_emitters else self.selected_rows()
+        changes = plan_transforms(self.table, transforms, rows)
+        self.patch_values(changes)
+        self.refresh_controls()
+        
+        self.status_var.set(f"TRANSFORMED {len(changes)} VALUES")
+        return len(changes)
+    
+    def open_recolor_dialog(self):
+        """Open the faction recolor window for the loaded file"""
+        if not self.document:
+            messagebox.showerror("Error", "No file loaded")
+            return
+        RecolorDialog(self.root, self.colors, self.apply_recolor)
+    
+    def apply_recolor(self, hue, saturation, value, target, all_emitters):
+        """Shift the loaded file's colors in HSV space, pending until changes are applied
+        
+        Args:
+            hue (float): Hue rotation in degrees
+            saturation (float): Saturation multiplier
+            value (float): Brightness multiplier
+            target (tuple, optional): RGB color whose hue every color takes
+            all_emitters (bool): Recolor every emitter instead of the selected ones
+        
+        Returns:
+            int: Number of values changed
+        """
+        if not self.document:
+            return 0
+        
+        rows, phases, rgb = gather_colors(self.table)
+        if not all_emitters:
+            keep = np.isin(rows, list(self.selected_rows()))
+            rows, phases, rgb = rows[keep], phases[keep], rgb[keep]
+        changes = color_changes(self.table, rows, phases, recolor(rgb, hue, saturation, value, target))
+        self.patch_values(changes)
+        self.refresh_controls()
+        
+        self.status_var.set(f"RECOLORED {len(rows)} COLORS ({len(changes)} VALUES)")
+        return len(changes)
+    
+    def refresh_controls(self):
+        """Show values changed in the document in the controls without patching them again"""
+        self.extract_editable_values()
+        self.extract_parameters()
+        self.reset_live_patching()
+        self.refresh_preview()
+        self.update_color_ramp()
+        self.update_budget()
+    
+    def export_preview(self):
+        """Export the loaded effect's preview as an animated GIF or PNG"""
+        if not self.document:
+            messagebox.showerror("Error", "No file loaded")
+            return
+        if self.export_thread is not None:
+            return
         
-        modified_content = re.sub(
-            r'(Transition_Alpha NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-            r'\g<1>' + alpha,
-            modified_content
+        out_path = filedialog.asksaveasfilename(
+            title="Export Effect Animation",
+            defaultextension=".gif",
+            initialfile=os.path.splitext(os.path.basename(self.file_path))[0] + ".gif",
+            filetypes=[("Animated GIF", "*.gif"), ("Animated PNG", "*.png")]
         )
+        if not out_path:
+            return
         
-        # SIZE TAB PARAMETERS
-        # Replace Radius values
-        if hasattr(self, 'radius_var'):
-            modified_content = re.sub(
-                r'(Radius NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-                f'\\g<1>{self.radius_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace Final_Radius values
-        if hasattr(self, 'final_radius_var'):
-            modified_content = re.sub(
-                r'(Final_Radius )\d+\.\d+',
-                f'\\g<1>{self.final_radius_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace Width values
-        if hasattr(self, 'width_var'):
-            modified_content = re.sub(
-                r'(Width )\d+\.\d+',
-                f'\\g<1>{self.width_var.get():.6f}',
-                modified_content
-            )
-            
-            # Also update Start_Width if it exists
-            modified_content = re.sub(
-                r'(Start_Width )\d+\.\d+',
-                f'\\g<1>{self.width_var.get():.6f}',
-                modified_content
-            )
-        
-        # EMISSION TAB PARAMETERS
-        # Replace Emit_Per_Turn values
-        if hasattr(self, 'emit_rate_var'):
-            modified_content = re.sub(
-                r'(Emit_Per_Turn NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-                f'\\g<1>{self.emit_rate_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace Life values
-        if hasattr(self, 'life_var'):
-            modified_content = re.sub(
-                r'(Life )(-?\d+)',
-                f'\\g<1>{int(self.life_var.get())}',
-                modified_content
-            )
-        
-        # MOVEMENT TAB PARAMETERS
-        # Replace Initial_Velocity values
-        if hasattr(self, 'velocity_x_var'):
-            modified_content = re.sub(
-                r'(Initial_Velocity_X NUMBER_VERSION_2\n\*\*\*\*1: )-?\d+\.\d+',
-                f'\\g<1>{self.velocity_x_var.get():.6f}',
-                modified_content
-            )
-        
-        if hasattr(self, 'velocity_y_var'):
-            modified_content = re.sub(
-                r'(Initial_Velocity_Y NUMBER_VERSION_2\n\*\*\*\*1: )-?\d+\.\d+',
-                f'\\g<1>{self.velocity_y_var.get():.6f}',
-                modified_content
-            )
-        
-        if hasattr(self, 'velocity_z_var'):
-            modified_content = re.sub(
-                r'(Initial_Velocity_Z NUMBER_VERSION_2\n\*\*\*\*1: )-?\d+\.\d+',
-                f'\\g<1>{self.velocity_z_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace Velocity_Randomness
-        if hasattr(self, 'velocity_random_var'):
-            modified_content = re.sub(
-                r'(Velocity_Randomness NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-                f'\\g<1>{self.velocity_random_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace GravityScalar and GravityPC values
-        if hasattr(self, 'gravity_var'):
-            modified_content = re.sub(
-                r'(GravityScalar )-?\d+\.\d+',
-                f'\\g<1>{self.gravity_var.get():.6f}',
-                modified_content
-            )
-            
-            modified_content = re.sub(
-                r'(GravityPC NUMBER_VERSION_2\n\*\*\*\*1: )-?\d+\.\d+',
-                f'\\g<1>{self.gravity_var.get():.6f}',
-                modified_content
-            )
+        # Includes slider changes that have not been applied yet
+        text = self.document.render()
+        self.export_progress = 0.0
+        self.export_error = None
+        self.export_thread = threading.Thread(target=self.run_export, args=(text, out_path), daemon=True)
+        self.export_thread.start()
+        
+        self.export_button.config(state=tk.DISABLED)
+        self.status_var.set(f"EXPORTING: {os.path.basename(out_path)}")
+        self.progress_var.set(0)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        self.root.after(100, self.check_export, out_path)
+    
+    def run_export(self, text, out_path):
+        """Render and write an animation; runs on a worker thread"""
+        try:
+            export_animation(text, out_path, progress=lambda fraction: setattr(self, 'export_progress', fraction))
+        except Exception as e:
+            self.export_error = e
+    
+    def check_export(self, out_path):
+        """Show export progress and report the result when it finishes"""
+        self.progress_var.set(self.export_progress * 100)
+        if self.export_thread.is_alive():
+            self.root.after(100, self.check_export, out_path)
+            return
         
-        # VISUAL TAB PARAMETERS
-        # Replace Blend_Mode
-        if hasattr(self, 'blend_mode_var'):
-            blend_value = int(self.blend_mode_var.get().split(' - ')[0])
-            modified_content = re.sub(
-                r'(Blend_Mode )\d+',
-                f'\\g<1>{blend_value}',
-                modified_content
-            )
-        
-        # Replace Anim_Speed
-        if hasattr(self, 'anim_speed_var'):
-            modified_content = re.sub(
-                r'(Anim_Speed )\d+\.\d+',
-                f'\\g<1>{self.anim_speed_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace Cylinder_Length
-        if hasattr(self, 'cylinder_length_var'):
-            modified_content = re.sub(
-                r'(Cylinder_Length NUMBER_VERSION_2\n\*\*\*\*1: )\d+\.\d+',
-                f'\\g<1>{self.cylinder_length_var.get():.6f}',
-                modified_content
-            )
+        self.export_thread = None
+        self.export_button.config(state=tk.NORMAL)
+        self.progress_bar.pack_forget()
+        if self.export_error:
+            self.status_var.set("ERROR: EXPORT FAILED")
+            messagebox.showerror("Error", f"Failed to export animation: {str(self.export_error)}")
+        else:
+            self.status_var.set(f"EXPORTED: {os.path.basename(out_path)}")
+    
+    def apply_changes(self):
+        """Apply all parameter changes to the file"""
+        if not self.file_path or not self.file_content:
+            messagebox.showerror("Error", "No file loaded")
+            return
         
-        # TRAIL TAB PARAMETERS
-        # Replace Num_Points
-        if hasattr(self, 'num_points_var'):
-            modified_content = re.sub(
-                r'(Num_Points )\d+',
-                f'\\g<1>{int(self.num_points_var.get())}',
-                modified_content
-            )
-        
-        # Replace Wiggle_Factor
-        if hasattr(self, 'wiggle_var'):
-            modified_content = re.sub(
-                r'(Wiggle_Factor )\d+\.\d+',
-                f'\\g<1>{self.wiggle_var.get():.6f}',
-                modified_content
-            )
-        
-        # Replace Disperse_Rate
-        if hasattr(self, 'disperse_var'):
-            modified_content = re.sub(
-                r'(Disperse_Rate )\d+\.\d+',
-                f'\\g<1>{self.disperse_var.get():.6f}',
-                modified_content
-            )
+        # Bring changed values up to date, then build the new content in one splice pass
+        self.patch_parameters(list(self.collect_assignments()))
+        modified_content = self.document.render()
+        changed_emitters = len(self.table.changed_rows)
         
         # Save the modified content back to the file
         try:
             with open(self.file_path, 'w') as file:
                 file.write(modified_content)
             
-            # Update the displayed file content
+            # The viewer already shows the new values; only the offsets move
+            self.document.commit(modified_content)
+            self.table.clear_changes()
             self.file_content = modified_content
-            self.display_file_content()
+            if self.virtual_viewer_active:
+                self.virtual_viewer.reload(modified_content)
             self.extract_editable_values()  # Update displayed color values
+            self.reset_live_patching()
             
             messagebox.showinfo("SUCCESS", f"Changes deployed to {os.path.basename(self.file_path)}")
-            self.status_var.set(f"MISSION COMPLETE: {os.path.basename(self.file_path)} UPDATED")
+            self.status_var.set(f"MISSION COMPLETE: {os.path.basename(self.file_path)} UPDATED ({changed_emitters} EMITTERS CHANGED)")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to apply changes: {str(e)}")
\ No newline at end of file
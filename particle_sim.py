@@ -0,0 +1,311 @@
+import numpy as np
+from PIL import Image
+
+from preview_compositor import blend_mode, resolve, sprite_weights
+
+# Parameter values used when an emitter leaves one out
+DEFAULT_PARAMETERS = {
+    "Start_Red": 1.0, "Start_Green": 1.0, "Start_Blue": 1.0, "Start_Alpha": 1.0,
+    "Transition_Red": 1.0, "Transition_Green": 1.0, "Transition_Blue": 1.0, "Transition_Alpha": 1.0,
+    "End_Red": 1.0, "End_Green": 1.0, "End_Blue": 1.0, "End_Alpha": 0.0,
+    "Radius": 1.0, "Final_Radius": 1.0, "Width": 0.2, "Start_Width": 0.2,
+    "Emit_Per_Turn": 1.0, "Life": 20,
+    "Initial_Velocity_X": 0.0, "Initial_Velocity_Y": 0.2, "Initial_Velocity_Z": 0.0,
+    "Velocity_Randomness": 0.05, "GravityScalar": 0.0, "GravityPC": 0.0,
+    "Blend_Mode": 0, "Anim_Speed": 1.0, "Cylinder_Length": 1.0,
+    "Num_Points": 10, "Wiggle_Factor": 0.0, "Disperse_Rate": 0.0,
+}
+
+# Color channels with a Start, Transition and End value
+RAMP_CHANNELS = ("Red", "Green", "Blue", "Alpha")
+
+# Most particles a simulation keeps alive at once
+MAX_PARTICLES = 16384
+
+# Lifetime in turns for particles whose Life is zero or negative
+UNLIMITED_LIFE_TURNS = 60
+
+# Largest sprite radius drawn at full resolution, in pixels; bigger
+# sprites are drawn at half, quarter... resolution and scaled up
+SPLAT_RADIUS = 4
+
+# Number of resolution halvings available for big sprites
+MAX_SPLAT_LEVEL = 4
+
+# World units visible across the height of a preview
+PREVIEW_WORLD_HEIGHT = 12.0
+
+
+def complete_parameters(found):
+    """Fill in the parameters an emitter does not set
+
+    Args:
+        found (dict): Values read from one emitter
+
+    Returns:
+        dict: Value for every key in DEFAULT_PARAMETERS
+    """
+    params = dict(DEFAULT_PARAMETERS)
+    found = dict(found)
+
+    # Same fallbacks the editor uses for alternative key names
+    if "GravityScalar" not in found and "GravityPC" in found:
+        found["GravityScalar"] = found["GravityPC"]
+    if "Width" not in found and "Start_Width" in found:
+        found["Width"] = found["Start_Width"]
+    if "Final_Radius" not in found and "Radius" in found:
+        found["Final_Radius"] = found["Radius"]
+
+    # A missing phase continues the ramp from the phases that are present
+    for channel in RAMP_CHANNELS:
+        start = found.setdefault(f"Start_{channel}", params[f"Start_{channel}"])
+        end = found.setdefault(f"End_{channel}", start)
+        found.setdefault(f"Transition_{channel}", (start + end) / 2)
+
+    params.update(found)
+    return params
+
+
+def ramp(params, channel, progress):
+    """Interpolate a Start -> Transition -> End ramp at each progress value (0-1)"""
+    start = params[f"Start_{channel}"]
+    middle = params[f"Transition_{channel}"]
+    end = params[f"End_{channel}"]
+    first_half = start + (middle - start) * (progress * 2)
+    second_half = middle + (end - middle) * (progress * 2 - 1)
+    return np.where(progress < 0.5, first_half, second_half)
+
+
+class ParticleSimulation:
+    """Particles of one emitter, advanced a game turn at a time as NumPy arrays
+
+    Live particles are packed at the start of preallocated arrays, so a
+    step is a handful of array operations whatever the particle count.
+    """
+
+    def __init__(self, params, seed=0, capacity=MAX_PARTICLES):
+        self.params = params
+        self.seed = seed
+        self.capacity = capacity
+        self.position = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.life = np.ones(capacity, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Remove all particles and restart the random sequence"""
+        self.rng = np.random.default_rng(self.seed)
+        self.count = 0
+        self.turn = 0
+        self.emit_carry = 0.0
+
+    def set_parameters(self, params):
+        """Use new parameter values from the next turn on, keeping live particles"""
+        self.params = params
+
+    def step(self, turns=1):
+        """Advance the simulation by a number of game turns"""
+        for _ in range(turns):
+            self._advance()
+            self._emit()
+            self.turn += 1
+
+    def progress(self):
+        """Return how far through its life each live particle is (0-1)"""
+        count = self.count
+        return np.minimum(self.age[:count] / self.life[:count], 1.0)
+
+    def sprites(self, renderer):
+        """Return screen position, pixel radius and RGBA color of every live particle"""
+        params = self.params
+        progress = self.progress()
+        x, y = renderer.project(self.position[:self.count])
+        radius = (params["Radius"] + (params["Final_Radius"] - params["Radius"]) * progress) * renderer.scale
+        rgba = np.stack([np.clip(ramp(params, channel, progress), 0.0, 1.0) for channel in RAMP_CHANNELS], axis=1)
+        return x, y, radius, rgba
+
+    def _advance(self):
+        """Move and age the live particles, dropping the ones that expired"""
+        count = self.count
+        if not count:
+            return
+
+        self.velocity[:count, 1] -= self.params["GravityScalar"]
+        self.position[:count] += self.velocity[:count]
+        self.age[:count] += 1
+
+        keep = self.age[:count] < self.life[:count]
+        alive = int(np.count_nonzero(keep))
+        if alive < count:
+            for array in (self.position, self.velocity, self.age, self.life):
+                array[:alive] = array[:count][keep]
+        self.count = alive
+
+    def _emit(self):
+        """Spawn this turn's particles at the emitter"""
+        params = self.params
+        self.emit_carry += max(params["Emit_Per_Turn"], 0.0)
+        whole = int(self.emit_carry)
+        self.emit_carry -= whole
+        spawn = min(whole, self.capacity - self.count)
+        if spawn <= 0:
+            return
+
+        new = slice(self.count, self.count + spawn)
+        base = np.array([params["Initial_Velocity_X"], params["Initial_Velocity_Y"],
+                         params["Initial_Velocity_Z"]], dtype=np.float32)
+        jitter = self.rng.uniform(-1.0, 1.0, (spawn, 3)).astype(np.float32)
+        self.position[new] = 0.0
+        self.velocity[new] = base + jitter * params["Velocity_Randomness"]
+        self.age[new] = 0.0
+        life = params["Life"]
+        self.life[new] = life if life > 0 else UNLIMITED_LIFE_TURNS
+        self.count += spawn
+
+
+class ParticleRenderer:
+    """Draws a particle simulation offscreen into PIL images"""
+
+    def __init__(self, width, height, background=(0, 0, 0), world_height=PREVIEW_WORLD_HEIGHT):
+        self.width = width
+        self.height = height
+        self.background = np.array(background, dtype=np.float32) / 255.0
+        self.scale = height / world_height      # Pixels per world unit
+        self.origin = (width / 2, height * 0.75)
+        self._stencils = {}
+
+    def project(self, position):
+        """Map world positions to pixel coordinates with an oblique projection
+
+        Z is drawn up and to the right, so movement along every axis shows
+        in a flat preview.
+        """
+        x = position[:, 0] + 0.5 * position[:, 2]
+        y = position[:, 1] + 0.3 * position[:, 2]
+        return self.origin[0] + x * self.scale, self.origin[1] - y * self.scale
+
+    def stencil(self, size):
+        """Return pixel offsets and distances for a disc of a whole-pixel radius"""
+        if size not in self._stencils:
+            dy, dx = np.mgrid[-size:size + 1, -size:size + 1]
+            distance = np.hypot(dx, dy).ravel().astype(np.float32)
+            inside = distance <= size
+            self._stencils[size] = (dx.ravel()[inside], dy.ravel()[inside], distance[inside])
+        return self._stencils[size]
+
+    def rasterize(self, x, y, radius, width, height):
+        """Cover pixels of a width x height buffer with soft discs, one per sprite
+
+        Sprites are grouped by radius, so the work is a loop over distinct
+        radii rather than over sprites. Pixels outside the buffer point at
+        index width * height, one past the end, with zero coverage.
+
+        Returns:
+            list: (sprite, pixel, coverage) per group, where sprite holds the
+                group's sprite indices and pixel and coverage are
+                (sprites, stencil size) arrays of flat pixel indices and
+                coverage (0-1)
+        """
+        visible = (x + radius >= 0) & (x - radius < width) & (y + radius >= 0) & (y - radius < height)
+        sprites = np.flatnonzero(visible)
+        sizes = np.ceil(radius[sprites]).astype(np.int32)
+        center_x = np.rint(x[sprites]).astype(np.int32)
+        center_y = np.rint(y[sprites]).astype(np.int32)
+        radius = radius.astype(np.float32)
+
+        groups = []
+        for size in np.unique(sizes):
+            members = np.flatnonzero(sizes == size)
+            dx, dy, distance = self.stencil(int(size))
+            px = center_x[members, None] + dx
+            py = center_y[members, None] + dy
+            coverage = np.maximum(1.0 - distance / (radius[sprites[members], None] + 0.5), 0.0)
+            pixel = py * width + px
+            outside = (px < 0) | (px >= width) | (py < 0) | (py >= height)
+            pixel[outside] = width * height
+            coverage[outside] = 0.0
+            groups.append((sprites[members], pixel, coverage))
+        return groups
+
+    def splat(self, x, y, radius, weights):
+        """Sum per-sprite weights over the pixels each sprite covers
+
+        Large sprites are drawn into lower resolution buffers (one level per
+        halving) that are scaled back up, so no sprite covers more than
+        about SPLAT_RADIUS pixels across, however big it is on screen.
+
+        Args:
+            x, y, radius (ndarray): Sprite centers and radii in pixels
+            weights (ndarray): (sprites, k) values to accumulate
+
+        Returns:
+            ndarray: (height, width, k) sums, each weight scaled by coverage
+        """
+        radius = np.clip(radius, 0.5, SPLAT_RADIUS << MAX_SPLAT_LEVEL)
+        weights = np.asarray(weights, dtype=np.float32)
+        channels = weights.shape[1]
+        result = np.zeros((self.height, self.width, channels), dtype=np.float32)
+
+        levels = np.clip(np.ceil(np.log2(radius / SPLAT_RADIUS)), 0, MAX_SPLAT_LEVEL).astype(np.int32)
+        for level in np.unique(levels):
+            members = np.flatnonzero(levels == level)
+            factor = 1 << int(level)
+            width = -(-self.width // factor)
+            height = -(-self.height // factor)
+            groups = self.rasterize(
+                (x[members] + 0.5) / factor - 0.5, (y[members] + 0.5) / factor - 0.5,
+                radius[members] / factor, width, height)
+            if not groups:
+                continue
+
+            # One extra bin catches the pixels that fell outside the buffer
+            pixel = np.concatenate([group[1].ravel() for group in groups])
+            for channel in range(channels):
+                contribution = np.concatenate([
+                    (coverage * weights[members[sprite], channel, None]).ravel()
+                    for sprite, _, coverage in groups
+                ])
+                buffer = np.bincount(pixel, weights=contribution, minlength=width * height + 1)
+                buffer = buffer[:-1].astype(np.float32).reshape(height, width)
+                if factor > 1:
+                    buffer = Image.fromarray(buffer, "F").resize((width * factor, height * factor), Image.BILINEAR)
+                    buffer = np.asarray(buffer)[:self.height, :self.width]
+                result[:, :, channel] += buffer
+        return result
+
+    def render(self, simulation, mode=None):
+        """Render the current state of a simulation
+
+        Any simulation with a sprites(renderer) method returning screen
+        positions, pixel radii and RGBA colors can be drawn.
+
+        Args:
+            simulation: Particle or trail simulation
+            mode (int, optional): Blend mode; defaults to the simulation's Blend_Mode
+
+        Returns:
+            Image: RGB preview frame
+        """
+        if mode is None:
+            mode = blend_mode(simulation.params["Blend_Mode"])
+        x, y, radius, rgba = simulation.sprites(self)
+        sums = self.splat(x, y, radius, sprite_weights(rgba, mode))
+        frame = resolve(sums, self.background, mode)
+        return Image.fromarray((frame * 255).astype(np.uint8), "RGB")
+
+    def render_layers(self, simulations):
+        """Render several simulations over each other, in order
+
+        Each layer is blended onto the ones below it with its own
+        Blend_Mode, the way a multi-emitter effect is drawn.
+
+        Returns:
+            Image: RGB frame
+        """
+        frame = np.broadcast_to(self.background, (self.height, self.width, 3))
+        for simulation in simulations:
+            mode = blend_mode(simulation.params["Blend_Mode"])
+            x, y, radius, rgba = simulation.sprites(self)
+            frame = resolve(self.splat(x, y, radius, sprite_weights(rgba, mode)), frame, mode)
+        return Image.fromarray((frame * 255).astype(np.uint8), "RGB")
@@ -0,0 +1,75 @@
+import numpy as np
+
+# Blend_Mode values, as listed in the VISUAL tab
+BLEND_NORMAL = 0
+BLEND_ADDITIVE = 1
+BLEND_MULTIPLY = 2
+BLEND_SCREEN = 3
+
+BLEND_MODE_NAMES = {
+    BLEND_NORMAL: "Normal",
+    BLEND_ADDITIVE: "Additive",
+    BLEND_MULTIPLY: "Multiply",
+    BLEND_SCREEN: "Screen",
+}
+
+# Smallest factor taken a logarithm of, so fully opaque black stays finite
+_LOG_FLOOR = 1e-4
+
+
+def blend_mode(value):
+    """Return the blend mode for a Blend_Mode value, falling back to normal"""
+    mode = int(value)
+    return mode if mode in BLEND_MODE_NAMES else BLEND_NORMAL
+
+
+def sprite_weights(rgba, mode):
+    """Return the per-sprite values to accumulate for a blend mode
+
+    Every mode is reduced to a sum over the sprites covering a pixel.
+    Multiply and screen are products of per-sprite factors, so their
+    logarithms are summed instead.
+
+    Args:
+        rgba (ndarray): (sprites, 4) colors with alpha, 0-1
+        mode (int): Blend mode
+
+    Returns:
+        ndarray: (sprites, k) weights for ParticleRenderer.splat
+    """
+    alpha = rgba[:, 3:]
+    color = rgba[:, :3]
+    if mode == BLEND_ADDITIVE:
+        return alpha * color
+    if mode == BLEND_MULTIPLY:
+        # Tints towards the color as alpha rises; alpha 0 leaves the pixel as it was
+        return np.log(np.maximum(1.0 - alpha * (1.0 - color), _LOG_FLOOR))
+    if mode == BLEND_SCREEN:
+        return np.log(np.maximum(1.0 - alpha * color, _LOG_FLOOR))
+    return np.hstack([alpha, alpha * color])
+
+
+def resolve(sums, background, mode):
+    """Turn accumulated sprite weights into final pixel colors
+
+    Args:
+        sums (ndarray): (height, width, k) output of ParticleRenderer.splat
+        background (ndarray): RGB background color, 0-1
+        mode (int): Blend mode the weights were made for
+
+    Returns:
+        ndarray: (height, width, 3) colors, 0-1
+    """
+    if mode == BLEND_ADDITIVE:
+        frame = background + sums
+    elif mode == BLEND_MULTIPLY:
+        frame = background * np.exp(sums)
+    elif mode == BLEND_SCREEN:
+        frame = 1.0 - (1.0 - background) * np.exp(sums)
+    else:
+        # Order-independent over: colors averaged by alpha, opacity builds up with the summed alpha
+        total = sums[:, :, :1]
+        opacity = 1.0 - np.exp(-total)
+        average = np.divide(sums[:, :, 1:], total, out=np.zeros_like(sums[:, :, 1:]), where=total > 0)
+        frame = background * (1.0 - opacity) + average * opacity
+    return np.clip(frame, 0.0, 1.0)
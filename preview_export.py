@@ -0,0 +1,200 @@
+import os
+import pickle
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+from effect_parser import parse_effect
+from thumbnail_render import effect_simulations, render_turns
+
+# Animation formats, picked by file extension
+EXPORT_FORMATS = {".gif": "gif", ".png": "apng", ".apng": "apng"}
+
+# Default animation size, length and speed
+EXPORT_SIZE = (320, 180)
+EXPORT_FRAMES = 90
+EXPORT_FPS = 30
+
+# Frames rendered per worker job; each job starts from a saved simulation state
+EXPORT_CHUNK_FRAMES = 10
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def export_format(path):
+    """Return the animation format for an output path, or raise ValueError"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported animation type '{extension}', use .gif or .png")
+    return EXPORT_FORMATS[extension]
+
+
+def encode_frame(image, fmt, duration_ms):
+    """Encode one RGB frame for streaming into a GIF or APNG
+
+    Returns:
+        bytes: GIF image block, or zlib-compressed PNG scanlines
+    """
+    if fmt == "gif":
+        frame = image.quantize(colors=256)
+        return b"".join(GifImagePlugin.getdata(frame, duration=duration_ms, include_color_table=True))
+
+    # PNG scanlines, each starting with filter type 0
+    pixels = np.asarray(image, dtype=np.uint8).reshape(image.height, -1)
+    scanlines = np.hstack([np.zeros((image.height, 1), dtype=np.uint8), pixels])
+    return zlib.compress(scanlines.tobytes(), 6)
+
+
+def simulation_chunks(text, frame_count):
+    """Simulate an effect once, saving its state at the start of each run of frames
+
+    Each run only has to be stepped through its own turns, so the whole
+    clip costs one simulation however it is split across workers.
+
+    Yields:
+        tuple: (pickled simulations, turns of the run)
+    """
+    simulations = effect_simulations(parse_effect(text))
+    for first in range(1, frame_count + 1, EXPORT_CHUNK_FRAMES):
+        for simulation in simulations:
+            simulation.step(first - 1 - simulation.turn)
+        yield pickle.dumps(simulations), list(range(first, min(first + EXPORT_CHUNK_FRAMES, frame_count + 1)))
+
+
+def render_chunk(job):
+    """Render and encode a run of frames; runs in a worker process
+
+    Args:
+        job (tuple): (pickled simulations, size, turns, format, frame duration in ms)
+
+    Returns:
+        list: Encoded frames, see encode_frame
+    """
+    state, size, turns, fmt, duration_ms = job
+    frames = render_turns(pickle.loads(state), turns, size)
+    return [encode_frame(frame, fmt, duration_ms) for frame in frames]
+
+
+class ApngWriter:
+    """Writes an animated PNG one frame at a time"""
+
+    def __init__(self, file, size, frame_count, duration_ms):
+        self.file = file
+        self.size = size
+        self.duration_ms = duration_ms
+        self.sequence = 0
+        self.frames = 0
+
+        width, height = size
+        file.write(_PNG_SIGNATURE)
+        # 8-bit truecolor, no interlacing
+        self.chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        # Frame count, loop forever
+        self.chunk(b"acTL", struct.pack(">II", frame_count, 0))
+
+    def chunk(self, kind, data):
+        """Write a PNG chunk with its length and CRC"""
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write_frame(self, data):
+        """Write one frame from encode_frame"""
+        width, height = self.size
+        self.chunk(b"fcTL", struct.pack(">IIIIIHHBB", self.sequence, width, height, 0, 0,
+                                        self.duration_ms, 1000, 0, 0))
+        self.sequence += 1
+        if self.frames == 0:
+            # The first frame doubles as the still image
+            self.chunk(b"IDAT", data)
+        else:
+            self.chunk(b"fdAT", struct.pack(">I", self.sequence) + data)
+            self.sequence += 1
+        self.frames += 1
+
+    def close(self):
+        self.chunk(b"IEND", b"")
+
+
+class GifWriter:
+    """Writes an animated GIF one frame at a time, each with its own palette"""
+
+    def __init__(self, file, size, frame_count, duration_ms):
+        self.file = file
+        header, _ = GifImagePlugin.getheader(Image.new("P", size), info={"loop": 0})
+        for block in header:
+            file.write(block)
+
+    def write_frame(self, data):
+        """Write one frame from encode_frame"""
+        self.file.write(data)
+
+    def close(self):
+        self.file.write(b";")
+
+
+def export_animation(text, out_path, frame_count=EXPORT_FRAMES, size=EXPORT_SIZE, fps=EXPORT_FPS,
+                     jobs=None, progress=None):
+    """Render an effect's preview animation to a GIF or APNG file
+
+    The effect is simulated once here. Runs of frames are rendered and
+    encoded across a process pool, each from the simulation state at its
+    first turn. They are written as soon as they are next in line, with
+    only a few runs in flight, so memory use does not grow with the clip
+    length.
+
+    Args:
+        text (str): Effect file content
+        out_path (str): .gif, .png or .apng file to write
+        frame_count (int): Number of frames; frame n shows game turn n
+        size (tuple): Frame width and height in pixels
+        fps (int): Playback speed
+        jobs (int, optional): Worker processes; 1 renders in this process
+        progress (callable, optional): Called with the fraction written (0-1)
+
+    Raises:
+        ValueError: If the output type is not supported, or there are no
+            frames or no playback speed to write
+    """
+    fmt = export_format(out_path)
+    if frame_count < 1:
+        raise ValueError(f"Need at least one frame, got {frame_count}")
+    if fps <= 0:
+        raise ValueError(f"Frames per second must be above 0, got {fps}")
+    duration_ms = max(1, round(1000 / fps))
+
+    with open(out_path, 'wb') as file:
+        writer_class = GifWriter if fmt == "gif" else ApngWriter
+        writer = writer_class(file, size, frame_count, duration_ms)
+        written = 0
+
+        def write(frames):
+            nonlocal written
+            for frame in frames:
+                writer.write_frame(frame)
+            written += len(frames)
+            if progress:
+                progress(written / frame_count)
+
+        if jobs == 1 or frame_count <= EXPORT_CHUNK_FRAMES:
+            simulations = effect_simulations(parse_effect(text))
+            for first in range(1, frame_count + 1, EXPORT_CHUNK_FRAMES):
+                turns = range(first, min(first + EXPORT_CHUNK_FRAMES, frame_count + 1))
+                write([encode_frame(frame, fmt, duration_ms) for frame in render_turns(simulations, turns, size)])
+        else:
+            workers = jobs or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # States are saved only as runs are queued, a few ahead of the writer
+                queued = simulation_chunks(text, frame_count)
+                in_flight = deque()
+                for state, turns in queued:
+                    in_flight.append(pool.submit(render_chunk, (state, size, turns, fmt, duration_ms)))
+                    if len(in_flight) >= 2 * workers:
+                        write(in_flight.popleft().result())
+                while in_flight:
+                    write(in_flight.popleft().result())
+
+        writer.close()
@@ -0,0 +1,72 @@
+import tkinter as tk
+from tkinter import ttk
+
+from faction_recolor import FACTION_COLORS
+
+# Faction choice that keeps every color's own hue
+NO_FACTION = "NONE"
+
+
+class RecolorDialog:
+    """Window for shifting the open file's colors in HSV space"""
+
+    def __init__(self, root, colors, on_apply):
+        self.root = root
+        self.colors = colors
+        self.on_apply = on_apply    # Called with (hue, saturation, value, target, all_emitters); returns values changed
+
+        self.window = tk.Toplevel(root)
+        self.window.title("FACTION RECOLOR")
+        self.window.geometry("460x300")
+        self.window.configure(bg=colors['background'])
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the dialog widgets"""
+        frame = ttk.Frame(self.window, padding="10", style="Military.TFrame")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        controls = ttk.LabelFrame(frame, text="COLOR SHIFT", padding="5", style="Military.TLabelframe")
+        controls.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        ttk.Label(controls, text="FACTION:", style="Military.TLabel").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
+        self.faction_var = tk.StringVar(value=NO_FACTION)
+        ttk.Combobox(controls, textvariable=self.faction_var, state="readonly",
+                     values=[NO_FACTION] + [name.upper() for name in FACTION_COLORS]).grid(
+            row=0, column=1, padx=5, pady=5, sticky=tk.EW)
+
+        self.hue_var = self.add_slider(controls, 1, "HUE SHIFT:", -180.0, 180.0, 0.0, "{:+.0f}")
+        self.saturation_var = self.add_slider(controls, 2, "SATURATION:", 0.0, 2.0, 1.0, "{:.2f}")
+        self.value_var = self.add_slider(controls, 3, "BRIGHTNESS:", 0.0, 2.0, 1.0, "{:.2f}")
+        controls.columnconfigure(1, weight=1)
+
+        button_frame = ttk.Frame(frame, style="Military.TFrame")
+        button_frame.pack(fill=tk.X, pady=5)
+
+        self.all_emitters_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(button_frame, text="ALL EMITTERS", variable=self.all_emitters_var).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(button_frame, text="APPLY", command=self.apply, style="Deploy.TButton").pack(side=tk.RIGHT, padx=5)
+
+        self.status_var = tk.StringVar(value="CHANGES SHOW IN THE VIEWER; APPLY CHANGES SAVES THEM")
+        ttk.Label(frame, textvariable=self.status_var, style="Status.TLabel").pack(fill=tk.X)
+
+    def add_slider(self, parent, row, text, low, high, initial, label_format):
+        """Add a labelled slider with a value readout, returning its variable"""
+        ttk.Label(parent, text=text, style="Military.TLabel").grid(row=row, column=0, padx=5, pady=5, sticky=tk.W)
+        var = tk.DoubleVar(value=initial)
+        ttk.Scale(parent, from_=low, to=high, variable=var, orient=tk.HORIZONTAL).grid(
+            row=row, column=1, padx=5, pady=5, sticky=tk.EW)
+        label = ttk.Label(parent, text=label_format.format(initial), style="Value.TLabel")
+        label.grid(row=row, column=2, padx=5, pady=5)
+        var.trace_add("write", lambda *args: label.config(text=label_format.format(var.get())))
+        return var
+
+    def apply(self):
+        """Recolor the open file with the chosen settings"""
+        faction = self.faction_var.get().lower()
+        target = FACTION_COLORS.get(faction)
+        changed = self.on_apply(self.hue_var.get(), self.saturation_var.get(), self.value_var.get(),
+                                target, self.all_emitters_var.get())
+        self.status_var.set(f"{changed} VALUES CHANGED")
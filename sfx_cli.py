@@ -0,0 +1,485 @@
+import argparse
+import os
+import sys
+import time
+
+from budget_analyzer import DEFAULT_BUDGETS, aggregate_folders, analyze_files, over_budget, store_costs
+from effect_batch import find_effect_files, run_parallel, set_parameters
+from effect_catalog import DEFAULT_CATALOG_PATH, EffectCatalog, parse_condition
+from effect_columns import COLUMN_PARAMETERS, ColumnStore, catalog_rows, export_columns, write_columns
+from effect_parser import EDITABLE_PARAMETERS
+from effect_transform import parse_transform, transform_file
+from faction_recolor import FACTION_COLORS, parse_color, recolor_files
+from lod_generator import LOD_KEEP, LOD_SUFFIX, cost_reduction, generate_lods
+from preview_export import EXPORT_FPS, EXPORT_FRAMES, EXPORT_SIZE, export_animation, export_format
+from thumbnail_render import SHEET_COLUMNS, THUMBNAIL_SIZE, THUMBNAIL_TURN, render_directory
+
+
+def parse_assignment(text):
+    """Parse a KEY=VALUE command-line assignment"""
+    key, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got '{text}'")
+    if key not in EDITABLE_PARAMETERS:
+        raise argparse.ArgumentTypeError(f"unknown parameter '{key}'")
+    try:
+        return key, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"value for {key} is not a number: '{value}'")
+
+
+def command_set(args):
+    """Write parameter values into every matching effect file"""
+    files = find_effect_files(args.paths)
+    if not files:
+        print("No effect files found")
+        return 1
+
+    assignments = dict(args.assignments)
+    start = time.perf_counter()
+    results = run_parallel(set_parameters, [(path, assignments, args.dry_run) for path in files], args.jobs)
+    return report_changes(files, results, args.dry_run, time.perf_counter() - start)
+
+
+def report_changes(files, results, dry_run, elapsed):
+    """Print the per-file and total changes of a batch edit
+
+    Returns:
+        int: Exit status, 1 if any file failed
+    """
+    totals = {}
+    changed_files = 0
+    failed_files = 0
+    for result in results:
+        if result["error"]:
+            failed_files += 1
+            print(f"ERROR    {result['file']}: {result['error']}")
+        elif result["changes"]:
+            changed_files += 1
+            summary = ", ".join(f"{key} x{count}" for key, count in sorted(result["changes"].items()))
+            print(f"{'WOULD UPDATE' if dry_run else 'UPDATED'}  {result['file']}: {summary}")
+        for key, count in result["changes"].items():
+            totals[key] = totals.get(key, 0) + count
+
+    print()
+    print(f"{len(files)} files scanned, {changed_files} changed, {failed_files} failed in {elapsed:.2f}s")
+    for key, count in sorted(totals.items()):
+        print(f"  {key}: {count} values")
+    return 1 if failed_files else 0
+
+
+def parse_transform_argument(text):
+    """Parse a transform such as Radius*=1.5 for argparse"""
+    try:
+        return parse_transform(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def command_transform(args):
+    """Scale, offset, clamp or set parameter values in every matching effect file"""
+    files = find_effect_files(args.paths)
+    if not files:
+        print("No effect files found")
+        return 1
+
+    start = time.perf_counter()
+    results = run_parallel(transform_file, [(path, args.transforms, args.dry_run) for path in files], args.jobs)
+    return report_changes(files, results, args.dry_run, time.perf_counter() - start)
+
+
+def parse_color_argument(text):
+    """Parse a faction name or #RRGGBB color for argparse"""
+    try:
+        return parse_color(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def command_recolor(args):
+    """Shift the colors of every matching effect file in HSV space"""
+    start = time.perf_counter()
+    files, results, colors = recolor_files(args.paths, args.hue, args.saturation, args.value,
+                                           args.faction, args.jobs, args.dry_run)
+    if not files:
+        print("No effect files found")
+        return 1
+    status = report_changes(files, results, args.dry_run, time.perf_counter() - start)
+    print(f"{colors} colors shifted")
+    return status
+
+
+def command_budget(args):
+    """Estimate particle, trail and fill cost per effect and per folder, flagging effects over budget"""
+    budgets = {"particles": args.max_particles, "trail_vertices": args.max_trail_vertices, "fill": args.max_fill}
+    # LOD variants sit next to their originals and would be counted twice
+    skip_suffix = None if args.include_lods else LOD_SUFFIX
+    start = time.perf_counter()
+    if args.paths:
+        results = analyze_files(args.paths, args.jobs, skip_suffix)
+    else:
+        if not os.path.isdir(args.store):
+            print(f"No column store at {args.store}; give effect paths or run the columns command")
+            return 1
+        results = store_costs(ColumnStore(args.store), skip_suffix)
+    elapsed = time.perf_counter() - start
+
+    flagged = 0
+    failed = 0
+    print(f"{'PARTICLES':>10} {'TRAIL VERTS':>12} {'FILL':>10}  EFFECT")
+    for file_path, costs, error in sorted(results, key=lambda result: -(result[1] or {}).get("fill", 0.0)):
+        if error:
+            failed += 1
+            print(f"ERROR    {file_path}: {error}")
+            continue
+        over = over_budget(costs, budgets)
+        flagged += bool(over)
+        if over or args.all:
+            flag = f"  OVER: {', '.join(over)}" if over else ""
+            print(f"{costs['particles']:>10.0f} {costs['trail_vertices']:>12.0f} {costs['fill']:>10.1f}  {file_path}{flag}")
+
+    print()
+    print(f"{'PARTICLES':>10} {'TRAIL VERTS':>12} {'FILL':>10} {'FLAGGED':>9}  FOLDER")
+    folders = aggregate_folders(results, budgets)
+    for folder, totals in sorted(folders.items(), key=lambda item: -item[1]["fill"]):
+        print(f"{totals['particles']:>10.0f} {totals['trail_vertices']:>12.0f} {totals['fill']:>10.1f} "
+              f"{totals['flagged']:>4}/{totals['files']:<4}  {folder or '.'}")
+
+    print()
+    print(f"{len(results)} effects, {flagged} over budget, {failed} failed in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+def parse_keep(text):
+    """Parse the share of an effect a variant keeps for argparse, above 0 and at most 1"""
+    try:
+        keep = float(text)
+    except ValueError:
+        keep = None
+    if keep is None or not 0.0 < keep <= 1.0:
+        raise argparse.ArgumentTypeError(f"expected a share above 0 and at most 1, got '{text}'")
+    return keep
+
+
+def command_lod(args):
+    """Write reduced-cost variants of effects next to the originals"""
+    budgets = {"particles": args.max_particles, "trail_vertices": args.max_trail_vertices, "fill": args.max_fill}
+    keep = None if args.fit_budget else args.keep
+    start = time.perf_counter()
+    results = generate_lods(args.paths, keep, budgets, args.suffix, args.jobs, args.dry_run)
+    elapsed = time.perf_counter() - start
+    if not results:
+        print("No effect files found")
+        return 1
+
+    written = 0
+    failed = 0
+    for result in results:
+        if result["error"]:
+            failed += 1
+            print(f"ERROR    {result['file']}: {result['error']}")
+        elif result["out"]:
+            written += 1
+            reduction = cost_reduction(result)
+            print(f"{'WOULD WRITE' if args.dry_run else 'WROTE'}  {result['out']}  keep {result['keep']:.2f}: "
+                  f"particles -{reduction['particles']:.0%}, trail vertices -{reduction['trail_vertices']:.0%}, "
+                  f"fill -{reduction['fill']:.0%}")
+
+    print()
+    print(f"{len(results)} effects, {written} variants, {failed} failed in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+def parse_query_condition(text):
+    """Parse a catalog query condition for argparse"""
+    try:
+        return parse_condition(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def command_index(args):
+    """Scan effect folders into the parameter catalog"""
+    catalog = EffectCatalog(args.db)
+    start = time.perf_counter()
+    stats = catalog.index(args.paths, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f"{stats['scanned']} files scanned, {stats['parsed']} parsed, "
+          f"{stats['unchanged']} unchanged, {stats['removed']} removed in {elapsed:.2f}s")
+    print(f"Catalog {args.db} holds {catalog.file_count()} files")
+    catalog.close()
+    return 0
+
+
+def command_query(args):
+    """List effects in the catalog matching every condition"""
+    catalog = EffectCatalog(args.db)
+    start = time.perf_counter()
+    matches = catalog.query(args.conditions, per_emitter=not args.any_emitter)
+    elapsed = time.perf_counter() - start
+    for path, emitter in matches:
+        # Emitters are numbered from 1, as in the editor
+        print(path if emitter is None else f"{path}  [emitter {emitter + 1}]")
+    print(f"{len(matches)} matches in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    catalog.close()
+    return 0
+
+
+def command_columns(args):
+    """Export per-emitter parameter values into a column store"""
+    start = time.perf_counter()
+    if args.from_catalog:
+        catalog = EffectCatalog(args.db)
+        rows, errors = write_columns(catalog_rows(catalog), args.out)
+        catalog.close()
+    else:
+        if not args.paths:
+            print("Give effect paths or --from-catalog")
+            return 1
+        rows, errors = export_columns(args.paths, args.out, args.jobs)
+    elapsed = time.perf_counter() - start
+    for file_path, error in errors:
+        print(f"ERROR    {file_path}: {error}")
+    print(f"{rows} emitters written to {args.out}, {len(errors)} files failed in {elapsed:.2f}s")
+    return 1 if errors else 0
+
+
+def command_stats(args):
+    """Report parameter statistics from a column store"""
+    store = ColumnStore(args.store)
+    keys = args.params or COLUMN_PARAMETERS
+    print(f"{len(store)} emitters in {len(store.files)} files")
+    print()
+
+    report = store.summary(keys)
+    print(f"{'PARAMETER':<22}{'COUNT':>8}{'MEAN':>12}{'STD':>12}{'MIN':>12}"
+          f"{'P5':>12}{'MEDIAN':>12}{'P95':>12}{'MAX':>12}")
+    for key, stats in report.items():
+        print(f"{key:<22}{stats['count']:>8}" + "".join(
+            f"{stats[name]:>12.4g}" for name in ("mean", "std", "min", "p5", "median", "p95", "max")))
+
+    if args.histogram:
+        for key in report:
+            counts, edges = store.histogram(key, args.histogram)
+            peak = counts.max() or 1
+            print()
+            print(key)
+            for count, low, high in zip(counts, edges[:-1], edges[1:]):
+                bar = "#" * int(round(40 * count / peak))
+                print(f"  {low:>11.4g} .. {high:<11.4g}{count:>8}  {bar}")
+
+    if args.outliers is not None:
+        for key in report:
+            flagged = store.outliers(key, args.outliers)
+            if not flagged:
+                continue
+            print()
+            print(f"{key} outliers (median {report[key]['median']:.4g})")
+            for path, emitter, value, score in flagged[:args.limit]:
+                print(f"  {value:>12.4g}  score {score:>8.1f}  {path}  [emitter {emitter + 1}]")
+            if len(flagged) > args.limit:
+                print(f"  ... {len(flagged) - args.limit} more")
+    return 0
+
+
+def parse_parameter(text):
+    """Check a parameter name for argparse"""
+    if text not in COLUMN_PARAMETERS:
+        raise argparse.ArgumentTypeError(f"unknown parameter '{text}'")
+    return text
+
+
+def parse_count(text):
+    """Parse a whole number of at least 1 for argparse"""
+    try:
+        count = int(text)
+    except ValueError:
+        count = None
+    if count is None or count < 1:
+        raise argparse.ArgumentTypeError(f"expected a whole number of at least 1, got '{text}'")
+    return count
+
+
+def parse_size(text):
+    """Parse a WIDTHxHEIGHT image size for argparse"""
+    width, separator, height = text.lower().partition("x")
+    try:
+        size = (int(width), int(height))
+    except ValueError:
+        size = None
+    if not separator or not size or min(size) <= 0:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{text}'")
+    return size
+
+
+def command_render(args):
+    """Render effect thumbnails and contact sheets"""
+    start = time.perf_counter()
+    results, sheets = render_directory(args.paths, args.out, args.size, args.frames, args.turn,
+                                       args.columns, args.jobs)
+    elapsed = time.perf_counter() - start
+    if not results:
+        print("No effect files found")
+        return 1
+
+    failed = [(file_path, error) for file_path, _, error in results if error]
+    for file_path, error in failed:
+        print(f"ERROR    {file_path}: {error}")
+    print(f"{len(results) - len(failed)} thumbnails rendered, {len(failed)} failed in {elapsed:.2f}s")
+    for sheet in sheets:
+        print(f"  {sheet}")
+    return 1 if failed else 0
+
+
+def command_export(args):
+    """Export an effect's preview animation as a GIF or APNG"""
+    try:
+        export_format(args.out)
+    except ValueError as e:
+        print(e)
+        return 1
+    with open(args.file, 'r') as file:
+        text = file.read()
+
+    start = time.perf_counter()
+    export_animation(text, args.out, args.frames, args.size, args.fps, args.jobs)
+    elapsed = time.perf_counter() - start
+    print(f"{args.frames} frames written to {args.out} in {elapsed:.2f}s")
+    return 0
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        prog="sfx_cli",
+        description="Headless batch tools for Battalion Wars effect files"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    set_parser = commands.add_parser("set", help="write parameter values into effect files")
+    set_parser.add_argument("paths", nargs="+", help="effect files, directories or glob patterns")
+    set_parser.add_argument("--set", dest="assignments", metavar="KEY=VALUE", type=parse_assignment,
+                            action="append", required=True, help="parameter value to write (repeatable)")
+    set_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    set_parser.add_argument("--dry-run", action="store_true", help="report changes without writing files")
+    set_parser.set_defaults(handler=command_set)
+
+    transform_parser = commands.add_parser("transform", help="scale, offset, clamp or set parameter values")
+    transform_parser.add_argument("paths", nargs="+", help="effect files, directories or glob patterns")
+    transform_parser.add_argument("--op", dest="transforms", metavar="TRANSFORM", type=parse_transform_argument,
+                                  action="append", required=True,
+                                  help="e.g. 'Radius,Final_Radius*=1.5' or '*_Alpha<=0.8'; "
+                                       "operators *= += -= <= >= = (repeatable, applied in order)")
+    transform_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    transform_parser.add_argument("--dry-run", action="store_true", help="report changes without writing files")
+    transform_parser.set_defaults(handler=command_transform)
+
+    recolor_parser = commands.add_parser("recolor", help="shift effect colors in HSV space, e.g. to a faction color")
+    recolor_parser.add_argument("paths", nargs="+", help="effect files, directories or glob patterns")
+    recolor_parser.add_argument("--faction", type=parse_color_argument, metavar="COLOR",
+                                help=f"give every color this hue: {', '.join(FACTION_COLORS)} or #RRGGBB")
+    recolor_parser.add_argument("--hue", type=float, default=0.0, help="hue rotation in degrees")
+    recolor_parser.add_argument("--saturation", type=float, default=1.0, help="saturation multiplier")
+    recolor_parser.add_argument("--value", type=float, default=1.0, help="brightness multiplier")
+    recolor_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    recolor_parser.add_argument("--dry-run", action="store_true", help="report changes without writing files")
+    recolor_parser.set_defaults(handler=command_recolor)
+
+    budget_parser = commands.add_parser("budget", help="estimate particle, trail and fill cost per effect and folder")
+    budget_parser.add_argument("paths", nargs="*", help="effect files, directories or glob patterns")
+    budget_parser.add_argument("--store", default="effect_columns", help="column store folder, used when no paths are given")
+    budget_parser.add_argument("--max-particles", type=float, default=DEFAULT_BUDGETS["particles"],
+                               help="live particle budget per effect (default: %(default)s)")
+    budget_parser.add_argument("--max-trail-vertices", type=float, default=DEFAULT_BUDGETS["trail_vertices"],
+                               help="trail vertex budget per effect (default: %(default)s)")
+    budget_parser.add_argument("--max-fill", type=float, default=DEFAULT_BUDGETS["fill"],
+                               help="fill area budget per effect, in square world units (default: %(default)s)")
+    budget_parser.add_argument("--all", action="store_true", help="list every effect, not only those over budget")
+    budget_parser.add_argument("--include-lods", action="store_true",
+                               help=f"also count LOD variants (files ending in {LOD_SUFFIX})")
+    budget_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    budget_parser.set_defaults(handler=command_budget)
+
+    lod_parser = commands.add_parser("lod", help="write reduced-cost variants of effects next to the originals")
+    lod_parser.add_argument("paths", nargs="+", help="effect files, directories or glob patterns")
+    lod_parser.add_argument("--keep", type=parse_keep, default=LOD_KEEP,
+                            help="share of particles and trail points to keep (default: %(default)s)")
+    lod_parser.add_argument("--fit-budget", action="store_true",
+                            help="reduce each effect just enough to fit the budgets, skipping those within them")
+    lod_parser.add_argument("--max-particles", type=float, default=DEFAULT_BUDGETS["particles"],
+                            help="live particle budget per effect (default: %(default)s)")
+    lod_parser.add_argument("--max-trail-vertices", type=float, default=DEFAULT_BUDGETS["trail_vertices"],
+                            help="trail vertex budget per effect (default: %(default)s)")
+    lod_parser.add_argument("--max-fill", type=float, default=DEFAULT_BUDGETS["fill"],
+                            help="fill area budget per effect, in square world units (default: %(default)s)")
+    lod_parser.add_argument("--suffix", default=LOD_SUFFIX, help="added to variant file names (default: %(default)s)")
+    lod_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    lod_parser.add_argument("--dry-run", action="store_true", help="report reductions without writing files")
+    lod_parser.set_defaults(handler=command_lod)
+
+    index_parser = commands.add_parser("index", help="scan effect folders into the parameter catalog")
+    index_parser.add_argument("paths", nargs="+", help="effect files, directories or glob patterns")
+    index_parser.add_argument("--db", default=DEFAULT_CATALOG_PATH, help="catalog database file")
+    index_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    index_parser.set_defaults(handler=command_index)
+
+    query_parser = commands.add_parser("query", help="find effects in the catalog")
+    query_parser.add_argument("conditions", nargs="+", type=parse_query_condition,
+                              metavar="CONDITION", help="e.g. Blend_Mode=1 'Life>20'")
+    query_parser.add_argument("--db", default=DEFAULT_CATALOG_PATH, help="catalog database file")
+    query_parser.add_argument("--any-emitter", action="store_true",
+                              help="match conditions anywhere in a file instead of within one emitter")
+    query_parser.set_defaults(handler=command_query)
+
+    columns_parser = commands.add_parser("columns", help="export parameter values into a column store for stats")
+    columns_parser.add_argument("paths", nargs="*", help="effect files, directories or glob patterns")
+    columns_parser.add_argument("--out", default="effect_columns", help="folder for the column store")
+    columns_parser.add_argument("--from-catalog", action="store_true",
+                                help="export from the catalog instead of parsing files")
+    columns_parser.add_argument("--db", default=DEFAULT_CATALOG_PATH, help="catalog database file")
+    columns_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    columns_parser.set_defaults(handler=command_columns)
+
+    stats_parser = commands.add_parser("stats", help="summarize parameter values across all effects")
+    stats_parser.add_argument("params", nargs="*", type=parse_parameter, metavar="PARAMETER",
+                              help="parameters to report (default: all)")
+    stats_parser.add_argument("--store", default="effect_columns", help="column store folder")
+    stats_parser.add_argument("--histogram", type=int, metavar="BINS", help="print a histogram per parameter")
+    stats_parser.add_argument("--outliers", type=float, metavar="SCORE", nargs="?", const=3.5,
+                              help="list emitters whose modified z-score exceeds SCORE (default 3.5)")
+    stats_parser.add_argument("--limit", type=int, default=20, help="outliers listed per parameter")
+    stats_parser.set_defaults(handler=command_stats)
+
+    render_parser = commands.add_parser("render", help="render effect thumbnails and contact sheets")
+    render_parser.add_argument("paths", nargs="+", help="effect files, directories or glob patterns")
+    render_parser.add_argument("--out", default="thumbnails", help="folder for thumbnails and sheets")
+    render_parser.add_argument("--size", type=parse_size, default=THUMBNAIL_SIZE, metavar="WxH",
+                               help="thumbnail size (default: %(default)s)")
+    render_parser.add_argument("--turn", type=int, default=THUMBNAIL_TURN, help="game turn shown (default: %(default)s)")
+    render_parser.add_argument("--frames", type=parse_count, default=1,
+                               help="frames per thumbnail, as a strip of turns up to --turn")
+    render_parser.add_argument("--columns", type=parse_count, default=SHEET_COLUMNS, help="thumbnails per sheet row")
+    render_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    render_parser.set_defaults(handler=command_render)
+
+    export_parser = commands.add_parser("export", help="export an effect's preview as an animated GIF or PNG")
+    export_parser.add_argument("file", help="effect file")
+    export_parser.add_argument("--out", required=True, help="output .gif, .png or .apng file")
+    export_parser.add_argument("--frames", type=parse_count, default=EXPORT_FRAMES, help="frames to render (default: %(default)s)")
+    export_parser.add_argument("--size", type=parse_size, default=EXPORT_SIZE, metavar="WxH",
+                               help="frame size (default: %(default)s)")
+    export_parser.add_argument("--fps", type=parse_count, default=EXPORT_FPS, help="playback speed (default: %(default)s)")
+    export_parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    export_parser.set_defaults(handler=command_export)
+
+    return parser
+
+
+def main(argv=None):
+    """Run the command-line tools"""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
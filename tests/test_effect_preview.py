@@ -0,0 +1,68 @@
+from unittest import mock
+
+from PIL import Image
+
+import effect_preview
+from effect_preview import PREVIEW_HEIGHT, PREVIEW_WIDTH, EffectPreview
+from particle_sim import DEFAULT_PARAMETERS
+
+
+def make_preview(**kwargs):
+    """Build an EffectPreview with every Tk widget replaced by a mock"""
+    with mock.patch.object(effect_preview, "tk"), \
+            mock.patch.object(effect_preview, "ttk"), \
+            mock.patch.object(effect_preview, "ImageTk"):
+        return EffectPreview(mock.MagicMock(), {"background": "#202418"}, **kwargs)
+
+
+def pasted_images(preview):
+    return [call.args[0] for call in preview.photo.paste.call_args_list]
+
+
+def test_show_turn_draws_rendered_frame():
+    preview = make_preview()
+    preview.set_parameters(dict(DEFAULT_PARAMETERS))
+    preview.show_turn(5)
+
+    images = pasted_images(preview)
+    assert len(images) == 1
+    assert isinstance(images[0], Image.Image)
+    assert images[0].size == (PREVIEW_WIDTH, PREVIEW_HEIGHT)
+    assert preview.turn == 5
+    # info_var and cache_var are the same mocked StringVar
+    assert any(call.args[0].startswith("TURN 5") for call in preview.info_var.set.call_args_list)
+
+
+def test_set_parameters_while_paused_redraws():
+    preview = make_preview()
+    preview.set_parameters(dict(DEFAULT_PARAMETERS))
+    preview.stop()
+
+    params = dict(DEFAULT_PARAMETERS, Emit_Per_Turn=4.0)
+    preview.set_parameters(params, restart=True)
+    assert len(pasted_images(preview)) == 1
+    assert preview.turn == 0
+
+
+def test_cached_turn_matches_resimulated_turn():
+    preview = make_preview()
+    preview.set_parameters(dict(DEFAULT_PARAMETERS))
+    preview.show_turn(10)
+    preview.show_turn(3)
+    preview.cache.clear()
+    preview.show_turn(10)
+
+    first, _, again = pasted_images(preview)
+    assert first.tobytes() == again.tobytes()
+
+
+def test_cache_bytes_limits_cached_frames():
+    frame_bytes = PREVIEW_WIDTH * PREVIEW_HEIGHT * 3
+    preview = make_preview(cache_bytes=2 * frame_bytes)
+    preview.set_parameters(dict(DEFAULT_PARAMETERS))
+    for turn in range(1, 6):
+        preview.show_turn(turn)
+
+    assert preview.cache.max_bytes == 2 * frame_bytes
+    assert preview.cache.bytes <= 2 * frame_bytes
+    assert len(preview.cache) == 2
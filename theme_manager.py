@@ -199,6 +199,15 @@ class ThemeManager:
             padding=3
         )
 
+        # Progress bar shown in the status bar while files load
+        style.configure('Status.Horizontal.TProgressbar',
+            background=self.colors['accent2'],
+            troughcolor=self.colors['input_bg'],
+            bordercolor=self.colors['status_bg'],
+            lightcolor=self.colors['accent2'],
+            darkcolor=self.colors['accent2']
+        )
+
         # SCALE (SLIDER) STYLING
         style.configure('TScale',
             background=self.colors['background'],
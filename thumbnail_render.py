@@ -0,0 +1,203 @@
+import hashlib
+import os
+
+from PIL import Image, ImageDraw
+
+from effect_batch import find_effect_files, read_effect, run_parallel
+from effect_parser import parse_effect
+from effect_table import NO_ENTRY, EmitterTable
+from particle_sim import ParticleRenderer, ParticleSimulation, complete_parameters
+from trail_sim import TRAIL_KEYS, TrailSimulation
+
+# Thumbnail size in pixels
+THUMBNAIL_SIZE = (160, 90)
+
+# Game turn shown in a single-frame thumbnail
+THUMBNAIL_TURN = 30
+
+# Background behind rendered thumbnails
+THUMBNAIL_BACKGROUND = (32, 34, 28)
+
+# Seed for thumbnail simulations, so renders are repeatable
+THUMBNAIL_SEED = 1
+
+# Folder of thumbnails cached by file content
+THUMBNAIL_CACHE_DIR = "thumbnail_cache"
+
+# Bump when rendering changes, so old cached thumbnails are not reused
+THUMBNAIL_VERSION = 2
+
+# Thumbnails per contact sheet, and sheet layout
+SHEET_THUMBNAILS = 200
+SHEET_COLUMNS = 8
+SHEET_LABEL_HEIGHT = 14
+
+
+def effect_simulations(document, seed=THUMBNAIL_SEED):
+    """Create one particle or trail simulation per emitter of a document
+
+    Emitters are read the way the editor's preview reads them, so
+    thumbnails and exports match what the editor shows.
+    """
+    table = EmitterTable(document)
+    simulations = []
+    for emitter in range(len(table)):
+        params = complete_parameters(table.row(emitter))
+        if any(table.entry_indices[key][emitter] != NO_ENTRY for key in TRAIL_KEYS):
+            simulations.append(TrailSimulation(params, seed=seed))
+        else:
+            simulations.append(ParticleSimulation(params, seed=seed))
+    return simulations
+
+
+def render_frames(document, turns, size=THUMBNAIL_SIZE, seed=THUMBNAIL_SEED, background=THUMBNAIL_BACKGROUND):
+    """Render every emitter of an effect at each of a rising list of turns
+
+    Returns:
+        list: One RGB image per turn
+    """
+    return render_turns(effect_simulations(document, seed), turns, size, background)
+
+
+def render_turns(simulations, turns, size=THUMBNAIL_SIZE, background=THUMBNAIL_BACKGROUND):
+    """Advance simulations through a rising list of turns, rendering each
+
+    Returns:
+        list: One RGB image per turn
+    """
+    renderer = ParticleRenderer(size[0], size[1], background=background)
+    frames = []
+    for turn in turns:
+        for simulation in simulations:
+            simulation.step(turn - simulation.turn)
+        frames.append(renderer.render_layers(simulations))
+    return frames
+
+
+def strip_turns(frames, last_turn=THUMBNAIL_TURN):
+    """Return the turns shown in a strip of frames, evenly spaced up to last_turn"""
+    if frames <= 1:
+        return [last_turn]
+    return [max(1, round(last_turn * (number + 1) / frames)) for number in range(frames)]
+
+
+def thumbnail_path(file_path, root, out_dir):
+    """Return where the thumbnail of an effect file goes, mirroring the source tree"""
+    relative = os.path.relpath(file_path, root) if root else os.path.basename(file_path)
+    return os.path.join(out_dir, os.path.splitext(relative)[0] + ".png")
+
+
+def render_thumbnail(job):
+    """Render one effect's thumbnail or frame strip to a PNG; runs in a worker process
+
+    Args:
+        job (tuple): (file_path, out_path, size, turns)
+
+    Returns:
+        tuple: (file_path, out_path, error message or None)
+    """
+    file_path, out_path, size, turns = job
+    try:
+        frames = render_frames(read_effect(file_path), turns, size)
+        strip = Image.new("RGB", (size[0] * len(frames), size[1]))
+        for number, frame in enumerate(frames):
+            strip.paste(frame, (number * size[0], 0))
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        strip.save(out_path)
+        return file_path, out_path, None
+    except Exception as e:
+        return file_path, out_path, str(e)
+
+
+def build_contact_sheets(results, out_dir, root=None, columns=SHEET_COLUMNS, per_sheet=SHEET_THUMBNAILS):
+    """Lay rendered thumbnails out in labelled grids
+
+    Args:
+        results (list): (file_path, out_path, error) tuples from render_thumbnail
+        out_dir (str): Folder for contact_sheet_NNN.png
+        root (str, optional): Folder labels are made relative to
+
+    Returns:
+        list: Paths of the written sheets
+
+    Raises:
+        ValueError: If columns is below 1
+    """
+    if columns < 1:
+        raise ValueError(f"Need at least one column, got {columns}")
+    rendered = [(file_path, out_path) for file_path, out_path, error in results if not error]
+    sheets = []
+    for first in range(0, len(rendered), per_sheet):
+        page = rendered[first:first + per_sheet]
+        thumbnails = [Image.open(out_path) for _, out_path in page]
+        cell_width = max(image.width for image in thumbnails)
+        cell_height = max(image.height for image in thumbnails) + SHEET_LABEL_HEIGHT
+        rows = -(-len(page) // columns)
+
+        sheet = Image.new("RGB", (cell_width * min(columns, len(page)), cell_height * rows), THUMBNAIL_BACKGROUND)
+        draw = ImageDraw.Draw(sheet)
+        for number, ((file_path, _), thumbnail) in enumerate(zip(page, thumbnails)):
+            x = (number % columns) * cell_width
+            y = (number // columns) * cell_height
+            sheet.paste(thumbnail, (x, y))
+            label = os.path.relpath(file_path, root) if root else os.path.basename(file_path)
+            draw.text((x + 2, y + cell_height - SHEET_LABEL_HEIGHT + 1), label, fill=(220, 220, 200))
+            thumbnail.close()
+
+        sheet_path = os.path.join(out_dir, f"contact_sheet_{len(sheets) + 1:03d}.png")
+        sheet.save(sheet_path)
+        sheets.append(sheet_path)
+    return sheets
+
+
+def render_directory(paths, out_dir, size=THUMBNAIL_SIZE, frames=1, last_turn=THUMBNAIL_TURN,
+                     columns=SHEET_COLUMNS, jobs=None):
+    """Render thumbnails for every effect under paths, then contact sheets
+
+    Returns:
+        tuple: (results from render_thumbnail, contact sheet paths)
+    """
+    files = find_effect_files(paths)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]) if files else None
+    turns = strip_turns(frames, last_turn)
+    work = [(path, thumbnail_path(os.path.abspath(path), root, out_dir), size, turns) for path in files]
+    results = run_parallel(render_thumbnail, work, jobs)
+    return results, build_contact_sheets(results, out_dir, root, columns)
+
+
+def cache_thumbnail(job):
+    """Return a cached thumbnail for an effect, rendering it first if needed
+
+    The cache file is named after a hash of the file content and the
+    render settings, so edited files get a new thumbnail and renamed or
+    copied files reuse the old one. Runs in a worker process.
+
+    Args:
+        job (tuple): (file_path, cache_dir, size)
+
+    Returns:
+        tuple: (file_path, thumbnail path or None, error message or None)
+    """
+    file_path, cache_dir, size = job
+    try:
+        with open(file_path, 'rb') as file:
+            data = file.read()
+        digest = hashlib.sha1(data)
+        digest.update(repr((size, THUMBNAIL_TURN, THUMBNAIL_SEED, THUMBNAIL_VERSION)).encode())
+        out_path = os.path.join(cache_dir, digest.hexdigest() + ".png")
+        if os.path.exists(out_path):
+            return file_path, out_path, None
+
+        # Decode the same way the editor reads files
+        with open(file_path, 'r') as file:
+            document = parse_effect(file.read())
+        frame = render_frames(document, [THUMBNAIL_TURN], size)[0]
+
+        # Write under a temporary name so a half-written file is never picked up
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{out_path}.{os.getpid()}.tmp"
+        frame.save(temp_path, "PNG")
+        os.replace(temp_path, out_path)
+        return file_path, out_path, None
+    except Exception as e:
+        return file_path, None, str(e)
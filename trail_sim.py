@@ -0,0 +1,183 @@
+import numpy as np
+
+from particle_sim import RAMP_CHANNELS, UNLIMITED_LIFE_TURNS, ramp
+
+# Keys that only trail emitters have
+TRAIL_KEYS = ("Num_Points", "Wiggle_Factor", "Disperse_Rate")
+
+# Most trails alive at once
+MAX_TRAILS = 512
+
+# Most points kept per trail; Num_Points above this is drawn at this length
+MAX_TRAIL_POINTS = 32
+
+# World units of random drift per turn for each unit of Wiggle_Factor
+WIGGLE_SCALE = 0.005
+
+# Most sprites stamped along one trail segment
+MAX_SEGMENT_STAMPS = 16
+
+
+class TrailSimulation:
+    """Trails of one emitter, kept in preallocated ring buffers
+
+    Every trail records its head position once per turn into slot
+    turn % MAX_TRAIL_POINTS of its ring, so all trails share one write
+    index. Trails keep their slot for life, which keeps the rings intact;
+    a slot is reused once its trail has fully faded.
+    """
+
+    def __init__(self, params, seed=0, capacity=MAX_TRAILS):
+        self.params = params
+        self.seed = seed
+        self.capacity = capacity
+        self.points = np.zeros((capacity, MAX_TRAIL_POINTS, 3), dtype=np.float32)
+        self.drift = np.zeros((capacity, MAX_TRAIL_POINTS, 3), dtype=np.float32)
+        self.head = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int64)
+        self.born = np.zeros(capacity, dtype=np.int64)
+        self.died = np.zeros(capacity, dtype=np.int64)
+        self.moving = np.zeros(capacity, dtype=bool)
+
+        # Scratch space for the per-turn random numbers
+        self._wiggle = np.zeros((capacity, MAX_TRAIL_POINTS, 3), dtype=np.float32)
+        self._direction = np.zeros((capacity, 3), dtype=np.float32)
+        # Scratch space for the per-turn dispersal step
+        self._scratch = np.zeros_like(self.drift)
+        self.reset()
+
+    def reset(self):
+        """Remove all trails and restart the random sequence"""
+        self.rng = np.random.default_rng(self.seed)
+        self.turn = 0
+        self.emit_carry = 0.0
+        self.moving[:] = False
+        self.born[:] = 0
+        self.died[:] = -MAX_TRAIL_POINTS
+
+    def set_parameters(self, params):
+        """Use new parameter values from the next turn on, keeping live trails"""
+        self.params = params
+
+    @property
+    def length(self):
+        """Number of points drawn per trail"""
+        return int(np.clip(self.params["Num_Points"], 2, MAX_TRAIL_POINTS))
+
+    @property
+    def count(self):
+        """Number of trails with visible points"""
+        return int(np.count_nonzero(self.died > self.turn - self.length))
+
+    def step(self, turns=1):
+        """Advance the simulation by a number of game turns"""
+        for _ in range(turns):
+            self.turn += 1
+            self._advance()
+            self._record()
+            self._emit()
+
+    def _advance(self):
+        """Move the heads and wiggle and disperse the recorded points, in place"""
+        params = self.params
+        self.velocity[:, 1] -= params["GravityScalar"]
+        self.head += self.velocity
+
+        expired = self.moving & (self.turn - self.born >= self.life)
+        self.died[expired] = self.turn - 1
+        self.moving &= ~expired
+
+        wiggle = params["Wiggle_Factor"] * WIGGLE_SCALE
+        if wiggle:
+            self.rng.random(out=self._wiggle, dtype=np.float32)
+            self._wiggle -= 0.5
+            self._wiggle *= 2 * wiggle
+            self.points += self._wiggle
+        if params["Disperse_Rate"]:
+            np.multiply(self.drift, np.float32(params["Disperse_Rate"]), out=self._scratch)
+            self.points += self._scratch
+
+    def _record(self):
+        """Write every moving head into the current ring slot"""
+        slot = self.turn % MAX_TRAIL_POINTS
+        moving = self.moving[:, None]
+        np.copyto(self.points[:, slot], self.head, where=moving)
+
+        # Each new point disperses in its own random direction
+        self.rng.standard_normal(out=self._direction, dtype=np.float32)
+        self._direction /= np.linalg.norm(self._direction, axis=1, keepdims=True) + 1e-6
+        np.copyto(self.drift[:, slot], self._direction, where=moving)
+
+    def _emit(self):
+        """Start this turn's trails in free slots"""
+        params = self.params
+        self.emit_carry += max(params["Emit_Per_Turn"], 0.0)
+        whole = int(self.emit_carry)
+        self.emit_carry -= whole
+        if whole <= 0:
+            return
+
+        free = np.flatnonzero(~self.moving & (self.died <= self.turn - MAX_TRAIL_POINTS))[:whole]
+        if not free.size:
+            return
+
+        base = np.array([params["Initial_Velocity_X"], params["Initial_Velocity_Y"],
+                         params["Initial_Velocity_Z"]], dtype=np.float32)
+        jitter = self.rng.uniform(-1.0, 1.0, (free.size, 3)).astype(np.float32)
+        self.head[free] = 0.0
+        self.velocity[free] = base + jitter * params["Velocity_Randomness"]
+        life = params["Life"]
+        self.life[free] = int(life) if life > 0 else UNLIMITED_LIFE_TURNS
+        self.born[free] = self.turn
+        self.died[free] = np.iinfo(np.int64).max
+        self.moving[free] = True
+        self.points[free, self.turn % MAX_TRAIL_POINTS] = 0.0
+
+    def sprites(self, renderer):
+        """Stamp soft discs along every trail ribbon
+
+        Points are ordered newest first. Each segment between two recorded
+        points gets enough stamps to look continuous at its on-screen
+        length. Width goes from Start_Width at the head to Width at the
+        tail and grows with dispersal; color follows the ramp along the trail.
+        """
+        params = self.params
+        length = self.length
+        active = np.flatnonzero(self.died > self.turn - length)
+        recorded_turn = self.turn - np.arange(length)
+        slots = recorded_turn % MAX_TRAIL_POINTS
+
+        # Points each trail actually recorded, newest first
+        valid = (recorded_turn >= self.born[active, None]) & (recorded_turn <= self.died[active, None])
+        points = self.points[active[:, None], slots]
+        x, y = renderer.project(points.reshape(-1, 3))
+        x = x.reshape(points.shape[:2])
+        y = y.reshape(points.shape[:2])
+
+        # Segments join each valid point to the next older valid point
+        segment = valid[:, :-1] & valid[:, 1:]
+        trail, start = np.nonzero(segment)
+        progress = np.arange(length, dtype=np.float32) / (length - 1)
+        ages = np.arange(length, dtype=np.float32)
+        width = (params["Start_Width"] + (params["Width"] - params["Start_Width"]) * progress
+                 + params["Disperse_Rate"] * ages) * renderer.scale / 2
+
+        x0, y0 = x[trail, start], y[trail, start]
+        x1, y1 = x[trail, start + 1], y[trail, start + 1]
+        spacing = np.maximum(width[start], 1.0)
+        stamps = np.clip(np.ceil(np.hypot(x1 - x0, y1 - y0) / spacing), 1, MAX_SEGMENT_STAMPS).astype(np.intp)
+
+        # Spread each segment's stamps evenly from its newer to its older end
+        owner = np.repeat(np.arange(stamps.size), stamps)
+        first = np.repeat(np.cumsum(stamps) - stamps, stamps)
+        fraction = (np.arange(owner.size) - first) / stamps[owner]
+        position = start[owner] + fraction
+
+        sprite_x = x0[owner] + (x1 - x0)[owner] * fraction
+        sprite_y = y0[owner] + (y1 - y0)[owner] * fraction
+        sprite_progress = position / (length - 1)
+        radius = np.interp(position, ages, width)
+        rgba = np.stack([np.clip(ramp(params, channel, sprite_progress), 0.0, 1.0)
+                         for channel in RAMP_CHANNELS], axis=1)
+        return sprite_x, sprite_y, radius, rgba
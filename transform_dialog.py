@@ -0,0 +1,72 @@
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+from effect_transform import parse_transform
+
+
+class TransformDialog:
+    """Window for scaling, offsetting, clamping or setting values in the open file"""
+
+    def __init__(self, root, colors, on_apply):
+        self.root = root
+        self.colors = colors
+        self.on_apply = on_apply    # Called with (transforms, all_emitters); returns values changed
+
+        self.window = tk.Toplevel(root)
+        self.window.title("BULK TRANSFORM")
+        self.window.geometry("520x340")
+        self.window.configure(bg=colors['background'])
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Setup the dialog widgets"""
+        frame = ttk.Frame(self.window, padding="10", style="Military.TFrame")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        ops_frame = ttk.LabelFrame(frame, text="TRANSFORMS (ONE PER LINE, APPLIED IN ORDER)", padding="5",
+                                   style="Military.TLabelframe")
+        ops_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        self.ops_text = tk.Text(
+            ops_frame,
+            height=6,
+            font=("Courier New", 10),
+            bg=self.colors['border'],
+            fg=self.colors['foreground'],
+            insertbackground=self.colors['foreground']
+        )
+        self.ops_text.pack(fill=tk.BOTH, expand=True)
+        self.ops_text.insert("1.0", "Radius,Final_Radius*=1.5\nEmit_Per_Turn<=3.0")
+
+        ttk.Label(
+            frame,
+            text="Operators: *= scale, += -= offset, <= >= clamp, = set.\nNames may use wildcards, e.g. *_Alpha<=0.8",
+            style="Desc.TLabel",
+            justify=tk.LEFT
+        ).pack(fill=tk.X, padx=5, pady=5)
+
+        button_frame = ttk.Frame(frame, style="Military.TFrame")
+        button_frame.pack(fill=tk.X, pady=5)
+
+        self.all_emitters_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(button_frame, text="ALL EMITTERS", variable=self.all_emitters_var).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(button_frame, text="APPLY", command=self.apply, style="Deploy.TButton").pack(side=tk.RIGHT, padx=5)
+
+        self.status_var = tk.StringVar(value="CHANGES SHOW IN THE VIEWER; APPLY CHANGES SAVES THEM")
+        ttk.Label(frame, textvariable=self.status_var, style="Status.TLabel").pack(fill=tk.X)
+
+    def apply(self):
+        """Parse the transforms and apply them to the open file"""
+        lines = [line.strip() for line in self.ops_text.get("1.0", tk.END).splitlines() if line.strip()]
+        try:
+            transforms = [parse_transform(line) for line in lines]
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.window)
+            return
+        if not transforms:
+            return
+
+        changed = self.on_apply(transforms, self.all_emitters_var.get())
+        self.status_var.set(f"{changed} VALUES CHANGED")
@@ -0,0 +1,30 @@
+class UpdateScheduler:
+    """Coalesce UI refreshes triggered by Tk variable changes
+
+    Dragging a slider writes its variable once per mouse event. Instead of
+    refreshing on every write, watched callbacks are queued and run once
+    from a single after_idle flush, after Tk has processed the pending
+    events for the current frame.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.pending = {}       # Callbacks waiting for the next flush, in request order
+        self._flush_id = None
+
+    def watch(self, var, callback):
+        """Request callback whenever a Tk variable is written"""
+        var.trace_add("write", lambda *args: self.request(callback))
+
+    def request(self, callback):
+        """Queue a callback for the next flush; repeat requests are merged"""
+        self.pending[callback] = None
+        if self._flush_id is None:
+            self._flush_id = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """Run every queued callback once"""
+        self._flush_id = None
+        pending, self.pending = self.pending, {}
+        for callback in pending:
+            callback()
@@ -0,0 +1,134 @@
+import re
+import tkinter as tk
+import tkinter.font as tkfont
+from array import array
+from tkinter import ttk
+
+# Files at least this large (in characters) are shown in the virtual viewer
+VIRTUAL_VIEWER_THRESHOLD = 2 * 1024 * 1024
+
+# Lines scrolled per mouse wheel step
+WHEEL_LINES = 3
+
+_NEWLINE = re.compile("\n")
+
+
+class VirtualTextViewer(ttk.Frame):
+    """Read-only text viewer that only renders the visible lines
+
+    The full text stays in Python; the Text widget only ever holds the
+    window of lines currently on screen, and the scrollbar is mapped to
+    the total line count. Lines are not wrapped so that every widget line
+    corresponds to exactly one file line.
+    """
+
+    def __init__(self, parent, **text_options):
+        super().__init__(parent, style="Military.TFrame")
+
+        self.text = tk.Text(self, wrap=tk.NONE, **text_options)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.config(state=tk.DISABLED)
+        self.font = tkfont.Font(font=self.text.cget("font"))
+
+        self.content = ""
+        self.document = None    # Parsed document, used to show values edited live
+        self.line_starts = array("q", [0])
+        self.line_ranges = {}   # 1-based line -> [(tag, entry), ...]
+        self.marker_tag = "highlight"
+        self.top_line = 0       # 0-based index of the first rendered line
+
+        self.text.bind("<Configure>", lambda e: self.render())
+        self.text.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda e: self.scroll_lines(-WHEEL_LINES))
+        self.text.bind("<Button-5>", lambda e: self.scroll_lines(WHEEL_LINES))
+
+    @property
+    def line_count(self):
+        return len(self.line_starts)
+
+    def visible_line_count(self):
+        """Return how many lines fit in the widget"""
+        line_height = self.font.metrics("linespace")
+        return max(1, self.text.winfo_height() // max(1, line_height)) + 1
+
+    def load(self, content, document=None):
+        """Show new text, scrolled to the top"""
+        self.document = document
+        self.line_ranges = {}
+        self.top_line = 0
+        self.reload(content)
+
+    def reload(self, content):
+        """Replace the text while keeping the scroll position and highlights"""
+        self.content = content
+        self.line_starts = array("q", [0])
+        self.line_starts.extend(match.end() for match in _NEWLINE.finditer(content))
+        self.render()
+
+    def set_ranges(self, ranges):
+        """Replace the highlight ranges shown in the viewer
+
+        Args:
+            ranges (dict): {tag: [entry, ...]} as returned for one group by
+                classify_entries
+        """
+        self.line_ranges = {}
+        for tag, entries in ranges.items():
+            for entry in entries:
+                self.line_ranges.setdefault(entry.line, []).append((tag, entry))
+        self.render()
+
+    def get_line(self, index):
+        """Return the text of a 0-based line without its newline"""
+        start = self.line_starts[index]
+        if index + 1 < len(self.line_starts):
+            text = self.content[start:self.line_starts[index + 1] - 1]
+        else:
+            text = self.content[start:]
+
+        # Show values that have been edited but not yet saved
+        if self.document is not None:
+            text = self.document.line_text(index + 1, start, text)
+        return text
+
+    def render(self):
+        """Replace the widget contents with the lines currently in view"""
+        count = self.visible_line_count()
+        self.top_line = max(0, min(self.top_line, self.line_count - count))
+        bottom_line = min(self.line_count, self.top_line + count)
+
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(self.get_line(i) for i in range(self.top_line, bottom_line)))
+
+        # Re-apply the highlight ranges that fall inside the window
+        for offset in range(bottom_line - self.top_line):
+            for tag, entry in self.line_ranges.get(self.top_line + offset + 1, ()):
+                start_index = f"{offset + 1}.{entry.column}"
+                end_index = f"{offset + 1}.{entry.column + len(entry.raw)}"
+                self.text.tag_add(tag, start_index, end_index)
+                self.text.tag_add(self.marker_tag, start_index, end_index)
+        self.text.config(state=tk.DISABLED)
+
+        self.scrollbar.set(self.top_line / self.line_count, bottom_line / self.line_count)
+
+    def scroll_lines(self, lines):
+        """Scroll the view by a number of lines"""
+        self.top_line += lines
+        self.render()
+        return "break"
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Handle scrollbar drags and clicks"""
+        if action == "moveto":
+            self.top_line = int(float(amount) * self.line_count)
+            self.render()
+        elif action == "scroll":
+            step = self.visible_line_count() - 1 if unit == "pages" else 1
+            self.scroll_lines(int(amount) * step)
+
+    def on_mouse_wheel(self, event):
+        """Scroll with the mouse wheel"""
+        return self.scroll_lines(-WHEEL_LINES if event.delta > 0 else WHEEL_LINES)